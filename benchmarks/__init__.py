@@ -0,0 +1 @@
+# Performance benchmarks; run the modules with python -m benchmarks.<name>
@@ -0,0 +1,97 @@
+"""
+Compression Benchmark
+Compares output size, write time and read-back time of the output PAK for
+stored and deflate levels, to choose between build time and in-game load time.
+
+    python -m benchmarks.bench_compression
+    python -m benchmarks.bench_compression --pak path/to/Czech_xml.pak
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+from src.kcd_bilingual import BilingualPatcher, _extract_pak
+
+SETTINGS = [
+    ("stored", zipfile.ZIP_STORED, None),
+    ("deflate-1", zipfile.ZIP_DEFLATED, 1),
+    ("deflate-6", zipfile.ZIP_DEFLATED, 6),
+    ("deflate-9", zipfile.ZIP_DEFLATED, 9),
+]
+
+WORDS = ["the", "lord", "sword", "horse", "Skalitz", "Rattay", "groschen", "Henry",
+         "bandit", "herb", "potion", "quest", "Hans", "Capon", "village", "mill"]
+
+def synthetic_tables(rows):
+    """Merged rows with dialog-like text lengths for every default table"""
+    rng = random.Random(0)
+    data = {}
+    for file_path in BilingualPatcher().files_to_process:
+        table = []
+        for i in range(rows):
+            text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 30)))
+            table.append((f"{file_path}_{i}", text, f"{text}  /  {text.upper()}"))
+        data[file_path] = table
+    return data
+
+def pak_tables(pak_path):
+    """Merged-looking rows built from a real PAK"""
+    patcher = BilingualPatcher()
+    data = _extract_pak(pak_path, patcher.files_to_process)
+    return {
+        file_path: [(entry_id, text, f"{text}  /  {text}") for entry_id, text in entries.items()]
+        for file_path, entries in data.items()
+    }
+
+def read_back(output_path):
+    """Time to read every member back, as the game does when loading"""
+    start = time.perf_counter()
+    with zipfile.ZipFile(output_path) as zf:
+        for info in zf.infolist():
+            zf.read(info)
+    return time.perf_counter() - start
+
+def run(data, jobs, repeat):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, method, level in SETTINGS:
+            output = Path(tmp) / f"{name}.pak"
+            patcher = BilingualPatcher(jobs=jobs, compression=method, compresslevel=level)
+            write_times, read_times = [], []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                patcher._create_pak(data, str(output))
+                write_times.append(time.perf_counter() - start)
+                read_times.append(read_back(output))
+            results.append((name, output.stat().st_size, min(write_times), min(read_times)))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark output PAK compression settings')
+    parser.add_argument('--pak', help='Take table contents from this PAK instead of synthetic rows')
+    parser.add_argument('--rows', type=int, default=20000, help='Synthetic rows per table')
+    parser.add_argument('-j', '--jobs', type=int, help='Compression threads (default: one per CPU)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per setting, best is reported')
+    args = parser.parse_args()
+
+    data = pak_tables(args.pak) if args.pak else synthetic_tables(args.rows)
+    raw_size = sum(len(text.encode('utf-8')) for rows in data.values() for row in rows for text in row)
+
+    # Keep the patcher's per-member messages out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = run(data, args.jobs, args.repeat)
+
+    print(f"Tables: {len(data)}, rows: {sum(len(rows) for rows in data.values())}, "
+          f"text: {raw_size / 1e6:.1f} MB")
+    print(f"{'setting':<12}{'size MB':>10}{'write s':>10}{'read s':>10}")
+    for name, size, write_time, read_time in results:
+        print(f"{name:<12}{size / 1e6:>10.2f}{write_time:>10.3f}{read_time:>10.3f}")
+
+if __name__ == '__main__':
+    main()
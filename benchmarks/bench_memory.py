@@ -0,0 +1,66 @@
+"""
+Table Memory Benchmark
+Measures the peak memory (tracemalloc) of extracting and merging a language
+pair with plain {id: text} dicts and with the compact shared-index tables.
+
+    python -m benchmarks.bench_memory
+    python -m benchmarks.bench_memory --rows 500000
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.corpus import generate_corpus, table_rows
+from src.kcd_bilingual import BilingualPatcher
+
+LANGUAGES = ['Czech', 'Russian', 'English']
+# Rows per language that give a text_ui_dialog.xml of the game's size (~150k rows)
+DIALOG_SIZED_ROWS = 272000
+
+def extract_and_merge(paks, compact):
+    patcher = BilingualPatcher(jobs=1, compact=compact)
+    language_data = patcher._extract_all([paks['Czech'], paks['Russian']])
+    fallback_data = patcher._extract_fallbacks([paks['English']], language_data)
+    merged = patcher._merge_languages(language_data, fallback_data)
+    # Write the rows out so lazily combined texts are counted too
+    for rows in merged.values():
+        for _ in rows:
+            pass
+    return merged
+
+def measure(paks, compact):
+    """Peak traced bytes, merged row count and untraced seconds for one extract + merge"""
+    start = time.perf_counter()
+    extract_and_merge(paks, compact)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    tracemalloc.start()
+    merged = extract_and_merge(paks, compact)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak, sum(len(rows) for rows in merged.values()), elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the memory of the parsed tables')
+    parser.add_argument('--rows', type=int, default=DIALOG_SIZED_ROWS, help='Rows per language across all tables')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paks = {lang: str(path) for lang, path in generate_corpus(tmp, LANGUAGES, args.rows).items()}
+        # Keep the patcher's per-member messages out of the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = [(name, *measure(paks, compact)) for name, compact in (("dict", False), ("compact", True))]
+
+    print(f"text_ui_dialog.xml rows: {table_rows('text_ui_dialog.xml', args.rows)}")
+    print(f"{'tables':<10}{'rows':>9}{'peak MB':>10}{'seconds':>10}")
+    for name, peak, rows, elapsed in results:
+        print(f"{name:<10}{rows:>9}{peak / 1e6:>10.1f}{elapsed:>10.2f}")
+    print(f"Peak memory reduction: {1 - results[1][1] / results[0][1]:.0%}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Merge Benchmark
+Times BilingualPatcher._merge_table against the previous set-based merge on
+dialog-sized tables and checks that both produce the same rows.
+
+    python -m benchmarks.bench_merge
+    python -m benchmarks.bench_merge --rows 300000 --repeat 5
+"""
+
+import argparse
+import random
+import time
+from collections import defaultdict
+
+from src.kcd_bilingual import BilingualPatcher
+
+# Roughly the size of the game's text_ui_dialog.xml
+DIALOG_ROWS = 150000
+
+def legacy_merge_table(file_path, first_entries, second_entries, eng_entries, separator="/"):
+    """The set-union merge _merge_table replaced, kept as the reference"""
+    rows = []
+    stats = defaultdict(int)
+    all_ids = set(first_entries.keys()) | set(second_entries.keys())
+    for entry_id in all_ids:
+        primary_text = first_entries.get(entry_id, "MISSING")
+        secondary_text = second_entries.get(entry_id, "MISSING")
+        eng_text = eng_entries.get(entry_id, "MISSING")
+        if file_path == 'text_ui_menus.xml':
+            words_count = len(primary_text.split()) if primary_text != "MISSING" else 0
+            if words_count < 3:
+                combined_text = primary_text
+            else:
+                combined_text = f"{primary_text} {separator} {secondary_text}" if secondary_text != "MISSING" else primary_text
+        else:
+            combined_text = f"{primary_text} {separator} {secondary_text}" if secondary_text != "MISSING" else f"{primary_text} {separator} {eng_text}"
+            if secondary_text == "MISSING":
+                stats['replaced_with_eng'] += 1
+        rows.append((entry_id, primary_text, combined_text))
+        stats['total'] += 1
+        if primary_text == "MISSING": stats['missing_first'] += 1
+        if secondary_text == "MISSING": stats['missing_second'] += 1
+    return rows
+
+def language_tables(rows, seed=0):
+    """Primary, secondary and English tables with gaps and secondary-only IDs"""
+    rng = random.Random(seed)
+    words = ["Henry", "groschen", "sword", "Rattay", "horse", "the", "lord", "of", "Skalitz", "bandit"]
+    def text():
+        return " ".join(rng.choice(words) for _ in range(rng.randint(2, 20)))
+    ids = [f"dialog_{i:07d}" for i in range(rows)]
+    first = {entry_id: text() for entry_id in ids if rng.random() > 0.01}
+    second = {entry_id: text() for entry_id in ids if rng.random() > 0.05}
+    eng = {entry_id: text() for entry_id in ids}
+    return first, second, eng
+
+def best_of(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the table merge')
+    parser.add_argument('--rows', type=int, default=DIALOG_ROWS, help='Rows per language table')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per merge, best is reported')
+    args = parser.parse_args()
+
+    tables = language_tables(args.rows)
+    patcher = BilingualPatcher()
+    results = []
+    for file_path in ('text_ui_dialog.xml', 'text_ui_menus.xml'):
+        # The merged rows are combined lazily, so each run reads them all
+        columnar = list(patcher._merge_table(file_path, *tables))
+        legacy = legacy_merge_table(file_path, *tables, separator=patcher.separator)
+        if sorted(columnar) != sorted(legacy):
+            raise SystemExit(f"❌ {file_path}: merged rows differ from the reference merge")
+        legacy_s = best_of(lambda: legacy_merge_table(file_path, *tables, separator=patcher.separator), args.repeat)
+        columnar_s = best_of(lambda: list(patcher._merge_table(file_path, *tables)), args.repeat)
+        results.append((file_path, len(columnar), legacy_s, columnar_s))
+
+    print(f"{'table':<22}{'rows':>9}{'legacy s':>11}{'columnar s':>12}{'speedup':>9}")
+    for file_path, rows, legacy_s, columnar_s in results:
+        print(f"{file_path:<22}{rows:>9}{legacy_s:>11.3f}{columnar_s:>12.3f}{legacy_s / columnar_s:>8.2f}x")
+
+if __name__ == '__main__':
+    main()
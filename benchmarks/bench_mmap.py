@@ -0,0 +1,88 @@
+"""
+Memory-Mapped Reading Benchmark
+Compares reading the language PAKs through zipfile with reading them from the
+shared memory mappings, for stored and deflated PAKs. "read" pulls every member
+in the chunk size ElementTree uses; "extract" is the full _extract_pak.
+
+    python -m benchmarks.bench_mmap
+    python -m benchmarks.bench_mmap --rows 500000 --repeat 5
+"""
+
+import argparse
+import contextlib
+import io
+import tempfile
+import time
+import zipfile
+
+from benchmarks.corpus import generate_corpus
+from src.core.mapped_pak import shared_pool
+from src.kcd_bilingual import BilingualPatcher, _extract_pak
+
+LANGUAGES = ['Czech', 'Russian', 'English']
+# ElementTree.iterparse reads its source in chunks of this size
+READ_CHUNK = 16 * 1024
+
+def repack(paks, method):
+    """Rewrite the corpus PAKs with another compression method"""
+    for pak in paks:
+        tmp_path = pak.with_suffix('.tmp')
+        with zipfile.ZipFile(pak) as src, zipfile.ZipFile(tmp_path, 'w', method) as dst:
+            for info in src.infolist():
+                dst.writestr(info.filename, src.read(info))
+        tmp_path.replace(pak)
+
+def read_members(pak, mapped):
+    """Reads every member to the end; returns the bytes seen"""
+    total = 0
+    archive = shared_pool().get(pak) if mapped else zipfile.ZipFile(pak)
+    with archive:
+        for info in archive.infolist():
+            with archive.open(info) as f:
+                while True:
+                    data = f.read(READ_CHUNK)
+                    if not len(data):
+                        break
+                    total += len(data)
+    return total
+
+def best_of(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def run(rows, repeat):
+    files = BilingualPatcher().files_to_process
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        paks = list(generate_corpus(tmp, LANGUAGES, rows).values())
+        for name, method in (("stored", zipfile.ZIP_STORED), ("deflated", zipfile.ZIP_DEFLATED)):
+            repack(paks, method)
+            size = sum(pak.stat().st_size for pak in paks)
+            for mapped in (False, True):
+                read_s = best_of(lambda: [read_members(pak, mapped) for pak in paks], repeat)
+                extract_s = best_of(lambda: [_extract_pak(pak, files, mapped=mapped) for pak in paks], repeat)
+                results.append((name, "mmap" if mapped else "zipfile", size, read_s, extract_s))
+            shared_pool().close()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark memory-mapped PAK reading')
+    parser.add_argument('--rows', type=int, default=100000, help='Rows per language across all tables')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per setting, best is reported')
+    args = parser.parse_args()
+
+    # Keep the patcher's per-member messages out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = run(args.rows, args.repeat)
+
+    print(f"{'PAKs':<10}{'reader':<10}{'MB':>8}{'read s':>10}{'extract s':>12}")
+    for name, reader, size, read_s, extract_s in results:
+        print(f"{name:<10}{reader:<10}{size / 1e6:>8.1f}{read_s:>10.3f}{extract_s:>12.3f}")
+
+if __name__ == '__main__':
+    main()
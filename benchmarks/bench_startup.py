@@ -0,0 +1,104 @@
+"""
+GUI Startup Benchmark
+Measures time to first paint of the main window in a fresh interpreter and
+fails when it exceeds the budget. Game detection is slowed down on purpose,
+so a window that waits for detection before drawing blows the budget.
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 10 --budget 0.8
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+# Seconds from interpreter start to the first drawn window
+FIRST_PAINT_BUDGET = 1.0
+# Artificial delay added to game detection in the measured process
+DETECTION_DELAY = 3.0
+
+def _child(detection_delay):
+    """Runs in the measured interpreter: builds the GUI and reports its timings"""
+    start = time.perf_counter()
+    import tkinter as tk
+    from src.utils.path_finder import GamePathFinder
+
+    find_game_path = GamePathFinder.find_game_path
+
+    def slow_find_game_path(self, *args, **kwargs):
+        time.sleep(detection_delay)
+        return find_game_path(self, *args, **kwargs)
+
+    GamePathFinder.find_game_path = slow_find_game_path
+
+    from src.gui.main_window import BilingualModGUI
+    imported = time.perf_counter()
+
+    root = tk.Tk()
+    app = BilingualModGUI(root)
+    root.update()
+    painted = time.perf_counter()
+
+    # Wait for detection so the run also reports when languages show up
+    while not app.header.change_btn.instate(['!disabled']):
+        root.update()
+        time.sleep(0.01)
+    detected = time.perf_counter()
+    root.destroy()
+
+    print(json.dumps({
+        'import_s': round(imported - start, 4),
+        'first_paint_s': round(painted - start, 4),
+        'detected_s': round(detected - start, 4)
+    }))
+
+def measure(runs, detection_delay):
+    """Starts the GUI runs times in fresh interpreters and returns their timings"""
+    results = []
+    for _ in range(runs):
+        launched = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_startup', '--child', str(detection_delay)],
+            capture_output=True, text=True, check=True
+        ).stdout
+        timings = json.loads(output.strip().splitlines()[-1])
+        # Interpreter startup counts towards what the user waits for
+        timings['process_s'] = round(time.perf_counter() - launched, 4)
+        results.append(timings)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark GUI time to first paint')
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters to start')
+    parser.add_argument('--budget', type=float, default=FIRST_PAINT_BUDGET,
+                        help='Allowed median seconds to first paint')
+    parser.add_argument('--detection-delay', type=float, default=DETECTION_DELAY,
+                        help='Seconds added to game detection')
+    parser.add_argument('--child', type=float, metavar='DELAY', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        _child(args.child)
+        return
+
+    try:
+        results = measure(args.runs, args.detection_delay)
+    except subprocess.CalledProcessError as e:
+        print(f"Skipping startup benchmark, the GUI could not start:\n{e.stderr}", file=sys.stderr)
+        sys.exit(0)
+
+    for key in ('import_s', 'first_paint_s', 'detected_s'):
+        values = [r[key] for r in results]
+        print(f"{key:<16}median {statistics.median(values):.3f}s  max {max(values):.3f}s")
+
+    first_paint = statistics.median(r['first_paint_s'] for r in results)
+    if first_paint > args.budget:
+        print(f"\n❌ First paint took {first_paint:.3f}s (budget {args.budget:.3f}s)")
+        sys.exit(1)
+    print(f"\n✓ First paint within budget ({first_paint:.3f}s <= {args.budget:.3f}s)")
+
+if __name__ == '__main__':
+    main()
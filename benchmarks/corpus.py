@@ -0,0 +1,165 @@
+"""
+Synthetic Corpus Generator
+Creates realistic *_xml.pak localization files (Table/Row/Cell layout, the six
+text_ui_*.xml tables) for benchmarks and tests.
+
+    python -m benchmarks.corpus test_data/corpus --rows 200000 --languages Czech Russian Chinese English
+"""
+
+import argparse
+import math
+import random
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Share of a language's rows that goes into each table, roughly as in the game
+TABLE_WEIGHTS = {
+    'text_ui_dialog.xml': 0.55,
+    'text_ui_quest.xml': 0.12,
+    'text_ui_tutorials.xml': 0.03,
+    'text_ui_soul.xml': 0.08,
+    'text_ui_items.xml': 0.17,
+    'text_ui_menus.xml': 0.05
+}
+
+# Letters used to build words for each language's script
+ALPHABETS = {
+    'English': "etaoinshrdlucmfwypvbgkjqxz",
+    'German': "enisratdhulcgmobwfkzvüpäßjöyqx",
+    'French': "esaitnrulodcpméqvgfbhxèyjàzkêç",
+    'Italian': "eaionlrtscdupmvghfbqzàèìòù",
+    'Spanish': "eaosrnidlctumpbgvyqhfzjñxkáéíóú",
+    'Polish': "aioeznrwcstykdpmuljłbgęhąóżśćńź",
+    'Czech': "oeantvsilkrdpímuázjyěcbéhřýžčšůfgúňxťóďw",
+    'Russian': "оеаинтсрвлкмдпуяыьгзбчйхжшюцщэфъё",
+    'Ukrainian': "оаніветрсклдумпязбгчйхжшюцщєїфґ",
+    'Turkish': "aeinrlıdkmuytsbozşgçğvcphöüfj",
+    'Chinese': "的一是不了人我在有他这为之大来以个中上们到说国和地也子时道出而要于就下得可你年生",
+    'Japanese': "のにはをたがでてとしれさあいうえおかきくけこなるもすアイウエオカキクケコ日本人時",
+    'Korean': "이의가에는을를하고다지기리사자나로도어서한대마수아",
+}
+
+class _Vocabulary:
+    """Zipf-distributed words of one script, so common words repeat as in real text"""
+
+    SIZE = 4000
+
+    def __init__(self, rng: random.Random, alphabet: str, cjk: bool):
+        self.rng = rng
+        self.cjk = cjk
+        lengths = (1, 2) if cjk else (1, 9)
+        self.words = ["".join(rng.choice(alphabet) for _ in range(rng.randint(*lengths)))
+                      for _ in range(self.SIZE)]
+        total = 0.0
+        self.cum_weights = []
+        for rank in range(self.SIZE):
+            total += 1.0 / (rank + 1)
+            self.cum_weights.append(total)
+
+    def text(self, count: int) -> str:
+        words = self.rng.choices(self.words, cum_weights=self.cum_weights, k=count)
+        if self.cjk:
+            return "".join(words)
+        return " ".join(words).capitalize()
+
+def _escape(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+def table_rows(file_path: str, rows: int) -> int:
+    """Number of rows a table gets out of a language's total"""
+    return max(1, int(rows * TABLE_WEIGHTS.get(file_path, 0.1)))
+
+def write_language_pak(path: Path,
+                       language: str,
+                       rows: int,
+                       mean_words: float = 8.0,
+                       sigma: float = 0.9,
+                       missing_rate: float = 0.0,
+                       empty_rate: float = 0.0,
+                       seed: int = 0,
+                       tables: Optional[List[str]] = None):
+    """Write one language PAK.
+
+    Text lengths follow a log-normal word count around mean_words; missing_rate
+    drops whole rows and empty_rate leaves the text cell empty, both per row.
+    """
+    rng = random.Random(f"{seed}:{language}")
+    vocabulary = _Vocabulary(rng, ALPHABETS.get(language, ALPHABETS['English']),
+                             language in ('Chinese', 'Japanese'))
+    mu = math.log(max(mean_words, 1.0)) - sigma ** 2 / 2
+
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for file_path in tables or list(TABLE_WEIGHTS):
+            with zf.open(file_path, 'w') as f:
+                f.write(b'<Table>')
+                parts = []
+                for i in range(table_rows(file_path, rows)):
+                    if missing_rate and rng.random() < missing_rate:
+                        continue
+                    entry_id = f"{file_path[8:-4]}_{i:07d}"
+                    if empty_rate and rng.random() < empty_rate:
+                        text = ""
+                    else:
+                        count = max(1, int(rng.lognormvariate(mu, sigma)))
+                        text = _escape(vocabulary.text(count))
+                        # Markup and entities show up in real tables too
+                        if i % 97 == 0:
+                            text += _escape(" <b>&</b>")
+                    parts.append(f'<Row><Cell>{entry_id}</Cell><Cell>{entry_id}</Cell>'
+                                 f'<Cell>{text}</Cell></Row>')
+                    if len(parts) >= 4096:
+                        f.write("".join(parts).encode('utf-8'))
+                        parts.clear()
+                parts.append('</Table>')
+                f.write("".join(parts).encode('utf-8'))
+
+def generate_corpus(output_dir,
+                    languages: List[str],
+                    rows: int,
+                    mean_words: float = 8.0,
+                    sigma: float = 0.9,
+                    missing_rate: float = 0.02,
+                    empty_rate: float = 0.01,
+                    seed: int = 0) -> Dict[str, Path]:
+    """Write a fake game install (<output_dir>/Localization/<Language>_xml.pak)
+
+    The first language is complete; the others get the missing and empty rates.
+    Returns the PAK path of every language.
+    """
+    loc_path = Path(output_dir) / "Localization"
+    loc_path.mkdir(parents=True, exist_ok=True)
+    paks = {}
+    for index, language in enumerate(languages):
+        path = loc_path / f"{language}_xml.pak"
+        write_language_pak(
+            path, language, rows,
+            mean_words=mean_words,
+            sigma=sigma,
+            missing_rate=missing_rate if index else 0.0,
+            empty_rate=empty_rate if index else 0.0,
+            seed=seed
+        )
+        paks[language] = path
+    return paks
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic KCD localization corpus')
+    parser.add_argument('output', help='Folder to create the fake game installation in')
+    parser.add_argument('--languages', nargs='+', default=['Czech', 'Russian', 'English'],
+                        help=f"Languages to generate (scripts: {', '.join(ALPHABETS)})")
+    parser.add_argument('--rows', type=int, default=100000, help='Rows per language across all tables')
+    parser.add_argument('--mean-words', type=float, default=8.0, help='Mean words per text')
+    parser.add_argument('--sigma', type=float, default=0.9, help='Spread of the log-normal text length')
+    parser.add_argument('--missing-rate', type=float, default=0.02, help='Share of rows missing in non-primary languages')
+    parser.add_argument('--empty-rate', type=float, default=0.01, help='Share of empty texts in non-primary languages')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    args = parser.parse_args()
+
+    paks = generate_corpus(args.output, args.languages, args.rows, args.mean_words, args.sigma,
+                           args.missing_rate, args.empty_rate, args.seed)
+    for language, path in paks.items():
+        print(f"✓ {language}: {path} ({path.stat().st_size / 1e6:.1f} MB)")
+
+if __name__ == '__main__':
+    main()
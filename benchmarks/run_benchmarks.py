@@ -0,0 +1,186 @@
+"""
+Benchmark Suite
+Times _extract_data, _merge_data, _create_pak and ModGenerator.generate on
+synthetic corpora of several sizes and flags throughput or peak-memory
+regressions against stored baseline results.
+
+    python -m benchmarks.run_benchmarks                   # small and medium
+    python -m benchmarks.run_benchmarks --scales large    # 500k rows per language
+    python -m benchmarks.run_benchmarks --save-baseline   # accept current numbers
+    python run_tests.py --bench                           # unit tests, then small scale
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.corpus import generate_corpus
+from src.kcd_bilingual import BilingualPatcher
+
+# Rows per language across all six tables
+SCALES = {
+    'small': 5000,
+    'medium': 50000,
+    'large': 500000,
+    'huge': 2000000
+}
+DEFAULT_SCALES = ['small', 'medium']
+LANGUAGES = ['Czech', 'Russian', 'English']
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+# Allowed slowdown / memory growth before a phase is flagged
+TOLERANCE = 0.25
+
+def _measure(func, repeat, memory):
+    """Best wall time over repeat runs, plus traced peak memory of one extra run"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    peak = None
+    if memory:
+        # Traced separately: tracemalloc slows allocation-heavy code down
+        tracemalloc.start()
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return best, peak, result
+
+def _phase(seconds, peak, rows):
+    return {
+        'seconds': round(seconds, 4),
+        'rows': rows,
+        'rows_per_sec': round(rows / seconds) if seconds else None,
+        'peak_mb': round(peak / 2**20, 2) if peak is not None else None
+    }
+
+def bench_scale(rows, work_dir, repeat=3, memory=True):
+    """Run every phase on one corpus size and return {phase: metrics}"""
+    paks = generate_corpus(work_dir, LANGUAGES, rows)
+    first_pak, second_pak, eng_pak = [str(paks[lang]) for lang in LANGUAGES]
+    patcher = BilingualPatcher(jobs=1)
+    results = {}
+
+    seconds, peak, first_data = _measure(lambda: patcher._extract_data(first_pak, 1), repeat, memory)
+    extracted = sum(len(table) for table in first_data.values())
+    results['extract'] = _phase(seconds, peak, extracted)
+
+    second_data = patcher._extract_data(second_pak, 1)
+    eng_data = patcher._extract_data(eng_pak, 1)
+    seconds, peak, merged = _measure(
+        lambda: BilingualPatcher(jobs=1)._merge_data(first_data, second_data, eng_data), repeat, memory)
+    merged_rows = sum(len(table) for table in merged.values())
+    results['merge'] = _phase(seconds, peak, merged_rows)
+
+    output = str(Path(work_dir) / "out.pak")
+    seconds, peak, _ = _measure(lambda: patcher._create_pak(merged, output), repeat, memory)
+    results['create_pak'] = _phase(seconds, peak, merged_rows)
+
+    try:
+        from src.utils.mod_generator import ModGenerator
+    except ImportError as e:
+        print(f"Skipping generate: {e}", file=sys.stderr)
+        return results
+    generator = ModGenerator()
+    generator.base_dir = Path(work_dir) / "mod"
+    seconds, peak, _ = _measure(lambda: generator.generate(
+        game_path=Path(work_dir),
+        primary_lang=LANGUAGES[0],
+        secondary_lang=LANGUAGES[1],
+        selected_files=patcher.files_to_process,
+        use_cache=False,
+        # Every repeat writes the PAK instead of finding it unchanged
+        skip_unchanged=False
+    ), repeat, memory)
+    results['generate'] = _phase(seconds, peak, merged_rows)
+    return results
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """List regressions of results against baseline"""
+    regressions = []
+    for scale, phases in results.items():
+        for phase, metrics in phases.items():
+            base = baseline.get(scale, {}).get(phase)
+            if not base:
+                continue
+            if base.get('rows_per_sec') and metrics['rows_per_sec'] is not None \
+                    and metrics['rows_per_sec'] < base['rows_per_sec'] * (1 - tolerance):
+                regressions.append(f"{scale}/{phase}: throughput {metrics['rows_per_sec']} rows/s "
+                                   f"(baseline {base['rows_per_sec']})")
+            if base.get('peak_mb') and metrics['peak_mb'] is not None \
+                    and metrics['peak_mb'] > base['peak_mb'] * (1 + tolerance) + 1:
+                regressions.append(f"{scale}/{phase}: peak memory {metrics['peak_mb']} MB "
+                                   f"(baseline {base['peak_mb']} MB)")
+    return regressions
+
+def print_results(results):
+    print(f"{'scale':<8}{'phase':<12}{'rows':>10}{'seconds':>10}{'rows/s':>12}{'peak MB':>10}")
+    for scale, phases in results.items():
+        for phase, m in phases.items():
+            peak = f"{m['peak_mb']:.1f}" if m['peak_mb'] is not None else "-"
+            print(f"{scale:<8}{phase:<12}{m['rows']:>10}{m['seconds']:>10.3f}"
+                  f"{m['rows_per_sec'] or 0:>12}{peak:>10}")
+
+def run_suite(scales=None, repeat=3, memory=True, baseline_path=BASELINE_PATH,
+              save_baseline=False, output=None):
+    """Run the suite; returns 0, or 1 when a regression was found"""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in scales or DEFAULT_SCALES:
+            # Keep the patcher's per-member messages out of the report
+            with contextlib.redirect_stdout(io.StringIO()):
+                results[scale] = bench_scale(SCALES[scale], Path(tmp) / scale, repeat, memory)
+    print_results(results)
+
+    if output:
+        Path(output).write_text(json.dumps(results, indent=2), encoding='utf-8')
+
+    baseline_path = Path(baseline_path)
+    baseline = {}
+    if baseline_path.exists():
+        baseline = json.loads(baseline_path.read_text(encoding='utf-8'))
+
+    if save_baseline:
+        baseline.update(results)
+        baseline_path.write_text(json.dumps(baseline, indent=2), encoding='utf-8')
+        print(f"\n✓ Baseline saved: {baseline_path}")
+        return 0
+
+    if not baseline:
+        print(f"\nNo baseline at {baseline_path}; run with --save-baseline to create one")
+        return 0
+
+    regressions = compare(results, baseline)
+    if regressions:
+        print("\n❌ Regressions:")
+        for regression in regressions:
+            print(f"- {regression}")
+        return 1
+    print("\n✓ No regressions against baseline")
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the bilingual generator phases')
+    parser.add_argument('--scales', nargs='+', choices=list(SCALES), default=DEFAULT_SCALES,
+                        help='Corpus sizes to run (default: small medium)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per phase, best is reported')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the traced peak-memory runs')
+    parser.add_argument('--baseline', default=str(BASELINE_PATH), help='Baseline results file')
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the baseline')
+    parser.add_argument('--output', help='Also write the results to this JSON file')
+    args = parser.parse_args()
+
+    sys.exit(run_suite(args.scales, args.repeat, not args.no_memory, args.baseline,
+                       args.save_baseline, args.output))
+
+if __name__ == '__main__':
+    main()
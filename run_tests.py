@@ -16,7 +16,14 @@ def run_tests():
     result = runner.run(suite)
     
     # Return non-zero exit code if tests failed
-    return 0 if result.wasSuccessful() else 1
+    if not result.wasSuccessful():
+        return 1
+    
+    # Optionally follow up with the small-scale benchmark regression check
+    if '--bench' in sys.argv:
+        from benchmarks.run_benchmarks import run_suite
+        return run_suite(scales=['small'])
+    return 0
 
 if __name__ == '__main__':
     sys.exit(run_tests()) 
\ No newline at end of file
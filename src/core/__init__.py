@@ -0,0 +1,47 @@
+# Core helpers shared by the patcher: caching and PAK handling.
+# Submodules are imported on first attribute access (PEP 562), so the GUI can
+# use one helper without loading the rest.
+import importlib
+
+_EXPORTS = {
+    'ParseCache': '.cache',
+    'user_cache_dir': '.cache',
+    'InstallCache': '.install_cache',
+    'find_language_paks': '.languages',
+    'localization_dirs': '.languages',
+    'MappedPak': '.mapped_pak',
+    'MergePolicy': '.merge_policy',
+    'load_policies': '.merge_policy',
+    'MappedPakPool': '.mapped_pak',
+    'shared_pool': '.mapped_pak',
+    'RunMetrics': '.metrics',
+    'TimedWriter': '.metrics',
+    'peak_rss_bytes': '.metrics',
+    'ConsoleProgress': '.progress',
+    'ProgressEvent': '.progress',
+    'ProgressReporter': '.progress',
+    'CompactTable': '.tables',
+    'MergedRows': '.tables',
+    'TableSet': '.tables',
+    'BadPakError': '.pak_index',
+    'PakMember': '.pak_index',
+    'is_language_pak': '.pak_index',
+    'localization_tables': '.pak_index',
+    'read_pak_index': '.pak_index',
+    'COMPRESSION_METHODS': '.pakfile',
+    'CompressedMember': '.pakfile',
+    'read_raw_member': '.pakfile',
+    'write_raw_member': '.pakfile'
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,108 @@
+"""
+Parse Cache Module
+Keeps parsed localization tables on disk so unchanged PAK members are never re-parsed
+"""
+
+import hashlib
+import os
+import pickle
+import sys
+from pathlib import Path
+from typing import Optional
+
+APP_NAME = "KCDBilingualGenerator"
+
+def user_cache_dir() -> Path:
+    """Get the per-user cache directory for this application"""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / APP_NAME
+
+class ParseCache:
+    """Stores parsed {id: text} tables keyed by the zip member's name, CRC32 and size.
+
+    All three key parts come from the PAK's central directory, so a lookup never
+    needs to decompress anything. Entries are evicted least-recently-used first
+    once the cache grows past max_bytes.
+    """
+
+    # Bump when the layout of cached tables changes
+    FORMAT_VERSION = 1
+    DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+    SUFFIX = ".table"
+
+    def __init__(self, cache_dir=None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir) if cache_dir else user_cache_dir() / "tables"
+        self.max_bytes = max_bytes
+
+    def key(self, file_info) -> str:
+        """Build the cache key for a zipfile.ZipInfo"""
+        raw = f"{self.FORMAT_VERSION}:{file_info.filename}:{file_info.CRC:08x}:{file_info.file_size}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, file_info) -> Path:
+        return self.cache_dir / (self.key(file_info) + self.SUFFIX)
+
+    def get(self, file_info) -> Optional[dict]:
+        """Return the cached table for a PAK member, or None on a miss"""
+        path = self._entry_path(file_info)
+        try:
+            with open(path, "rb") as f:
+                table = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        try:
+            # Refresh the entry's age for LRU eviction
+            os.utime(path)
+        except OSError:
+            pass
+        return table
+
+    def put(self, file_info, table: dict):
+        """Store a parsed table and evict old entries if over the size cap"""
+        path = self._entry_path(file_info)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Write under a unique name first so concurrent workers never see partial files
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, "wb") as f:
+                pickle.dump(table, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+        self._evict()
+
+    def _evict(self):
+        """Delete least recently used entries until the cache fits max_bytes"""
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob("*" + self.SUFFIX):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self):
+        """Remove every cached table"""
+        if not self.cache_dir.exists():
+            return
+        for path in self.cache_dir.iterdir():
+            if path.name.endswith(self.SUFFIX) or path.name.endswith(".tmp"):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
@@ -0,0 +1,113 @@
+"""
+Install Cache Module
+Remembers detected game installations and their languages between launches
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .cache import user_cache_dir
+from .languages import find_language_paks, localization_dirs
+
+class InstallCache:
+    """Stores game installs with the language PAKs found in them.
+
+    Each install records the mtimes of its Data and localization folders and
+    the size of every *_xml.pak. An entry is trusted on the next launch only
+    while all of those still match, which costs a handful of stat calls
+    instead of registry queries, library parsing and directory globs.
+    """
+
+    # Bump when the layout of the cache file changes
+    FORMAT_VERSION = 1
+    FILENAME = "installs.json"
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else user_cache_dir() / self.FILENAME
+
+    def load(self) -> List[dict]:
+        """Cached installs, most recently used first"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return []
+        if not isinstance(data, dict) or data.get("version") != self.FORMAT_VERSION:
+            return []
+        return data.get("installs", [])
+
+    def save(self, installs: List[dict]):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": self.FORMAT_VERSION, "installs": installs}, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def snapshot(game_path, paks: Optional[Dict[str, Path]] = None) -> dict:
+        """Describe an install as it is on disk right now"""
+        if paks is None:
+            paks = find_language_paks(game_path)
+        dirs = {}
+        for folder in [Path(game_path)] + localization_dirs(game_path):
+            try:
+                dirs[str(folder)] = os.stat(folder).st_mtime_ns
+            except OSError:
+                dirs[str(folder)] = None
+        pak_sizes = {}
+        for lang, pak in paks.items():
+            try:
+                pak_sizes[lang] = [str(pak), os.stat(pak).st_size]
+            except OSError:
+                continue
+        return {"path": str(game_path), "dirs": dirs, "paks": pak_sizes}
+
+    @staticmethod
+    def is_valid(entry: dict) -> bool:
+        """Check an entry against the disk using only stat calls"""
+        try:
+            for folder, mtime in entry["dirs"].items():
+                try:
+                    current = os.stat(folder).st_mtime_ns
+                except OSError:
+                    current = None
+                if current != mtime:
+                    return False
+            for pak, size in entry["paks"].values():
+                if os.stat(pak).st_size != size:
+                    return False
+        except (OSError, KeyError, TypeError, ValueError):
+            return False
+        return (Path(entry["path"]) / "Data").exists()
+
+    def find(self, game_path) -> Optional[dict]:
+        """The cached entry for game_path, if it is still valid"""
+        for entry in self.load():
+            if entry.get("path") == str(game_path):
+                return entry if self.is_valid(entry) else None
+        return None
+
+    def first_valid(self) -> Optional[dict]:
+        """The most recently used install that is still valid"""
+        for entry in self.load():
+            if self.is_valid(entry):
+                return entry
+        return None
+
+    def remember(self, game_path, paks: Optional[Dict[str, Path]] = None) -> dict:
+        """Record the current state of an install and make it the preferred one"""
+        entry = self.snapshot(game_path, paks)
+        installs = [e for e in self.load() if e.get("path") != entry["path"]]
+        self.save([entry] + installs)
+        return entry
+
+    def clear(self):
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
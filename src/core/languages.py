@@ -0,0 +1,42 @@
+"""
+Languages Module
+Locates the localization PAKs of a game installation
+"""
+
+from pathlib import Path
+from typing import Dict, List
+
+from .pak_index import is_language_pak
+
+def localization_dirs(game_path) -> List[Path]:
+    """Folders of an installation that may hold *_xml.pak files"""
+    return [
+        Path(game_path) / "Data",
+        Path(game_path) / "Localization",
+        Path(game_path) / "Data" / "Localization"
+    ]
+
+def find_language_paks(game_path, validate: bool = True) -> Dict[str, Path]:
+    """Map each available language to its *_xml.pak (first folder wins)
+
+    With validate, a PAK only counts when its central directory lists at
+    least one localization table, so empty or broken files are skipped.
+    """
+    paks = {}
+    if not game_path:
+        return paks
+
+    for data_path in localization_dirs(game_path):
+        if not data_path.exists():
+            continue
+
+        try:
+            for file in sorted(data_path.glob("*_xml.pak")):
+                lang = file.stem.replace("_xml", "")
+                if lang in paks or (validate and not is_language_pak(file)):
+                    continue
+                paks[lang] = file
+        except OSError:
+            pass
+
+    return paks
@@ -0,0 +1,186 @@
+"""
+Mapped PAK Module
+Serves PAK members straight from a read-only memory mapping of the archive
+"""
+
+import mmap
+import os
+import struct
+import threading
+import zipfile
+import zlib
+from typing import List, Optional
+
+from .pak_index import PakMember, read_pak_index
+
+# Local file header: signature ... filename length, extra field length
+_LOCAL_HEADER = struct.Struct("<4s22xHH")
+_LOCAL_SIGNATURE = b"PK\x03\x04"
+
+class _ViewReader:
+    """Binary file over a stored member; reads return slices of the mapping without copying"""
+
+    def __init__(self, view: memoryview, member: PakMember):
+        self._view = view
+        self._member = member
+        self._pos = 0
+        self._crc = 0
+        self._size = 0
+
+    def read(self, size=-1):
+        end = len(self._view) if size is None or size < 0 else min(self._pos + size, len(self._view))
+        data = self._view[self._pos:end]
+        self._pos = end
+        self._check(data, end == len(self._view))
+        return data
+
+    def _check(self, data, eof):
+        """Verifies size and CRC once the whole member has been read, like zipfile does"""
+        self._crc = zlib.crc32(data, self._crc)
+        self._size += len(data)
+        if eof and (self._size != self._member.file_size or self._crc != self._member.CRC):
+            raise zipfile.BadZipFile(f"Bad CRC-32 for file {self._member.filename!r}")
+
+    def close(self):
+        self._view.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class _InflateReader(_ViewReader):
+    """Binary file that inflates a deflated member from its mapped bytes"""
+
+    # Compressed bytes handed to zlib per read
+    CHUNK = 64 * 1024
+
+    def __init__(self, view: memoryview, member: PakMember):
+        super().__init__(view, member)
+        self._inflater = zlib.decompressobj(-zlib.MAX_WBITS)
+        self._eof = False
+
+    def read(self, size=-1):
+        if size == 0:
+            return b""
+        limit = 0 if size is None or size < 0 else size
+        parts = []
+        got = 0
+        while not self._eof and (not limit or got < limit):
+            if self._inflater.unconsumed_tail:
+                data = self._inflater.decompress(self._inflater.unconsumed_tail, limit - got if limit else 0)
+            elif self._pos < len(self._view):
+                chunk = self._view[self._pos:self._pos + self.CHUNK]
+                self._pos += len(chunk)
+                data = self._inflater.decompress(chunk, limit - got if limit else 0)
+            else:
+                data = self._inflater.flush()
+                self._eof = True
+            self._eof = self._eof or self._inflater.eof
+            parts.append(data)
+            got += len(data)
+        data = b"".join(parts)
+        self._check(data, self._eof)
+        return data
+
+class MappedPak:
+    """A PAK mapped into memory once; members are read from the mapping.
+
+    Mirrors the parts of zipfile.ZipFile the patcher uses (infolist, open and
+    the context manager), so extraction code works with either. Leaving the
+    with-block keeps the mapping open for the next reader; MappedPakPool.close
+    releases it.
+    """
+
+    def __init__(self, pak_path):
+        self.path = os.path.abspath(pak_path)
+        self.index = read_pak_index(pak_path)
+        stat = os.stat(pak_path)
+        self.signature = (stat.st_size, stat.st_mtime_ns)
+        with open(pak_path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+
+    def infolist(self) -> List[PakMember]:
+        return list(self.index.values())
+
+    def member_view(self, member: PakMember) -> memoryview:
+        """The member's bytes as stored in the PAK (zero-copy)"""
+        offset = member.header_offset
+        signature, name_length, extra_length = _LOCAL_HEADER.unpack_from(self._view, offset)
+        if signature != _LOCAL_SIGNATURE:
+            raise zipfile.BadZipFile(f"Bad local header for {member.filename}")
+        start = offset + _LOCAL_HEADER.size + name_length + extra_length
+        if start + member.compress_size > len(self._view):
+            raise zipfile.BadZipFile(f"Truncated member {member.filename}")
+        return self._view[start:start + member.compress_size]
+
+    def open(self, member: PakMember):
+        """Binary reader over a member; stored members are served without copying"""
+        view = self.member_view(member)
+        if member.compress_type == zipfile.ZIP_STORED:
+            return _ViewReader(view, member)
+        if member.compress_type == zipfile.ZIP_DEFLATED:
+            return _InflateReader(view, member)
+        view.release()
+        raise NotImplementedError(f"Compression method {member.compress_type} is not supported")
+
+    def close(self):
+        self._view.release()
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+class MappedPakPool:
+    """Keeps one mapping per PAK so repeated and parallel extractions share it.
+
+    A mapping is replaced when the file's size or mtime changes. While mapped,
+    a PAK stays open (on Windows it cannot be replaced), so long-running
+    embedders should call close() when they are done.
+    """
+
+    def __init__(self):
+        self._paks = {}
+        self._lock = threading.Lock()
+
+    def get(self, pak_path) -> MappedPak:
+        path = os.path.abspath(pak_path)
+        stat = os.stat(path)
+        with self._lock:
+            pak = self._paks.get(path)
+            if pak is not None and pak.signature != (stat.st_size, stat.st_mtime_ns):
+                self._release(pak)
+                pak = None
+            if pak is None:
+                pak = self._paks[path] = MappedPak(path)
+            return pak
+
+    @staticmethod
+    def _release(pak):
+        try:
+            pak.close()
+        except BufferError:
+            # A reader still holds a slice; the mapping goes away with it
+            pass
+
+    def close(self):
+        with self._lock:
+            for pak in self._paks.values():
+                self._release(pak)
+            self._paks.clear()
+
+_shared_pool: Optional[MappedPakPool] = None
+_shared_pool_lock = threading.Lock()
+
+def shared_pool() -> MappedPakPool:
+    """The process-wide pool, shared by every patcher and worker in this process"""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = MappedPakPool()
+        return _shared_pool
@@ -0,0 +1,164 @@
+"""
+Merge Policy Module
+Per-table rules for combining languages, compiled once per table into a combine function
+"""
+
+import json
+import os
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+MISSING = "MISSING"
+
+class MergePolicy:
+    """How the languages of one table are combined
+
+    combine: False writes the primary text alone
+    min_words: primary texts with fewer words stay primary-only
+    separator: text between the languages, with a space on each side
+        (None = the run's separator)
+    fallbacks: language names tried in this order for texts the other
+        languages lack (None = the run's fallback chain, empty = never)
+    skip_missing: leave languages without a text out instead of writing MISSING
+    """
+
+    __slots__ = ('combine', 'min_words', 'separator', 'fallbacks', 'skip_missing')
+
+    def __init__(self, combine: bool = True, min_words: int = 0, separator: Optional[str] = None,
+                 fallbacks: Optional[Sequence[str]] = None, skip_missing: bool = False):
+        self.combine = combine
+        self.min_words = min_words
+        self.separator = separator
+        self.fallbacks = None if fallbacks is None else tuple(fallbacks)
+        self.skip_missing = skip_missing
+
+    @classmethod
+    def from_dict(cls, values: dict, base: 'MergePolicy' = None) -> 'MergePolicy':
+        """Policy from config values; keys left out keep base's settings"""
+        if not isinstance(values, dict):
+            raise ValueError(f"expected an object, got {type(values).__name__}")
+        unknown = set(values) - set(cls.__slots__)
+        if unknown:
+            raise ValueError(f"unknown setting(s): {', '.join(sorted(unknown))}")
+        settings = (base or cls()).to_dict()
+        settings.update(values)
+        checks = {
+            'combine': lambda v: isinstance(v, bool),
+            'min_words': lambda v: isinstance(v, int) and not isinstance(v, bool) and v >= 0,
+            'separator': lambda v: v is None or isinstance(v, str),
+            'fallbacks': lambda v: v is None or (isinstance(v, (list, tuple)) and all(isinstance(n, str) for n in v)),
+            'skip_missing': lambda v: isinstance(v, bool)
+        }
+        for name, check in checks.items():
+            if not check(settings[name]):
+                raise ValueError(f"invalid value for {name}: {settings[name]!r}")
+        return cls(**settings)
+
+    def to_dict(self) -> dict:
+        return {
+            'combine': self.combine,
+            'min_words': self.min_words,
+            'separator': self.separator,
+            'fallbacks': None if self.fallbacks is None else list(self.fallbacks),
+            'skip_missing': self.skip_missing
+        }
+
+    def key(self) -> str:
+        """Stable text form, part of the output fingerprints"""
+        return json.dumps(self.to_dict(), sort_keys=True, separators=(',', ':'))
+
+    def __eq__(self, other):
+        return isinstance(other, MergePolicy) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"MergePolicy({self.key()})"
+
+    @property
+    def uses_fallbacks(self) -> bool:
+        return self.combine and self.fallbacks != ()
+
+    def fallback_chain(self, names: Sequence[Optional[str]]) -> List[int]:
+        """Positions in the run's fallback chain (named by names) to try, in order"""
+        if not self.uses_fallbacks:
+            return []
+        if self.fallbacks is None:
+            return list(range(len(names)))
+        positions = {name.lower(): position for position, name in enumerate(names) if name}
+        return [positions[name.lower()] for name in dict.fromkeys(self.fallbacks) if name.lower() in positions]
+
+    def combiner(self, separator: str) -> Callable[..., Iterable[str]]:
+        """The combine function for this policy: combine(primary, *others) -> combined texts
+
+        separator is the run's; it is used unless the policy has its own.
+        """
+        joiner = f" {separator if self.separator is None else self.separator} "
+        if not self.combine:
+            return _primary_only
+        if self.min_words:
+            return partial(_join_long if not self.skip_missing else _join_long_present,
+                           joiner, self.min_words)
+        return partial(_join_all if not self.skip_missing else _join_present, joiner)
+
+# The combine functions are module level so they pickle for worker processes
+
+def _primary_only(primary, *others):
+    return primary
+
+def _join_all(joiner, primary, *others):
+    return map(joiner.join, zip(primary, *others))
+
+def _join_present(joiner, primary, *others):
+    if len(others) == 1:
+        return (p if s == MISSING else p + joiner + s for p, s in zip(primary, others[0]))
+    return (joiner.join([p] + [text for text in texts if text != MISSING])
+            for p, *texts in zip(primary, *others))
+
+def _join_long(joiner, min_words, primary, *others):
+    # split() stops after min_words pieces; only the count below min_words matters
+    limit = min_words - 1
+    return (p if len(p.split(None, limit)) < min_words else joiner.join([p, *texts])
+            for p, *texts in zip(primary, *others))
+
+def _join_long_present(joiner, min_words, primary, *others):
+    limit = min_words - 1
+    if len(others) == 1:
+        return (p if s == MISSING or len(p.split(None, limit)) < min_words else p + joiner + s
+                for p, s in zip(primary, others[0]))
+    return (p if len(p.split(None, limit)) < min_words
+            else joiner.join([p] + [text for text in texts if text != MISSING])
+            for p, *texts in zip(primary, *others))
+
+DEFAULT_POLICY = MergePolicy()
+
+# Short menu labels stay primary-only; longer ones get the other languages
+# that have them, never a fallback
+DEFAULT_POLICIES: Dict[str, MergePolicy] = {
+    'text_ui_menus.xml': MergePolicy(min_words=3, fallbacks=(), skip_missing=True)
+}
+
+def load_policies(source) -> Dict[str, MergePolicy]:
+    """Table policies from a JSON file (or an already parsed dict) on top of the defaults
+
+    The JSON maps table names to settings, e.g.
+    {"text_ui_items.xml": {"min_words": 2, "fallbacks": ["German", "English"]}}.
+    Settings left out keep the table's default policy. Raises ValueError on
+    unreadable files, tables that are not text_ui_*.xml or invalid settings.
+    """
+    config = source
+    if isinstance(source, (str, os.PathLike)):
+        try:
+            config = json.loads(Path(source).read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            raise ValueError(f"Cannot read merge policies from {source}: {e}")
+    if not isinstance(config, dict):
+        raise ValueError("Merge policies must map table names to settings")
+    policies = dict(DEFAULT_POLICIES)
+    for file_path, values in config.items():
+        if not (file_path.startswith('text_ui_') and file_path.endswith('.xml')):
+            raise ValueError(f"Merge policy for '{file_path}': not a text_ui_*.xml table")
+        try:
+            policies[file_path] = MergePolicy.from_dict(values, DEFAULT_POLICIES.get(file_path))
+        except ValueError as e:
+            raise ValueError(f"Merge policy for '{file_path}': {e}")
+    return policies
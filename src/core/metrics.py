@@ -0,0 +1,163 @@
+"""
+Metrics Module
+Records wall/CPU time per phase, per-table throughput and peak memory of a generation run
+"""
+
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident memory of the current process, or None if unavailable"""
+    try:
+        import resource
+    except ImportError:
+        return _windows_peak_rss()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def _windows_peak_rss() -> Optional[int]:
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        get_process = ctypes.windll.kernel32.GetCurrentProcess
+        get_process.restype = wintypes.HANDLE
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(
+                get_process(), ctypes.byref(counters), counters.cb):
+            return None
+        return counters.PeakWorkingSetSize
+    except Exception:
+        return None
+
+class TimedWriter:
+    """Passes writes through to a file while timing them.
+
+    Wrapped around a compressing sink it separates time spent compressing from
+    time spent producing the data.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.wall_s = 0.0
+        self.cpu_s = 0.0
+        self.bytes = 0
+
+    def write(self, data):
+        wall, cpu = time.perf_counter(), time.thread_time()
+        self.f.write(data)
+        self.wall_s += time.perf_counter() - wall
+        self.cpu_s += time.thread_time() - cpu
+        self.bytes += len(data)
+        return len(data)
+
+class RunMetrics:
+    """Collects the phases, table counters and peak memory of one run.
+
+    Phases are recorded with wall time and the CPU time of the thread that ran
+    them, labelled with the table and PAK they worked on. Worker processes fill
+    their own RunMetrics and the parent absorbs their snapshots.
+    """
+
+    def __init__(self):
+        self.phases = []
+        self.tables = {}
+        self.worker_peak_rss = 0
+        self._lock = threading.Lock()
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+
+    @contextmanager
+    def phase(self, name: str, **labels):
+        """Time the enclosed block as one phase"""
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            self.add_phase(name, time.perf_counter() - wall, time.thread_time() - cpu, **labels)
+
+    def add_phase(self, name: str, wall_s: float, cpu_s: float, **labels):
+        record = {'phase': name}
+        record.update(labels)
+        record['wall_s'] = round(wall_s, 6)
+        record['cpu_s'] = round(cpu_s, 6)
+        with self._lock:
+            self.phases.append(record)
+
+    def count(self, table: str, **counters):
+        """Add to the counters (rows, bytes in/out, ...) of a table"""
+        with self._lock:
+            entry = self.tables.setdefault(table, {})
+            for key, value in counters.items():
+                entry[key] = entry.get(key, 0) + value
+
+    def snapshot(self) -> dict:
+        """Picklable state for handing metrics back from a worker process"""
+        with self._lock:
+            return {
+                'phases': list(self.phases),
+                'tables': {table: dict(counters) for table, counters in self.tables.items()},
+                'peak_rss_bytes': peak_rss_bytes() or 0
+            }
+
+    def absorb(self, snapshot: dict):
+        """Merge a worker's snapshot into this run"""
+        with self._lock:
+            self.phases.extend(snapshot['phases'])
+            self.worker_peak_rss = max(self.worker_peak_rss, snapshot['peak_rss_bytes'])
+        for table, counters in snapshot['tables'].items():
+            self.count(table, **counters)
+
+    def report(self, stats=None) -> dict:
+        """Machine-readable summary of the run"""
+        phase_totals = {}
+        table_wall = {}
+        for record in self.phases:
+            totals = phase_totals.setdefault(record['phase'], {'wall_s': 0.0, 'cpu_s': 0.0, 'count': 0})
+            totals['wall_s'] += record['wall_s']
+            totals['cpu_s'] += record['cpu_s']
+            totals['count'] += 1
+            if 'table' in record:
+                table_wall[record['table']] = table_wall.get(record['table'], 0.0) + record['wall_s']
+
+        tables = {}
+        for table, counters in self.tables.items():
+            entry = dict(counters)
+            seconds = table_wall.get(table)
+            if seconds and entry.get('rows'):
+                entry['rows_per_sec'] = round(entry['rows'] / seconds)
+            tables[table] = entry
+
+        for totals in phase_totals.values():
+            totals['wall_s'] = round(totals['wall_s'], 6)
+            totals['cpu_s'] = round(totals['cpu_s'], 6)
+
+        return {
+            'wall_s': round(time.perf_counter() - self._wall_start, 6),
+            'cpu_s': round(time.process_time() - self._cpu_start, 6),
+            'peak_rss_bytes': peak_rss_bytes(),
+            'worker_peak_rss_bytes': self.worker_peak_rss or None,
+            'phase_totals': phase_totals,
+            'tables': tables,
+            'phases': list(self.phases),
+            'stats': dict(stats or {})
+        }
@@ -0,0 +1,177 @@
+"""
+PAK Index Module
+Reads the member list of a PAK from its zip central directory only, without
+decompressing anything or importing zipfile
+"""
+
+import os
+import struct
+import threading
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional
+
+# End of central directory record and its ZIP64 counterparts
+_EOCD = struct.Struct("<4s4H2LH")
+_EOCD_SIGNATURE = b"PK\x05\x06"
+_EOCD64_LOCATOR = struct.Struct("<4sLQL")
+_EOCD64_LOCATOR_SIGNATURE = b"PK\x06\x07"
+_EOCD64 = struct.Struct("<4sQ2H2L4Q")
+_EOCD64_SIGNATURE = b"PK\x06\x06"
+# Central directory file header (same layout as zipfile.structCentralDir)
+_CENTRAL_DIR = struct.Struct("<4s4B4HL2L5H2L")
+_CENTRAL_DIR_SIGNATURE = b"PK\x01\x02"
+_MAX_COMMENT = 0xFFFF
+_ZIP64_EXTRA = 0x0001
+
+# Tables the patcher knows how to merge
+TABLE_PREFIX = "text_ui_"
+
+class BadPakError(ValueError):
+    """Raised when a file has no readable zip central directory"""
+
+class PakMember(NamedTuple):
+    """Central directory entry of one member, named like zipfile.ZipInfo's fields"""
+    filename: str
+    compress_type: int
+    CRC: int
+    compress_size: int
+    file_size: int
+    header_offset: int
+
+def _read_eocd(f, file_size):
+    """Locate the central directory: returns (offset, size, entries, archive start)"""
+    tail_size = min(file_size, _EOCD.size + _MAX_COMMENT)
+    f.seek(file_size - tail_size)
+    tail = f.read(tail_size)
+    pos = tail.rfind(_EOCD_SIGNATURE)
+    if pos < 0 or len(tail) - pos < _EOCD.size:
+        raise BadPakError("End of central directory not found")
+    eocd_pos = file_size - tail_size + pos
+    _, _, _, _, entries, cd_size, cd_offset, _ = _EOCD.unpack_from(tail, pos)
+
+    if entries == 0xFFFF or cd_size == 0xFFFFFFFF or cd_offset == 0xFFFFFFFF:
+        locator_pos = eocd_pos - _EOCD64_LOCATOR.size
+        if locator_pos - _EOCD64.size < 0:
+            raise BadPakError("ZIP64 locator not found")
+        f.seek(locator_pos)
+        signature, _, eocd64_offset, _ = _EOCD64_LOCATOR.unpack(f.read(_EOCD64_LOCATOR.size))
+        if signature != _EOCD64_LOCATOR_SIGNATURE:
+            raise BadPakError("ZIP64 locator not found")
+        f.seek(locator_pos - _EOCD64.size)
+        record = f.read(_EOCD64.size)
+        if len(record) != _EOCD64.size or record[:4] != _EOCD64_SIGNATURE:
+            raise BadPakError("ZIP64 end of central directory not found")
+        _, _, _, _, _, _, _, entries, cd_size, cd_offset = _EOCD64.unpack(record)
+        eocd_pos = locator_pos - _EOCD64.size
+
+    # Data prepended to the archive shifts every offset (as zipfile allows)
+    start = eocd_pos - cd_size - cd_offset
+    if start < 0:
+        raise BadPakError("Central directory offset out of range")
+    return start + cd_offset, cd_size, entries, start
+
+def _zip64_sizes(extra, file_size, compress_size, header_offset):
+    """Replace 0xFFFFFFFF placeholders with the values from the ZIP64 extra field"""
+    pos = 0
+    while pos + 4 <= len(extra):
+        field_id, length = struct.unpack_from("<2H", extra, pos)
+        if field_id == _ZIP64_EXTRA:
+            values = list(struct.unpack_from(f"<{length // 8}Q", extra, pos + 4))
+            if file_size == 0xFFFFFFFF and values:
+                file_size = values.pop(0)
+            if compress_size == 0xFFFFFFFF and values:
+                compress_size = values.pop(0)
+            if header_offset == 0xFFFFFFFF and values:
+                header_offset = values.pop(0)
+            break
+        pos += 4 + length
+    return file_size, compress_size, header_offset
+
+def _parse_index(pak_path) -> Dict[str, PakMember]:
+    with open(pak_path, "rb") as f:
+        file_size = os.fstat(f.fileno()).st_size
+        cd_pos, cd_size, entries, start = _read_eocd(f, file_size)
+        f.seek(cd_pos)
+        data = f.read(cd_size)
+    if len(data) != cd_size:
+        raise BadPakError("Truncated central directory")
+
+    members = {}
+    pos = 0
+    for _ in range(entries):
+        if pos + _CENTRAL_DIR.size > len(data):
+            raise BadPakError("Truncated central directory")
+        fields = _CENTRAL_DIR.unpack_from(data, pos)
+        if fields[0] != _CENTRAL_DIR_SIGNATURE:
+            raise BadPakError("Bad central directory entry")
+        flag_bits, compress_type = fields[5], fields[6]
+        crc, compress_size, file_size = fields[9], fields[10], fields[11]
+        name_length, extra_length, comment_length = fields[12], fields[13], fields[14]
+        header_offset = fields[18]
+        pos += _CENTRAL_DIR.size
+        raw_name = data[pos:pos + name_length]
+        extra = data[pos + name_length:pos + name_length + extra_length]
+        pos += name_length + extra_length + comment_length
+
+        name = raw_name.decode("utf-8" if flag_bits & 0x800 else "cp437")
+        file_size, compress_size, header_offset = _zip64_sizes(extra, file_size, compress_size, header_offset)
+        members[name] = PakMember(name, compress_type, crc, compress_size, file_size,
+                                  start + header_offset)
+    return members
+
+# Parsed indexes keyed by path, size and mtime, so a changed PAK is re-read
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_CACHE_ENTRIES = 64
+
+def read_pak_index(pak_path) -> Dict[str, PakMember]:
+    """Map member names to their central directory entries (cached while the file is unchanged)"""
+    stat = os.stat(pak_path)
+    key = (os.path.abspath(pak_path), stat.st_size, stat.st_mtime_ns)
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    try:
+        index = _parse_index(pak_path)
+    except struct.error as e:
+        raise BadPakError(str(e))
+    with _cache_lock:
+        _cache[key] = index
+        while len(_cache) > _CACHE_ENTRIES:
+            _cache.popitem(last=False)
+    return index
+
+def localization_tables(pak_path) -> Optional[Dict[str, PakMember]]:
+    """The text_ui_*.xml tables of a PAK, or None if it is not a readable zip"""
+    try:
+        index = read_pak_index(pak_path)
+    except (OSError, BadPakError):
+        return None
+    return {name: member for name, member in index.items()
+            if name.startswith(TABLE_PREFIX) and name.endswith(".xml")}
+
+def is_language_pak(pak_path) -> bool:
+    """True if the file is a zip holding at least one localization table"""
+    return bool(localization_tables(pak_path))
+
+def format_size(size: int) -> str:
+    """Human-readable byte count"""
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+def describe_tables(pak_path, files: List[str]) -> List[str]:
+    """One line per requested table: its size, or that the PAK lacks it"""
+    tables = localization_tables(pak_path) or {}
+    lines = []
+    for file_path in files:
+        member = tables.get(file_path)
+        if member:
+            lines.append(f"{file_path:<24}{format_size(member.file_size):>10}"
+                         f"  ({format_size(member.compress_size)} packed)")
+        else:
+            lines.append(f"{file_path:<24}{'missing':>10}")
+    return lines
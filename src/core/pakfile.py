@@ -0,0 +1,137 @@
+"""
+PAK File Module
+Low-level helpers for compressing PAK (zip) members and moving them between archives
+"""
+
+import struct
+import sys
+import zipfile
+import zlib
+
+# Compression methods the game's PAK reader understands
+COMPRESSION_METHODS = {
+    "stored": zipfile.ZIP_STORED,
+    "deflated": zipfile.ZIP_DEFLATED
+}
+
+# Local file header: signature ... filename length, extra field length
+_LOCAL_HEADER = struct.Struct("<4s22xHH")
+_LOCAL_SIGNATURE = b"PK\x03\x04"
+
+def read_raw_member(pak_path, info: zipfile.ZipInfo) -> bytes:
+    """Read a member's compressed bytes exactly as stored, without inflating them"""
+    with open(pak_path, "rb") as f:
+        f.seek(info.header_offset)
+        signature, name_length, extra_length = _LOCAL_HEADER.unpack(f.read(_LOCAL_HEADER.size))
+        if signature != _LOCAL_SIGNATURE:
+            raise zipfile.BadZipFile(f"Bad local header for {info.filename}")
+        f.seek(name_length + extra_length, 1)
+        data = f.read(info.compress_size)
+    if len(data) != info.compress_size:
+        raise zipfile.BadZipFile(f"Truncated member {info.filename}")
+    return data
+
+# ZipFile internals write_raw_member appends through; checked on CPython 3.8 to 3.13
+# (tests/test_pakfile.py). Other versions take the writestr() path.
+_RAW_WRITE_VERSIONS = ((3, 8), (3, 13))
+_RAW_WRITE_ATTRS = ("_lock", "_writing", "_writecheck", "_didModify", "start_dir", "fp", "filelist", "NameToInfo")
+
+def _can_write_raw(zf: zipfile.ZipFile) -> bool:
+    first, last = _RAW_WRITE_VERSIONS
+    return first <= sys.version_info[:2] <= last and all(hasattr(zf, attr) for attr in _RAW_WRITE_ATTRS)
+
+def write_raw_member(zf: zipfile.ZipFile, info: zipfile.ZipInfo, data: bytes, compresslevel=None):
+    """Append an already-compressed member to a ZipFile opened for writing.
+
+    info must carry the CRC, sizes and compression method that describe data.
+    This mirrors what ZipFile.writestr does for directories, which also writes
+    the header and payload straight to the archive. Where the ZipFile internals
+    this needs are not known to match, the member is inflated and written with
+    writestr() at compresslevel instead, on the calling thread; the archive is
+    equivalent, but deflated bytes may differ.
+    """
+    zinfo = zipfile.ZipInfo(info.filename, info.date_time)
+    zinfo.compress_type = info.compress_type
+    zinfo.CRC = info.CRC
+    zinfo.compress_size = info.compress_size
+    zinfo.file_size = info.file_size
+    zinfo.external_attr = info.external_attr
+    zinfo.create_system = info.create_system
+    zinfo.comment = info.comment
+    # Sizes are known up front, so no data descriptor follows the payload
+    zinfo.flag_bits = info.flag_bits & ~0x08
+
+    if not _can_write_raw(zf):
+        _write_inflated(zf, zinfo, data, compresslevel)
+        return
+    with zf._lock:
+        if zf._writing:
+            raise ValueError("Can't write to ZIP archive while an open writing handle exists")
+        zf._writecheck(zinfo)
+        zf._didModify = True
+        zf.fp.seek(zf.start_dir)
+        zinfo.header_offset = zf.fp.tell()
+        zf.fp.write(zinfo.FileHeader())
+        zf.fp.write(data)
+        zf.start_dir = zf.fp.tell()
+        zf.filelist.append(zinfo)
+        zf.NameToInfo[zinfo.filename] = zinfo
+
+def _write_inflated(zf: zipfile.ZipFile, zinfo: zipfile.ZipInfo, data: bytes, compresslevel=None):
+    """write_raw_member through the public API: recompresses the member"""
+    if zinfo.compress_type == zipfile.ZIP_DEFLATED:
+        data = zlib.decompress(data, -15)
+    elif zinfo.compress_type != zipfile.ZIP_STORED:
+        raise NotImplementedError(f"Unsupported compression method {zinfo.compress_type}")
+    if zlib.crc32(data) != zinfo.CRC or len(data) != zinfo.file_size:
+        raise zipfile.BadZipFile(f"Bad CRC-32 for file {zinfo.filename!r}")
+    zf.writestr(zinfo, data, compresslevel=compresslevel)
+
+class CompressedMember:
+    """Write-only file object that compresses one member in memory.
+
+    Rows can be streamed into it like into ZipFile.open(..., 'w'); once closed,
+    info holds the CRC and sizes and data the compressed bytes, ready for
+    write_raw_member. Compressing this way lets several members be deflated on
+    different threads, since zlib releases the GIL.
+    """
+
+    def __init__(self, info: zipfile.ZipInfo, compresslevel=None):
+        self.info = info
+        self.data = b""
+        self._chunks = []
+        self._crc = 0
+        self._size = 0
+        if info.compress_type == zipfile.ZIP_DEFLATED:
+            level = zlib.Z_DEFAULT_COMPRESSION if compresslevel is None else compresslevel
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+        elif info.compress_type == zipfile.ZIP_STORED:
+            self._compressor = None
+        else:
+            raise NotImplementedError(f"Unsupported compression method {info.compress_type}")
+
+    def write(self, data):
+        self._crc = zlib.crc32(data, self._crc)
+        self._size += len(data)
+        chunk = self._compressor.compress(data) if self._compressor else bytes(data)
+        if chunk:
+            self._chunks.append(chunk)
+        return len(data)
+
+    def close(self):
+        if self._chunks is None:
+            return
+        if self._compressor:
+            self._chunks.append(self._compressor.flush())
+            self._compressor = None
+        self.data = b"".join(self._chunks)
+        self._chunks = None
+        self.info.CRC = self._crc
+        self.info.file_size = self._size
+        self.info.compress_size = len(self.data)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
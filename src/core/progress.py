@@ -0,0 +1,137 @@
+"""
+Progress Module
+Throttled progress events emitted while a PAK is extracted, merged and written
+"""
+
+import sys
+import threading
+import time
+from typing import Callable, Optional
+
+class ProgressEvent:
+    """One progress notification.
+
+    kind is "start", "progress" or "finish"; phase is "run", "extract", "merge"
+    or "write"; done and total count unit ("bytes", "rows" or "tables") and
+    total is None when unknown.
+    """
+
+    __slots__ = ('kind', 'phase', 'table', 'pak', 'done', 'total', 'unit', 'elapsed')
+
+    def __init__(self, kind, phase, table=None, pak=None, done=0, total=None, unit=None, elapsed=0.0):
+        self.kind = kind
+        self.phase = phase
+        self.table = table
+        self.pak = pak
+        self.done = done
+        self.total = total
+        self.unit = unit
+        self.elapsed = elapsed
+
+    @property
+    def fraction(self) -> Optional[float]:
+        if not self.total:
+            return None
+        return min(1.0, self.done / self.total)
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"ProgressEvent({self.as_dict()!r})"
+
+class ProgressReporter:
+    """Delivers progress events to a listener, throttling the "progress" ones.
+
+    start and finish events always reach the listener; progress events are
+    dropped when the previous one went out less than interval seconds ago.
+    Without a listener every call returns right away, and callers check
+    enabled before doing any per-chunk bookkeeping.
+    """
+
+    def __init__(self, listener: Optional[Callable[[ProgressEvent], None]] = None, interval: float = 0.1):
+        self.listener = listener
+        self.enabled = listener is not None
+        self.interval = interval
+        self._last = 0.0
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def start(self, phase, table=None, pak=None, total=None, unit=None):
+        if self.enabled:
+            self._send(ProgressEvent('start', phase, table, pak, 0, total, unit))
+
+    def update(self, phase, done, table=None, pak=None, total=None, unit=None, force=False):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        with self._lock:
+            if not force and now - self._last < self.interval:
+                return
+            self._last = now
+        self._send(ProgressEvent('progress', phase, table, pak, done, total, unit))
+
+    def finish(self, phase, table=None, pak=None, done=0, total=None, unit=None):
+        if self.enabled:
+            self._send(ProgressEvent('finish', phase, table, pak, done, total, unit))
+
+    def reader(self, f, phase, table=None, pak=None, total=None):
+        """Wraps a binary stream so reading it reports progress in bytes"""
+        if not self.enabled:
+            return f
+        return _ProgressReader(f, self, phase, table, pak, total)
+
+    def _send(self, event):
+        event.elapsed = round(time.perf_counter() - self._started, 3)
+        self.listener(event)
+
+class _ProgressReader:
+    """Binary file wrapper that reports how much of a member has been read"""
+
+    def __init__(self, f, reporter, phase, table, pak, total):
+        self._f = f
+        self._reporter = reporter
+        self._args = (phase, table, pak, total)
+        self.done = 0
+
+    def read(self, size=-1):
+        data = self._f.read(size)
+        self.done += len(data)
+        phase, table, pak, total = self._args
+        self._reporter.update(phase, self.done, table, pak, total, 'bytes')
+        return data
+
+class ConsoleProgress:
+    """Listener that renders events as a single rewritten progress line"""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stderr
+        self._width = 0
+        self._overall = ""
+
+    def __call__(self, event: ProgressEvent):
+        if event.phase == 'run':
+            self._overall = f"{event.done}/{event.total} " if event.kind != 'finish' and event.total else ""
+            if event.kind == 'finish':
+                self._show("")
+            return
+        if event.phase == 'write' and event.kind == 'finish':
+            # Clear the line so the caller's "saved" message starts on a blank line
+            self._show("")
+            return
+        parts = [f"{self._overall}[{event.phase}]", event.table or event.pak or ""]
+        if event.pak and event.table:
+            parts.append(f"({event.pak})")
+        if event.fraction is not None:
+            parts.append(f"{event.fraction:6.1%}")
+        elif event.done:
+            parts.append(f"{event.done} {event.unit or ''}".rstrip())
+        if event.kind == 'finish':
+            parts.append("done")
+        self._show(" ".join(parts))
+
+    def _show(self, line):
+        padding = " " * max(0, self._width - len(line))
+        self.stream.write(f"\r{line}{padding}" + ("\r" if not line else ""))
+        self.stream.flush()
+        self._width = len(line)
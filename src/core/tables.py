@@ -0,0 +1,286 @@
+"""
+Tables Module
+Compact in-memory storage for parsed localization tables and merged rows
+"""
+
+import sys
+from array import array
+from collections.abc import Mapping
+from itertools import islice, tee
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# Encoded texts up to this size are stored once per table however often they
+# repeat; longer ones (dialog lines) rarely repeat and are not worth tracking
+DEDUP_BYTES = 64
+
+# Size of a position past CPython's cached small ints, which is an object of its own
+_INT_BYTES = sys.getsizeof(1 << 20)
+
+class IdIndex:
+    """The ID column of one table, shared by every language.
+
+    Each distinct ID is stored once, in the order it was first seen, together
+    with a map from the ID to its position.
+    """
+
+    __slots__ = ("ids", "positions", "_sized", "_id_bytes")
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.positions: Dict[str, int] = {}
+        # IDs are only ever appended, so their sizes are summed once
+        self._sized = 0
+        self._id_bytes = 0
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate bytes held by the ID strings, their list and the position map"""
+        ids = self.ids
+        if self._sized < len(ids):
+            self._id_bytes += sum(map(sys.getsizeof, islice(ids, self._sized, None)))
+            self._sized = len(ids)
+        return (self._id_bytes + max(0, len(ids) - 257) * _INT_BYTES
+                + sys.getsizeof(ids) + sys.getsizeof(self.positions))
+
+class CompactTable(Mapping):
+    """{id: text} mapping over a shared IdIndex with array-backed texts.
+
+    Texts are kept UTF-8 encoded in one buffer: slots maps every index
+    position to a text slot (ABSENT where this language has no row, EMPTY for
+    the table's empty-cell text), bounds holds the buffer offsets of the slots
+    and order the positions of this language's rows in source order, so
+    iteration matches a dict built from the same rows. Texts are decoded when
+    they are read.
+    """
+
+    __slots__ = ("index", "empty", "slots", "order", "bounds", "data")
+
+    ABSENT = -1
+    EMPTY = -2
+
+    def __init__(self, index: IdIndex = None, empty: str = None):
+        self.index = index if index is not None else IdIndex()
+        self.empty = empty
+        self.slots = array("i")
+        self.order = array("I")
+        self.bounds = array("I", [0])
+        self.data = bytearray()
+
+    @classmethod
+    def build(cls, index: IdIndex, rows: Iterable[Tuple[str, str]], empty: str = None) -> "CompactTable":
+        """Builds a table from (id, text) rows; later rows with the same ID win
+
+        Texts equal to empty take no space.
+        """
+        table = cls(index, empty)
+        ids, positions = index.ids, index.positions
+        bounds, data = table.bounds, table.data
+        absent, empty_slot = cls.ABSENT, cls.EMPTY
+        # Sized to the index up front, so only new IDs grow it
+        slots = table.slots = array("i", [absent]) * len(ids)
+        find, add_order, add_bound = positions.get, table.order.append, bounds.append
+        repeated = {}
+        for entry_id, text in rows:
+            position = find(entry_id)
+            if position is None:
+                position = positions[entry_id] = len(ids)
+                ids.append(entry_id)
+                slots.append(absent)
+            if text == empty:
+                slot = empty_slot
+            else:
+                encoded = text.encode()
+                short = len(encoded) <= DEDUP_BYTES
+                slot = repeated.get(encoded) if short else None
+                if slot is None:
+                    slot = len(bounds) - 1
+                    data += encoded
+                    add_bound(len(data))
+                    if short:
+                        repeated[encoded] = slot
+            if slots[position] == absent:
+                add_order(position)
+            slots[position] = slot
+        return table
+
+    def reindexed(self, index: IdIndex) -> "CompactTable":
+        """The same rows on another index, adding the IDs it lacks; the text buffer is shared"""
+        table = CompactTable(index, self.empty)
+        table.bounds, table.data = self.bounds, self.data
+        ids, positions = index.ids, index.positions
+        absent = self.ABSENT
+        slots = table.slots = array("i", [absent]) * len(ids)
+        add_order = table.order.append
+        own_ids, own_slots = self.index.ids, self.slots
+        for own_position in self.order:
+            entry_id = own_ids[own_position]
+            position = positions.get(entry_id)
+            if position is None:
+                position = positions[entry_id] = len(ids)
+                ids.append(entry_id)
+                slots.append(absent)
+            slots[position] = own_slots[own_position]
+            add_order(position)
+        return table
+
+    def aligned_slots(self) -> array:
+        """slots covering the whole index; IDs added by later languages are ABSENT here"""
+        missing = len(self.index) - len(self.slots)
+        if missing > 0:
+            self.slots.extend(array("i", [self.ABSENT]) * missing)
+        return self.slots
+
+    def text(self, position: int, default=None):
+        """Decoded text at an index position"""
+        slot = self.slots[position] if position < len(self.slots) else self.ABSENT
+        if slot < 0:
+            return self.empty if slot == self.EMPTY else default
+        return self.data[self.bounds[slot]:self.bounds[slot + 1]].decode()
+
+    def __getitem__(self, entry_id):
+        position = self.index.positions.get(entry_id)
+        text = None if position is None else self.text(position)
+        if text is None:
+            raise KeyError(entry_id)
+        return text
+
+    def get(self, entry_id, default=None):
+        position = self.index.positions.get(entry_id)
+        return default if position is None else self.text(position, default)
+
+    def __contains__(self, entry_id):
+        return self.get(entry_id) is not None
+
+    def __iter__(self):
+        return map(self.index.ids.__getitem__, self.order)
+
+    def __len__(self):
+        return len(self.order)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by this language's texts and slots (the shared index not included)"""
+        return (len(self.data) + self.slots.itemsize * len(self.slots)
+                + self.order.itemsize * len(self.order) + self.bounds.itemsize * len(self.bounds))
+
+    def column(self, positions: Sequence[int], missing: str) -> "TextColumn":
+        """Texts at the given index positions; missing stands in for absent and empty ones"""
+        slots = self.aligned_slots()
+        return TextColumn(self, array("i", map(slots.__getitem__, positions)), missing)
+
+class TextColumn:
+    """Texts of one CompactTable for a row order, decoded as they are iterated.
+
+    slots holds the table's text slot of every row. With filled(), missing
+    texts come from the first fallback map that has the row's ID.
+    """
+
+    __slots__ = ("table", "slots", "missing", "ids", "fallbacks")
+
+    def __init__(self, table: CompactTable, slots: array, missing: str):
+        self.table = table
+        self.slots = slots
+        self.missing = missing
+        self.ids = None
+        self.fallbacks = ()
+
+    def filled(self, ids: List[str], fallbacks: Sequence[Mapping]) -> "TextColumn":
+        column = TextColumn(self.table, self.slots, self.missing)
+        column.ids, column.fallbacks = ids, tuple(fallbacks)
+        return column
+
+    def __len__(self):
+        return len(self.slots)
+
+    def count(self, value: str) -> int:
+        if value == self.missing and self.table.empty in (None, value) and not self.fallbacks:
+            # Absent and empty rows are the only ones shown as the missing text
+            count = self.slots.count(CompactTable.ABSENT) + self.slots.count(CompactTable.EMPTY)
+            if self.table.empty is None:
+                count += sum(1 for slot in self.slots if slot >= 0 and self._text(slot) == value)
+            return count
+        return sum(1 for text in self if text == value)
+
+    def fallback_count(self) -> int:
+        """Rows whose missing text a fallback fills"""
+        ids, fallbacks, missing = self.ids, self.fallbacks, self.missing
+        return sum(1 for index, slot in enumerate(self.slots) if slot < 0
+                   and any(fallback.get(ids[index], missing) != missing for fallback in fallbacks))
+
+    def _text(self, slot: int) -> str:
+        return self.table.data[self.table.bounds[slot]:self.table.bounds[slot + 1]].decode()
+
+    def __iter__(self):
+        bounds, data, missing, fallbacks = self.table.bounds, self.table.data, self.missing, self.fallbacks
+        for index, slot in enumerate(self.slots):
+            if slot >= 0:
+                yield data[bounds[slot]:bounds[slot + 1]].decode()
+                continue
+            text = missing
+            for fallback in fallbacks:
+                text = fallback.get(self.ids[index], missing)
+                if text != missing:
+                    break
+            yield text
+
+class TableSet:
+    """One IdIndex per table name, shared by the languages extracted into it"""
+
+    __slots__ = ("indexes", "empty")
+
+    def __init__(self, empty: str = None):
+        self.indexes: Dict[str, IdIndex] = {}
+        # Empty-cell text of the tables, stored without taking any space
+        self.empty = empty
+
+    def build(self, file_path: str, rows: Iterable[Tuple[str, str]]) -> CompactTable:
+        index = self.indexes.get(file_path)
+        if index is None:
+            index = self.indexes[file_path] = IdIndex()
+        return CompactTable.build(index, rows, self.empty)
+
+    def adopt(self, file_path: str, table: CompactTable) -> CompactTable:
+        """table moved onto this set's index for file_path"""
+        index = self.indexes.get(file_path)
+        if index is None:
+            index = self.indexes[file_path] = IdIndex()
+        return table.reindexed(index)
+
+def shared_index(tables, empty: str = None) -> IdIndex:
+    """The IdIndex all tables share, or None unless they are CompactTables on one index with this empty text"""
+    index = None
+    for table in tables:
+        if (not isinstance(table, CompactTable) or table.empty != empty
+                or (index is not None and table.index is not index)):
+            return None
+        index = table.index
+    return index
+
+class MergedRows:
+    """Merged (id, primary, combined) rows stored as columns.
+
+    combine(primary, *others) yields the combined texts; it runs each time the
+    rows are iterated, so the combined strings are built while the table is
+    written instead of all being held at once.
+    """
+
+    __slots__ = ("ids", "primary", "others", "combine")
+
+    def __init__(self, ids: List[str], primary: Iterable[str], others: List[Iterable[str]],
+                 combine: Callable[..., Iterable[str]]):
+        self.ids = ids
+        self.primary = primary
+        self.others = others
+        self.combine = combine
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        # The combine step reads the primary column in step with the rows, so
+        # a lazy column is only decoded once
+        primary, combine_primary = tee(self.primary)
+        return zip(self.ids, primary, self.combine(combine_primary, *self.others))
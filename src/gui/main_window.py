@@ -2,14 +2,60 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from pathlib import Path
 import ctypes
+import queue
+import threading
 import sv_ttk
 
 from .styles import StyleManager
 from .sections import HeaderSection, LanguageSection, FilesSection, OutputSection
 from src.utils.path_finder import GamePathFinder
-from src.utils.mod_generator import ModGenerator
+from src.core.progress import ProgressEvent
+
+class GenerationProgress:
+    """Turns the patcher's progress events into an overall fraction and a status line"""
+
+    # Share of the bar for reading the two language PAKs; writing gets the rest
+    EXTRACT_SHARE = 0.6
+
+    def __init__(self, tables):
+        self.tables = max(1, tables)
+        self.extract = {}
+        self.written = 0
+        self.writing = 0.0
+        self.status = "Starting..."
+
+    def update(self, event: ProgressEvent):
+        if event.phase == 'extract':
+            # Parallel extraction only reports whole PAKs (table is None)
+            weight = 1 if event.table else self.tables
+            key = (event.pak, event.table)
+            if event.kind == 'finish':
+                self.extract[key] = weight
+            elif event.fraction is not None:
+                self.extract[key] = weight * event.fraction
+            self.status = f"Reading {event.pak}" + (f": {event.table}" if event.table else "")
+        elif event.phase == 'merge':
+            self.status = f"Merging {event.table}"
+        elif event.phase == 'write' and event.kind != 'finish':
+            self.writing = event.fraction or 0.0
+            self.status = f"Writing {event.table}"
+        elif event.phase == 'run' and event.kind == 'progress':
+            self.written = event.done
+            self.writing = 0.0
+
+    @property
+    def fraction(self):
+        extracted = min(1.0, sum(self.extract.values()) / (2 * self.tables))
+        written = min(1.0, (self.written + self.writing) / self.tables)
+        if written:
+            # Reused or pipelined tables are written without a separate read
+            extracted = 1.0
+        return self.EXTRACT_SHARE * extracted + (1 - self.EXTRACT_SHARE) * written
 
 class BilingualModGUI:
+    # How often the generation queue is checked (ms)
+    POLL_INTERVAL = 50
+    
     def __init__(self, root):
         self.root = root
         self.root.title("Kingdom Come: Deliverance Bilingual Generator")
@@ -36,18 +82,38 @@ class BilingualModGUI:
         self.root.geometry(f"{width}x{height}")
         self.root.resizable(False, False)
         
+        # Filled in by background detection once the window is up
         self.path_finder = GamePathFinder()
-        self.game_path = self.path_finder.find_game_path()
-        self.languages = self.path_finder.detect_languages(self.game_path)
-        self.mod_generator = ModGenerator()
+        self.game_path = None
+        self.languages = []
+        self.language_tables = {}
+        self.detection = queue.Queue()
+        self.detection_id = 0
+        self._mod_generator = None
         self.base_dir = self.get_app_dir()
         self.output_path = self.base_dir / "Localization"
         
+        # Background generation state
+        self.worker = None
+        self.events = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.tracker = None
+        self.closing = False
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
         self.main_container = ttk.Frame(root, padding="10")
         self.main_container.pack(fill=tk.BOTH, expand=True) 
         self.create_widgets()
         
-        self.refresh_ui()
+        self.start_detection()
+    
+    @property
+    def mod_generator(self):
+        """ModGenerator, imported on first use since it loads the whole patcher"""
+        if self._mod_generator is None:
+            from src.utils.mod_generator import ModGenerator
+            self._mod_generator = ModGenerator()
+        return self._mod_generator
     
     def get_app_dir(self):
         """Get application directory"""
@@ -73,6 +139,7 @@ class BilingualModGUI:
         
         self.lang_section = LanguageSection(left_frame, self.style_manager, self.languages)
         self.files_section = FilesSection(right_frame, self.style_manager)
+        self.lang_section.on_change = self.update_table_info
         
         self.output_section = OutputSection(self.main_container, self.style_manager, self.output_path)
         self.output_section.browse_btn.configure(command=self.select_output_folder)
@@ -86,13 +153,59 @@ class BilingualModGUI:
         if path:
             data_path = Path(path) / "Data"
             if data_path.exists():
-                self.game_path = path
-                self.path_finder.game_path = path
-                self.languages = self.path_finder.detect_languages(self.game_path)
-                self.refresh_ui()
+                self.start_detection(path, refresh=True)
             else:
                 messagebox.showerror("Error", "Invalid KCD installation")
     
+    def start_detection(self, game_path=None, refresh=False):
+        """Detects the installation (unless given) and its languages off the Tk thread
+
+        refresh bypasses the cached installs, e.g. after "Change Location".
+        """
+        self.detection_id += 1
+        self.header.set_game_path(None, detecting=True)
+        self.output_section.generate_btn.configure(state=tk.DISABLED)
+        threading.Thread(target=self._detect_in_background,
+                         args=(self.detection_id, game_path, refresh), daemon=True).start()
+        self.root.after(self.POLL_INTERVAL, self._poll_detection)
+    
+    def _detect_in_background(self, detection_id, game_path, refresh):
+        """Worker thread: runs the slow registry and filesystem probing"""
+        try:
+            if game_path is None:
+                game_path = self.path_finder.find_game_path(refresh)
+            languages = self.path_finder.detect_languages(game_path, refresh)
+            tables = self.path_finder.language_tables(game_path)
+        except Exception as e:
+            print(f"Game detection failed: {e}")
+            languages, tables = [], {}
+        self.detection.put((detection_id, game_path, languages, tables))
+    
+    def _poll_detection(self):
+        """Applies detection results in place; older runs are ignored"""
+        try:
+            detection_id, game_path, languages, tables = self.detection.get_nowait()
+        except queue.Empty:
+            self.root.after(self.POLL_INTERVAL, self._poll_detection)
+            return
+        if detection_id != self.detection_id:
+            # A newer detection has its own poll loop
+            return
+        
+        self.game_path = game_path
+        self.path_finder.game_path = game_path
+        self.languages = languages
+        self.language_tables = tables
+        self.header.set_game_path(game_path)
+        self.lang_section.set_languages(languages)
+        self.update_table_info()
+        self.output_section.generate_btn.configure(state=tk.NORMAL)
+    
+    def update_table_info(self):
+        """Show which tables the primary language has, and their sizes"""
+        primary = self.lang_section.primary_lang.get()
+        self.files_section.set_table_info(self.language_tables.get(primary), primary)
+    
     def select_output_folder(self):
         """Select output folder"""
         path = filedialog.askdirectory(title="Select Output Folder")
@@ -100,47 +213,106 @@ class BilingualModGUI:
             self.output_section.output_location.set(path)
     
     def generate_mod(self):
-        """Generate the bilingual mod"""
+        """Generate the bilingual mod on a worker thread"""
+        if self.worker and self.worker.is_alive():
+            return
         if not self.validate_selections():
             return
         
+        selected_files = [f for f, var in self.files_section.file_vars.items() if var.get()]
+        options = dict(
+            game_path=Path(self.game_path),
+            primary_lang=self.lang_section.primary_lang.get(),
+            secondary_lang=self.lang_section.secondary_lang.get(),
+            selected_files=selected_files
+        )
+        
+        # Import the patcher here rather than on the worker thread
+        self.mod_generator
+        
         # Show processing state
-        self.output_section.generate_btn.pack_forget()
-        self.output_section.processing_label.pack(fill=tk.X)
-        self.root.update()
+        self.events = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.tracker = GenerationProgress(len(selected_files))
+        self.output_section.toggle_progress(True)
+        self.output_section.cancel_btn.configure(command=self.cancel_generation)
         
+        self.worker = threading.Thread(target=self._generate_in_background, args=(options,), daemon=True)
+        self.worker.start()
+        self.root.after(self.POLL_INTERVAL, self._poll_generation)
+    
+    def _generate_in_background(self, options):
+        """Worker thread: runs the generator, queueing its progress events and result"""
         try:
-            success = self.mod_generator.generate(
-                game_path=Path(self.game_path),
-                primary_lang=self.lang_section.primary_lang.get(),
-                secondary_lang=self.lang_section.secondary_lang.get(),
-                selected_files=[f for f, var in self.files_section.file_vars.items() if var.get()]
-            )
-            
-            # Restore button
-            self.output_section.processing_label.pack_forget()
-            self.output_section.generate_btn.pack(fill=tk.X)
-            
-            if success:
-                messagebox.showinfo(
-                    "Success", 
-                    f"Mod generated successfully!\n\n"
-                    f"Location: {self.mod_generator.base_dir}\n\n"
-                    f"Installation:\n"
-                    f"1. Copy the entire folder containing this application\n"
-                    f"   to your KCD Mods directory\n"
-                    f"2. Enable mod in KCD Launcher (Mods tab)\n\n"
-                    f"Game Settings:\n"
-                    f"1. Set 'Text Language' to {self.lang_section.primary_lang.get()}\n"
-                    f"2. Apply changes to see bilingual text"
-                )
-            else:
-                messagebox.showerror("Error", "Failed to generate mod")
-                
+            result = self.mod_generator.generate(progress=self.events.put,
+                                                 cancel_event=self.cancel_event,
+                                                 **options)
         except Exception as e:
-            self.output_section.processing_label.pack_forget()
-            self.output_section.generate_btn.pack(fill=tk.X)
-            messagebox.showerror("Error", str(e))
+            result = e
+        self.events.put(result)
+    
+    def _poll_generation(self):
+        """Applies queued progress on the Tk thread until the worker's result arrives"""
+        result = None
+        done = False
+        try:
+            while True:
+                item = self.events.get_nowait()
+                if isinstance(item, ProgressEvent):
+                    self.tracker.update(item)
+                else:
+                    result, done = item, True
+                    break
+        except queue.Empty:
+            pass
+        
+        if not done:
+            if not self.cancel_event.is_set():
+                self.output_section.set_progress(self.tracker.fraction, self.tracker.status)
+            self.root.after(self.POLL_INTERVAL, self._poll_generation)
+            return
+        self._finish_generation(result)
+    
+    def cancel_generation(self):
+        """Stops the running generation before its next table"""
+        self.cancel_event.set()
+        self.output_section.cancel_btn.configure(state=tk.DISABLED, text="Cancelling...")
+        self.output_section.set_progress(self.tracker.fraction, "Cancelling...")
+    
+    def _finish_generation(self, result):
+        """Restores the button and reports how the generation ended"""
+        self.output_section.toggle_progress(False)
+        if self.closing:
+            self.root.destroy()
+            return
+        
+        if isinstance(result, Exception):
+            messagebox.showerror("Error", str(result))
+        elif result:
+            messagebox.showinfo(
+                "Success", 
+                f"Mod generated successfully!\n\n"
+                f"Location: {self.mod_generator.base_dir}\n\n"
+                f"Installation:\n"
+                f"1. Copy the entire folder containing this application\n"
+                f"   to your KCD Mods directory\n"
+                f"2. Enable mod in KCD Launcher (Mods tab)\n\n"
+                f"Game Settings:\n"
+                f"1. Set 'Text Language' to {self.lang_section.primary_lang.get()}\n"
+                f"2. Apply changes to see bilingual text"
+            )
+        elif result.get('cancelled'):
+            messagebox.showinfo("Cancelled", "Mod generation was cancelled.\nNo files were changed.")
+        else:
+            messagebox.showerror("Error", "Failed to generate mod")
+    
+    def on_close(self):
+        """Closes the window, letting a running generation stop cleanly first"""
+        if self.worker and self.worker.is_alive():
+            self.closing = True
+            self.cancel_event.set()
+            return
+        self.root.destroy()
     
     def validate_selections(self):
         """Validate user selections"""
@@ -169,11 +341,4 @@ class BilingualModGUI:
             messagebox.showerror("Error", "No files selected for processing")
             return False
         
-        return True 
-
-    def refresh_ui(self):
-        for widget in self.main_container.winfo_children():
-            widget.destroy()
-        
-        self.languages = self.path_finder.detect_languages(self.game_path)
-        self.create_widgets()
\ No newline at end of file
+        return True 
\ No newline at end of file
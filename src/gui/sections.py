@@ -6,6 +6,8 @@ from pathlib import Path
 from tkinter import filedialog
 from tkinter import messagebox
 
+from src.core.pak_index import format_size
+
 class BaseSection:
     def __init__(self, parent, style_manager):
         self.parent = parent
@@ -60,37 +62,40 @@ class HeaderSection(BaseSection):
         )
         path_frame.pack(fill=tk.X, pady=(5, 0))
         
-        if self.game_path:
-            # Path display with scaled font
-            path_label = ttk.Label(
-                path_frame, 
-                text=str(Path(self.game_path).resolve()),
-                font=self.styles.fonts['normal'],
-                wraplength=int(600 * self.styles.scaling)
-            )
-            path_label.pack(side=tk.LEFT, padx=(int(5 * self.styles.scaling), 0), 
-                          fill=tk.X, expand=True)
-            
-            self.change_btn = ttk.Button(
-                path_frame,
-                text="Change Location",
-                command=None
-            )
-            self.change_btn.pack(side=tk.RIGHT, padx=int(5 * self.styles.scaling))
+        # Path display with scaled font, updated in place once detection finishes
+        self.path_text = tk.StringVar()
+        self.path_label = ttk.Label(
+            path_frame, 
+            textvariable=self.path_text,
+            font=self.styles.fonts['normal'],
+            wraplength=int(600 * self.styles.scaling)
+        )
+        self.path_label.pack(side=tk.LEFT, padx=(int(5 * self.styles.scaling), 0), 
+                             fill=tk.X, expand=True)
+        
+        self.change_btn = ttk.Button(
+            path_frame,
+            text="Change Location",
+            command=None
+        )
+        self.change_btn.pack(side=tk.RIGHT, padx=int(5 * self.styles.scaling))
+        self.set_game_path(self.game_path)
+    
+    def set_game_path(self, game_path, detecting=False):
+        """Show the game path, a detecting state or "Game not found" without rebuilding"""
+        self.game_path = game_path
+        if detecting:
+            self.path_text.set("Detecting game installation...")
+            self.path_label.configure(foreground="")
+            self.change_btn.configure(text="Select Game", state=tk.DISABLED)
+        elif game_path:
+            self.path_text.set(str(Path(game_path).resolve()))
+            self.path_label.configure(foreground="")
+            self.change_btn.configure(text="Change Location", state=tk.NORMAL)
         else:
-
-            ttk.Label(path_frame,
-                     text="Game not found",
-                     foreground="red",
-                     style="Info.TLabel").pack(side=tk.LEFT, padx=(0, 5))
-            
-            # Create button but pack separately
-            self.change_btn = ttk.Button(
-                path_frame,
-                text="Select Game",
-                command=None
-            )
-            self.change_btn.pack(side=tk.RIGHT)
+            self.path_text.set("Game not found")
+            self.path_label.configure(foreground="red")
+            self.change_btn.configure(text="Select Game", state=tk.NORMAL)
 
 
 class LanguageSection:
@@ -98,6 +103,8 @@ class LanguageSection:
         self.parent = parent
         self.styles = style_manager
         self.languages = languages
+        # Called after the primary or secondary language changes
+        self.on_change = None
         self.create_section()
     
     def create_section(self):
@@ -183,6 +190,7 @@ class LanguageSection:
                     if lang != self.secondary_lang.get():
                         self.primary_lang.set(lang)
                         break
+        self._notify()
     
     def _on_secondary_changed(self, event):
         """Handle secondary language selection"""
@@ -202,11 +210,26 @@ class LanguageSection:
                     if lang != self.primary_lang.get():
                         self.secondary_lang.set(lang)
                         break
+        self._notify()
+
+    def _notify(self):
+        if self.on_change:
+            self.on_change()
 
     def get_languages(self):
         """Get selected languages"""
         return (self.primary_lang.get(), self.secondary_lang.get())
     
+    def set_languages(self, languages):
+        """Replace the available languages, keeping selections that still exist"""
+        self.languages = languages
+        for combo in (self.primary_lang, self.secondary_lang):
+            combo.configure(values=languages)
+            if combo.get() not in languages:
+                combo.set("")
+        if not self.primary_lang.get() and not self.secondary_lang.get():
+            self.set_defaults()
+    
     def set_defaults(self):
         """Set default languages if available"""
         if "Czech" in self.languages:
@@ -219,6 +242,8 @@ class FilesSection:
         self.parent = parent
         self.styles = style_manager
         self.file_vars = {}
+        self.file_checks = {}
+        self.file_labels = {}
         self.create_section()
     
     def create_section(self):
@@ -255,15 +280,37 @@ class FilesSection:
             # Create checkbutton with scaled font
             cb = ttk.Checkbutton(frame, text=label, variable=var, style="TCheckbutton")
             cb.pack(side=tk.LEFT)
+            self.file_checks[file] = cb
             
             # Add file name with scaled font
-            ttk.Label(frame, 
-                     text=f"({file})",
-                     font=self.styles.fonts['small']).pack(side=tk.LEFT, padx=(5, 0))
+            file_label = ttk.Label(frame, 
+                                   text=f"({file})",
+                                   font=self.styles.fonts['small'])
+            file_label.pack(side=tk.LEFT, padx=(5, 0))
+            self.file_labels[file] = file_label
             
             # Add tooltip
             self.styles.create_tooltip(cb, f"Process {file}")
 
+    def set_table_info(self, tables, language=None):
+        """Show each file's size in the primary PAK; files it lacks are disabled
+
+        tables maps member names to PAK index entries, None when unknown.
+        """
+        for file, cb in self.file_checks.items():
+            label = self.file_labels[file]
+            member = tables.get(file) if tables is not None else None
+            if tables is None or member:
+                if cb.instate(['disabled']):
+                    cb.state(['!disabled'])
+                    self.file_vars[file].set(True)
+                size = f", {format_size(member.file_size)}" if member else ""
+                label.configure(text=f"({file}{size})")
+            else:
+                cb.state(['disabled'])
+                self.file_vars[file].set(False)
+                label.configure(text=f"({file}, not in {language})")
+
     def get_selected_files(self):
         """Get list of selected files"""
         return [f for f, var in self.file_vars.items() if var.get()]
@@ -323,6 +370,27 @@ class OutputSection:
             style="Header.TLabel",
             anchor="center"
         )
+        
+        # Progress of a running generation, shown instead of the button
+        self.progress_value = tk.DoubleVar(value=0)
+        self.progress = ttk.Progressbar(
+            self.generate_frame,
+            variable=self.progress_value,
+            maximum=100,
+            mode="determinate"
+        )
+        self.progress_text = tk.StringVar()
+        self.progress_label = ttk.Label(
+            self.generate_frame,
+            textvariable=self.progress_text,
+            font=self.styles.fonts['small'],
+            anchor="center"
+        )
+        self.cancel_btn = ttk.Button(
+            self.generate_frame,
+            text="Cancel",
+            command=None
+        )
 
     def get_output_location(self):
         """Get output location"""
@@ -335,11 +403,23 @@ class OutputSection:
     def toggle_progress(self, show=True):
         """Show/hide progress bar"""
         if show:
-            self.progress.pack(fill=tk.X, pady=(10, 0))
-            self.progress.start()
+            self.generate_btn.pack_forget()
+            self.set_progress(0, "Starting...")
+            self.cancel_btn.configure(state=tk.NORMAL, text="Cancel")
+            self.processing_label.pack(fill=tk.X)
+            self.progress.pack(fill=tk.X, pady=(5, 0))
+            self.progress_label.pack(fill=tk.X, pady=(2, 0))
+            self.cancel_btn.pack(pady=(5, 0))
         else:
-            self.progress.stop()
-            self.progress.pack_forget()
+            for widget in (self.processing_label, self.progress, self.progress_label, self.cancel_btn):
+                widget.pack_forget()
+            self.generate_btn.pack(fill=tk.X)
+    
+    def set_progress(self, fraction, text=None):
+        """Update progress bar (0-1) and its status text"""
+        self.progress_value.set(round(fraction * 100, 1))
+        if text is not None:
+            self.progress_text.set(text)
 
     def select_output_folder(self):
         """Select output folder"""
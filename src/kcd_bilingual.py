@@ -1,14 +1,223 @@
-import argparse
+from contextlib import contextmanager
+import hashlib
+import io
+import json
+import os
+import sys
+import threading
+import time
 from collections import defaultdict
+from itertools import chain, repeat
+from pathlib import Path
 import xml.etree.ElementTree as ET
 import zipfile
 
+from src.core.cache import ParseCache
+from src.core.languages import find_language_paks
+from src.core.metrics import RunMetrics, TimedWriter
+from src.core.progress import ConsoleProgress, ProgressReporter
+from src.core.pakfile import COMPRESSION_METHODS, CompressedMember, read_raw_member, write_raw_member
+from src.core.merge_policy import DEFAULT_POLICIES, DEFAULT_POLICY, load_policies
+from src.core.pak_index import describe_tables, read_pak_index
+from src.core.tables import MergedRows, TableSet, TextColumn, shared_index
+
+# argparse and the executors (which pull in multiprocessing) are imported where
+# they are used, so scripted runs and the GUI only pay for them when needed
+
+class GenerationCancelled(Exception):
+    """Raised between tables once a run has been asked to stop"""
+
+# Bump when the merged output for the same inputs changes, so incremental
+# runs stop reusing members written by older versions
+OUTPUT_FORMAT = 3
+
+# Fixed entry attributes, so identical inputs give a byte-identical PAK on any
+# machine: the earliest zip timestamp, a Unix origin and rw------- permissions
+MEMBER_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+MEMBER_CREATE_SYSTEM = 3
+MEMBER_EXTERNAL_ATTR = 0o600 << 16
+
+def _iter_rows(source):
+    """Streams (entry_id, text) pairs from a table without keeping the tree in memory"""
+    parents = []
+    for event, elem in ET.iterparse(source, events=('start', 'end')):
+        if event == 'start':
+            parents.append(elem)
+            continue
+        parents.pop()
+        if elem.tag == 'Row' and parents:
+            cells = elem.findall('Cell')
+            if len(cells) > 2:  # Always use cell 2
+                yield cells[0].text, cells[2].text or "MISSING"
+            # Drop the finished row so memory stays flat for any table size
+            elem.clear()
+            parents[-1].remove(elem)
+
+def _escape_text(text):
+    """Escapes cell text the same way ElementTree serializes it"""
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    return text
+
+def _write_table(f, rows, rows_per_chunk=1024, on_chunk=None):
+    """Streams rows as a Table document into an open binary file handle
+
+    on_chunk, if given, is called with the rows written so far after every chunk.
+    """
+    parts = []
+    row_count = 0
+    for row in rows:
+        if not row_count:
+            parts.append('<Table>')
+        row_count += 1
+        parts.append('<Row>')
+        for cell in row:
+            if cell:
+                parts.append(f'<Cell>{_escape_text(cell)}</Cell>')
+            else:
+                parts.append('<Cell />')
+        parts.append('</Row>')
+        if row_count % rows_per_chunk == 0:
+            f.write(''.join(parts).encode('utf-8'))
+            parts.clear()
+            if on_chunk:
+                on_chunk(row_count)
+    parts.append('</Table>' if row_count else '<Table />')
+    f.write(''.join(parts).encode('utf-8'))
+
+def _extract_pak(pak_path, files_to_process, cache=None, wanted_ids=None, metrics=None, progress=None,
+                 cancel=None, mapped=False, tables=None):
+    """Reads every requested table of a PAK into {member: {id: text}}
+
+    wanted_ids optionally maps members to the only IDs worth keeping; cancel is
+    an optional threading.Event checked before each table. mapped reads the
+    PAK through the process-wide memory mapping instead of zipfile. With a
+    TableSet as tables, each table becomes a CompactTable on its shared ID index.
+    """
+    metrics = metrics or RunMetrics()
+    progress = progress or ProgressReporter()
+    pak_name = os.path.basename(str(pak_path))
+    data = {}
+    with metrics.phase('open', pak=pak_name):
+        if mapped:
+            from src.core.mapped_pak import shared_pool
+            zf = shared_pool().get(pak_path)
+        else:
+            zf = zipfile.ZipFile(pak_path, 'r')
+    with zf:
+        for file_info in zf.infolist():
+            if file_info.filename in files_to_process:
+                if cancel is not None and cancel.is_set():
+                    raise GenerationCancelled()
+                wanted = wanted_ids.get(file_info.filename) if wanted_ids is not None else None
+                progress.start('extract', file_info.filename, pak_name, file_info.file_size, 'bytes')
+                with metrics.phase('extract', pak=pak_name, table=file_info.filename):
+                    table = cache.get(file_info) if cache else None
+                    parsed = table is None
+                    if parsed:
+                        with zf.open(file_info) as f:
+                            rows = _iter_rows(progress.reader(f, 'extract', file_info.filename,
+                                                              pak_name, file_info.file_size))
+                            if wanted is not None and not cache:
+                                # Nothing gets cached, so only keep the rows asked for
+                                rows = ((entry_id, text) for entry_id, text in rows if entry_id in wanted)
+                            if tables is not None and not cache:
+                                table = tables.build(file_info.filename, rows)
+                            else:
+                                table = dict(rows)
+                        if cache:
+                            cache.put(file_info, table)
+                    if wanted is not None and cache:
+                        table = {entry_id: table[entry_id] for entry_id in wanted if entry_id in table}
+                    if tables is not None and cache:
+                        # The cache keeps plain dicts; the run works on the compact form
+                        table = tables.build(file_info.filename, table.items())
+                metrics.count(file_info.filename,
+                              rows_in=len(table),
+                              bytes_in=file_info.compress_size if parsed else 0,
+                              bytes_in_uncompressed=file_info.file_size if parsed else 0,
+                              cache_hits=0 if parsed else 1)
+                progress.finish('extract', file_info.filename, pak_name, len(table), unit='rows')
+                data[file_info.filename] = table
+    return data
+
+def _language_name(pak_path):
+    """Language of a *_xml.pak, named the way find_language_paks names it"""
+    return Path(pak_path).stem.replace("_xml", "")
+
+def _file_digest(path, expected_size=None):
+    """SHA-256 of a file, or None if it is missing or not expected_size bytes long"""
+    try:
+        if expected_size is not None and os.path.getsize(path) != expected_size:
+            return None
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    except OSError:
+        return None
+
+def _extract_pak_job(pak_path, files_to_process, cache=None, mapped=False):
+    """Process pool worker: extracts a PAK and hands back its metrics alongside"""
+    metrics = RunMetrics()
+    data = _extract_pak(pak_path, files_to_process, cache, metrics=metrics, mapped=mapped)
+    return data, metrics.snapshot()
+
+def _print_statistics(stats, language_count):
+    print("\n📊 Statistics:")
+    print(f"Total entries: {stats.get('total', 0)}")
+    print(f"Missing in first language: {stats.get('missing_first', 0)}")
+    if language_count > 2:
+        print(f"Missing in other languages: {stats.get('missing_second', 0)}")
+        print(f"Replaced from fallbacks: {stats.get('replaced_with_eng', 0)}")
+    else:
+        print(f"Missing in second language: {stats.get('missing_second', 0)}")
+        print(f"Replaced with English: {stats.get('replaced_with_eng', 0)}")
+
 class BilingualPatcher:
-    def __init__(self, files_to_process=None):
+    def __init__(self, files_to_process=None, jobs=None, pipeline=False, cache=None,
+                 incremental=False, compression=zipfile.ZIP_DEFLATED, compresslevel=None,
+                 progress=None, cancel_event=None, mmap=False, skip_unchanged=False, compact=True,
+                 policies=None):
         self.stats = defaultdict(int)
+        self.table_stats = {}
         self.errors = []
-        self.separator = " / "
+        # Placed between the languages with a space on each side
+        self.separator = "/"
         self.missing_entries = []
+        # Worker processes for extraction (defaults to one per CPU)
+        self.jobs = jobs or os.cpu_count() or 1
+        # Give each table its own worker instead of each PAK
+        self.pipeline = pipeline
+        # Optional ParseCache that skips parsing for unchanged PAK members
+        self.cache = cache
+        # Copy members whose inputs match the previous output instead of rebuilding them
+        self.incremental = incremental
+        self._fingerprints = {}
+        self._tables_done = 0
+        # Zip method and level of the output members (None = zlib default)
+        self.compression = compression
+        self.compresslevel = compresslevel
+        # Phase timings, table throughput and peak memory of the current run
+        self.metrics = RunMetrics()
+        # Optional listener called with ProgressEvents (throttled, cheap when absent)
+        self.progress = ProgressReporter(progress)
+        # Set (e.g. from another thread via cancel()) to stop the run between tables
+        self.cancel_event = cancel_event or threading.Event()
+        # Read PAKs through memory mappings shared by every extraction in the process
+        self.mmap = mmap
+        # Build the output in memory and leave an identical existing PAK untouched
+        self.skip_unchanged = skip_unchanged
+        # Keep parsed tables as CompactTables sharing one ID column per table
+        self.compact = compact
+        self._tables = TableSet("MISSING") if compact else None
+        # MergePolicy per table (e.g. from load_policies) on top of the built-in ones
+        self.policies = {**DEFAULT_POLICIES, **(policies or {})}
         # Default files to process if not specified
         self.files_to_process = files_to_process or [
             'text_ui_dialog.xml',   # Dialogues
@@ -19,112 +228,810 @@ class BilingualPatcher:
             'text_ui_menus.xml'     # Menus
         ]
 
+    def cancel(self):
+        """Asks a running process() to stop before its next table"""
+        self.cancel_event.set()
+
+    def _check_cancelled(self):
+        if self.cancel_event.is_set():
+            raise GenerationCancelled()
+
+    def _policy(self, file_path):
+        return self.policies.get(file_path, DEFAULT_POLICY)
+
+    def _extract(self, pak_path, files, wanted_ids=None):
+        """Extracts one PAK in this process; every in-process extraction goes through here"""
+        return _extract_pak(pak_path, files, self.cache, wanted_ids, self.metrics, self.progress,
+                            self.cancel_event, self.mmap, self._tables)
+
     def _extract_data(self, pak_path, text_position):
         """Extracts texts from specified cell position in XML files"""
-        data = {}
-        with zipfile.ZipFile(pak_path, 'r') as zf:
-            for file_info in zf.infolist():
-                if file_info.filename in self.files_to_process:
-                    with zf.open(file_info) as f:
-                        tree = ET.parse(f)
-                        content = {}
-                        for row in tree.findall('.//Row'):
-                            cells = row.findall('Cell')
-                            if len(cells) > 2:  # Always use cell 2
-                                entry_id = cells[0].text
-                                text = cells[2].text or "MISSING"
-                                content[entry_id] = text
-                        data[file_info.filename] = content
-        return data
+        return self._extract(pak_path, self.files_to_process)
+
+    def _extract_all(self, pak_paths, files=None):
+        """Extracts several PAKs at once, using a process pool when jobs allow"""
+        files = self.files_to_process if files is None else files
+        workers = min(self.jobs, len(pak_paths))
+        if workers <= 1:
+            return [self._extract(pak_path, files) for pak_path in pak_paths]
+        # Parsing holds the GIL, so the PAKs are read in separate processes;
+        # their progress is reported per PAK as each one comes back
+        for pak_path in pak_paths:
+            self.progress.start('extract', pak=os.path.basename(str(pak_path)))
+        results = []
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for pak_path, (data, snapshot) in zip(pak_paths, pool.map(
+                    _extract_pak_job, pak_paths, [files] * len(pak_paths), [self.cache] * len(pak_paths),
+                    [self.mmap] * len(pak_paths))):
+                self.metrics.absorb(snapshot)
+                self.progress.finish('extract', pak=os.path.basename(str(pak_path)),
+                                     done=sum(len(table) for table in data.values()), unit='rows')
+                if self._tables is not None:
+                    # Results arrive in PAK order, so the primary still populates each index first
+                    data = {file_path: self._tables.build(file_path, table.items())
+                            for file_path, table in data.items()}
+                results.append(data)
+        self._check_cancelled()
+        return results
+
+    def _fallback_ids(self, file_path, tables):
+        """IDs of a table whose text is missing in at least one non-primary language
+
+        Empty when the table's policy never falls back.
+        """
+        if not self._policy(file_path).uses_fallbacks or len(tables) < 2:
+            return set()
+        index = shared_index(tables, "MISSING")
+        if index is not None:
+            return self._compact_fallback_ids(index, tables)
+        all_ids = set(tables[0])
+        for entries in tables[1:]:
+            all_ids.update(entries)
+        missing = set()
+        for entries in tables[1:]:
+            missing.update(all_ids - entries.keys())
+            missing.update(entry_id for entry_id, text in entries.items() if text == "MISSING")
+        return missing
+
+    @staticmethod
+    def _compact_fallback_ids(index, tables):
+        """_fallback_ids for CompactTables, worked out on their shared index positions"""
+        positions = set(chain.from_iterable(table.order for table in tables))
+        missing = set()
+        for table in tables[1:]:
+            slots = table.aligned_slots()
+            # Absent and empty texts both have negative slots
+            missing.update(index.ids[position] for position in positions if slots[position] < 0)
+        return missing
+
+    def _extract_fallbacks(self, fallback_paks, language_data):
+        """Extracts the fallback chain lazily: each PAK only for rows still missing
+
+        Returns one {member: {id: text}} per fallback PAK; complete translations
+        never touch any of them. A table only reads the PAKs its policy's
+        fallback chain names.
+        """
+        names = [_language_name(pak) for pak in fallback_paks]
+        pending = {}
+        for file_path in dict.fromkeys(f for data in language_data for f in data):
+            ids = self._fallback_ids(file_path, [data.get(file_path, {}) for data in language_data])
+            if ids:
+                pending[file_path] = ids
+        chains = {file_path: self._policy(file_path).fallback_chain(names) for file_path in pending}
+        results = []
+        for position, pak in enumerate(fallback_paks):
+            wanted = {file_path: ids for file_path, ids in pending.items() if position in chains[file_path]}
+            if not wanted:
+                results.append({})
+                continue
+            data = self._extract(pak, list(wanted), wanted)
+            results.append(data)
+            # Later fallbacks only need what this one lacks too, once every
+            # fallback before it in the table's chain has been read
+            for file_path in wanted:
+                chain = chains[file_path]
+                if any(earlier > position for earlier in chain[:chain.index(position)]):
+                    continue
+                table = data.get(file_path, {})
+                ids = {entry_id for entry_id in pending[file_path] if table.get(entry_id, "MISSING") == "MISSING"}
+                if ids:
+                    pending[file_path] = ids
+                else:
+                    del pending[file_path]
+        return results
 
     def _merge_data(self, first_data, second_data, eng_data):
         """Merges texts from different language files"""
+        return self._merge_languages([first_data, second_data], [eng_data], ["English"])
+
+    def _merge_languages(self, language_data, fallback_data=(), fallback_names=None):
+        """Merges the tables of an ordered language list (primary first) in one pass per table
+
+        fallback_data is the fallback chain, tried in order for texts a
+        non-primary language lacks; fallback_names are its languages, which
+        table policies use to pick and order their own chain.
+        """
+        names = list(fallback_names) if fallback_names is not None else [None] * len(fallback_data)
         merged = defaultdict(list)
-        all_files = set(first_data.keys()) | set(second_data.keys())
+        # Primary tables first, then tables only later languages have
+        all_files = dict.fromkeys(f for data in language_data for f in data)
         
         for file_path in all_files:
-            first_entries = first_data.get(file_path, {})
-            second_entries = second_data.get(file_path, {})
-            eng_entries = eng_data.get(file_path, {})
-            
-            all_ids = set(first_entries.keys()) | set(second_entries.keys())
-            
-            for entry_id in all_ids:
-                primary_text = first_entries.get(entry_id, "MISSING")
-                secondary_text = second_entries.get(entry_id, "MISSING")
-                eng_text = eng_entries.get(entry_id, "MISSING")
-                
-                # Special handling for menus
-                if file_path == 'text_ui_menus.xml':
-                    words_count = len(primary_text.split()) if primary_text != "MISSING" else 0
-                    if words_count < 3:
-                        combined_text = primary_text
-                    else:
-                        # Always try to use secondary language first
-                        combined_text = f"{primary_text} {self.separator} {secondary_text}" if secondary_text != "MISSING" else primary_text
-                else:
-                    # For all other files, prioritize secondary language over English
-                    combined_text = f"{primary_text} {self.separator} {secondary_text}" if secondary_text != "MISSING" else f"{primary_text} {self.separator} {eng_text}"
-                    if secondary_text == "MISSING":
-                        self.stats['replaced_with_eng'] += 1
-                
-                merged[file_path].append((
-                    entry_id,
-                    primary_text,
-                    combined_text
-                ))
-                self.stats['total'] += 1
-                if primary_text == "MISSING": self.stats['missing_first'] += 1
-                if secondary_text == "MISSING": self.stats['missing_second'] += 1
+            self._check_cancelled()
+            self.progress.start('merge', file_path)
+            with self.metrics.phase('merge', table=file_path):
+                rows = self._join_table(
+                    file_path,
+                    [data.get(file_path, {}) for data in language_data],
+                    [fallback_data[position].get(file_path, {})
+                     for position in self._policy(file_path).fallback_chain(names)]
+                )
+            self.metrics.count(file_path, rows=len(rows))
+            self.progress.finish('merge', file_path, done=len(rows), unit='rows')
+            if rows:
+                merged[file_path] = rows
         return merged
 
-    def _create_pak(self, data, output_path):
+    def _merge_table(self, file_path, first_entries, second_entries, eng_entries):
+        """Merges the entries of a single table into (id, primary, combined) rows"""
+        return self._join_table(file_path, [first_entries, second_entries], [eng_entries])
+
+    def _join_table(self, file_path, tables, fallbacks=()):
+        """Joins one table of every language into (id, primary, combined) rows
+
+        A k-way columnar join over a shared ID index: rows keep the primary
+        PAK's order, and IDs only later languages have follow in their source
+        order. Each language becomes a text column looked up through its
+        {id: text} map. Texts a non-primary language lacks come from the first
+        of fallbacks that has them. The table's MergePolicy is compiled once
+        into the combine function that joins the columns as the rows are
+        written.
+        """
+        policy = self._policy(file_path)
+        index = shared_index(tables, "MISSING")
+        if index is not None:
+            ids, primary, others = self._compact_columns(index, tables)
+        else:
+            first_entries = tables[0]
+            ids = list(first_entries)
+            primary = list(first_entries.values())
+            # The shared index: the primary map plus IDs only later languages have
+            extra_ids = list(dict.fromkeys(
+                entry_id for entry_id in chain.from_iterable(tables[1:]) if entry_id not in first_entries
+            ))
+            ids += extra_ids
+            primary += ["MISSING"] * len(extra_ids)
+            others = [list(map(entries.get, ids, repeat("MISSING"))) for entries in tables[1:]]
+        missing_others = sum(column.count("MISSING") for column in others)
+        
+        replaced = 0
+        if policy.uses_fallbacks and missing_others and fallbacks:
+            # Prioritize the other languages over the fallbacks
+            filled = [self._fill_missing(ids, column, fallbacks) for column in others]
+            # Only texts a fallback actually had count as replaced
+            replaced = sum(column.fallback_count() if isinstance(column, TextColumn)
+                           else before.count("MISSING") - column.count("MISSING")
+                           for before, column in zip(others, filled))
+            others = filled
+        combine = policy.combiner(self.separator)
+        
+        stats = {
+            'total': len(ids),
+            'missing_first': primary.count("MISSING"),
+            'missing_second': missing_others,
+            'replaced_with_eng': replaced
+        }
+        # Like the per-row counters before, only non-zero statistics are recorded
+        self._add_table_stats(file_path, {key: value for key, value in stats.items() if value})
+        return MergedRows(ids, primary, others, combine)
+
+    @staticmethod
+    def _compact_columns(index, tables):
+        """ids, primary and other columns of CompactTables that share one ID index
+
+        The same join order as for dicts, but on index positions: the IDs
+        are already shared, so each column is a positional view decoded as
+        the rows are written.
+        """
+        first = tables[0]
+        positions = list(first.order)
+        first_slots = first.aligned_slots()
+        positions += [
+            position for position in dict.fromkeys(chain.from_iterable(table.order for table in tables[1:]))
+            if first_slots[position] == first.ABSENT
+        ]
+        ids = list(map(index.ids.__getitem__, positions))
+        columns = [table.column(positions, "MISSING") for table in tables]
+        return ids, columns[0], columns[1:]
+
+    @staticmethod
+    def _fill_missing(ids, column, fallbacks):
+        """Replaces MISSING texts of a column with the first fallback that has the ID"""
+        if isinstance(column, TextColumn):
+            # Filled while the rows are written
+            return column.filled(ids, fallbacks)
+        if len(fallbacks) == 1:
+            lookup = fallbacks[0].get
+            return [text if text != "MISSING" else lookup(entry_id, "MISSING")
+                    for entry_id, text in zip(ids, column)]
+        filled = list(column)
+        for index, text in enumerate(column):
+            if text == "MISSING":
+                for fallback in fallbacks:
+                    text = fallback.get(ids[index], "MISSING")
+                    if text != "MISSING":
+                        break
+                filled[index] = text
+        return filled
+
+    def _add_table_stats(self, file_path, stats):
+        """Records statistics of one table and adds them to the totals"""
+        self.table_stats[file_path] = dict(stats)
+        for key, value in stats.items():
+            self.stats[key] += value
+
+    def _input_fingerprints(self, language_paks, fallback_paks=()):
+        """Digests the inputs behind every output member from the PAK central directories"""
+        members = [read_pak_index(pak_path) for pak_path in list(language_paks) + list(fallback_paks)]
+        
+        fingerprints = {}
+        for file_path in self.files_to_process:
+            digest = hashlib.sha1(
+                f"{OUTPUT_FORMAT}:{file_path}:{self.separator}:{self.compression}:{self.compresslevel}"
+                f":{len(language_paks)}:{self._policy(file_path).key()}".encode('utf-8')
+            )
+            for pak_members in members:
+                info = pak_members.get(file_path)
+                digest.update(f"|{info.CRC:08x}:{info.file_size}".encode() if info else b"|-")
+            fingerprints[file_path] = digest.hexdigest()
+        return fingerprints
+
+    def _member_comment(self, file_path):
+        """Builds the zip comment that lets later incremental runs reuse a member"""
+        return json.dumps({
+            'inputs': self._fingerprints.get(file_path),
+            'stats': self.table_stats.get(file_path, {})
+        }, separators=(',', ':')).encode('utf-8')
+
+    def _reusable_members(self, output_path):
+        """Collects members of the previous output whose inputs are unchanged"""
+        reused = {}
+        if not os.path.exists(output_path):
+            return reused
+        try:
+            with zipfile.ZipFile(output_path, 'r') as zf:
+                for info in zf.infolist():
+                    if info.filename not in self.files_to_process:
+                        continue
+                    try:
+                        meta = json.loads(info.comment.decode('utf-8'))
+                    except ValueError:
+                        continue
+                    if meta.get('inputs') != self._fingerprints.get(info.filename):
+                        continue
+                    reused[info.filename] = (info, meta.get('stats', {}),
+                                             read_raw_member(output_path, info))
+        except (OSError, zipfile.BadZipFile):
+            return {}
+        return reused
+
+    def _member_info(self, file_path):
+        """Builds the zip entry for an output member with writestr()'s attributes"""
+        info = zipfile.ZipInfo(file_path, MEMBER_DATE_TIME)
+        info.compress_type = self.compression
+        info.create_system = MEMBER_CREATE_SYSTEM
+        info.external_attr = MEMBER_EXTERNAL_ATTR
+        info.comment = self._member_comment(file_path)
+        return info
+
+    def _open_member(self, zf, file_path):
+        """Opens an output zip member for streaming writes"""
+        info = self._member_info(file_path)
+        # ZipFile.open ignores the archive's level for ready-made ZipInfo objects
+        info._compresslevel = self.compresslevel
+        return zf.open(info, 'w')
+
+    def _serialize_table(self, f, file_path, rows):
+        """Writes a table into a compressing sink, timing serializing and compressing apart"""
+        sink = TimedWriter(f)
+        on_chunk = None
+        if self.progress.enabled:
+            total = len(rows)
+            on_chunk = lambda done: self.progress.update('write', done, file_path, total=total, unit='rows')
+        wall, cpu = time.perf_counter(), time.thread_time()
+        _write_table(sink, rows, on_chunk=on_chunk)
+        wall, cpu = time.perf_counter() - wall, time.thread_time() - cpu
+        self.metrics.add_phase('serialize', wall - sink.wall_s, cpu - sink.cpu_s, table=file_path)
+        self.metrics.add_phase('compress', sink.wall_s, sink.cpu_s, table=file_path)
+        self.metrics.count(file_path, bytes_serialized=sink.bytes)
+
+    def _compress_table(self, file_path, rows):
+        """Serializes and compresses one table in memory"""
+        member = CompressedMember(self._member_info(file_path), self.compresslevel)
+        self._serialize_table(member, file_path, rows)
+        with self.metrics.phase('compress', table=file_path):
+            member.close()
+        return member.info, member.data
+
+    def _write_member(self, zf, info, data):
+        """Appends a compressed member to the output and records its size"""
+        with self.metrics.phase('write', table=info.filename):
+            write_raw_member(zf, info, data, self.compresslevel)
+        self.metrics.count(info.filename, bytes_out=len(data))
+
+    def _write_reused(self, zf, file_path, reused):
+        """Copies an unchanged member from the previous output without recompressing it"""
+        info, stats, raw = reused[file_path]
+        self._write_member(zf, info, raw)
+        self.metrics.count(file_path, reused=1)
+        self._add_table_stats(file_path, stats)
+        self._table_done(file_path, f"↺ Reused: {file_path}")
+
+    def _table_done(self, file_path, message=None):
+        """Reports one more output member as finished"""
+        self._tables_done += 1
+        self.progress.finish('write', file_path)
+        print(message or f"✓ Saved: {file_path}")
+        self.progress.update('run', self._tables_done, total=len(self.files_to_process),
+                             unit='tables', force=True)
+
+    def _create_pak(self, data, output_path, reused=None):
         """Creates output PAK file with merged texts"""
-        with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        reused = reused or {}
+        built = [f for f in self.files_to_process if f in data and f not in reused]
+        workers = min(self.jobs, len(built))
+        with self._open_output(output_path) as zf:
+            if workers <= 1:
+                for file_path in self.files_to_process:
+                    self._check_cancelled()
+                    if file_path in reused:
+                        self._write_reused(zf, file_path, reused)
+                    elif file_path in data:
+                        # Row tuples are (ID, primary language, combined text)
+                        with self._open_member(zf, file_path) as f:
+                            self._serialize_table(f, file_path, data[file_path])
+                        self.metrics.count(file_path, bytes_out=zf.getinfo(file_path).compress_size)
+                        self._table_done(file_path)
+                return
+            
+            # zlib releases the GIL, so members are compressed on threads
+            # and then written in canonical order
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    file_path: pool.submit(self._compress_table, file_path, data[file_path])
+                    for file_path in built
+                }
+                self._write_in_order(zf, futures, reused,
+                                     lambda zf, file_path, result: self._write_member(zf, *result))
+
+    @contextmanager
+    def _open_output(self, output_path):
+        """Opens the output PAK for writing without ever leaving a half-written file
+
+        Members go to a temporary file next to the output, which replaces it only
+        once complete; on errors or cancellation the old output stays untouched.
+        The central directory written on close is timed as a write phase.
+
+        With skip_unchanged the PAK is assembled in memory instead and only
+        written when its digest differs from the existing file's.
+        """
+        if self.skip_unchanged:
+            with self._open_output_if_changed(output_path) as zf:
+                yield zf
+            return
+        temp_path = f"{output_path}.{os.getpid()}.tmp"
+        try:
+            zf = zipfile.ZipFile(temp_path, 'w', self.compression)
+            try:
+                yield zf
+            finally:
+                with self.metrics.phase('write', pak=os.path.basename(str(output_path))):
+                    zf.close()
+            os.replace(temp_path, output_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    @contextmanager
+    def _open_output_if_changed(self, output_path):
+        """Builds the output PAK in memory and writes it only if its bytes changed"""
+        buffer = io.BytesIO()
+        zf = zipfile.ZipFile(buffer, 'w', self.compression)
+        try:
+            yield zf
+        finally:
+            with self.metrics.phase('write', pak=os.path.basename(str(output_path))):
+                zf.close()
+        content = buffer.getbuffer()
+        if _file_digest(output_path, len(content)) == hashlib.sha256(content).hexdigest():
+            self.stats['outputs_unchanged'] += 1
+            print(f"✓ Unchanged, nothing written: {output_path}")
+            return
+        temp_path = f"{output_path}.{os.getpid()}.tmp"
+        try:
+            with self.metrics.phase('write', pak=os.path.basename(str(output_path))):
+                with open(temp_path, 'wb') as f:
+                    f.write(content)
+            os.replace(temp_path, output_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def _create_pak_pipeline(self, language_paks, fallback_paks, output_path, reused=None):
+        """Builds every table in its own worker and assembles the PAK in canonical order"""
+        reused = reused or {}
+        pending = [f for f in self.files_to_process if f not in reused]
+        workers = max(1, min(self.jobs, len(pending)))
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool, \
+                self._open_output(output_path) as zf:
+            futures = {
+                file_path: pool.submit(_build_table, file_path, language_paks, fallback_paks,
+                                       self.separator, self.cache, self.compression,
+                                       self.compresslevel, self.mmap, self._policy(file_path))
+                for file_path in pending
+            }
+            self._write_in_order(zf, futures, reused, self._write_built_table)
+
+    def _write_built_table(self, zf, file_path, result):
+        """Adds a table built by a pipeline worker to the output"""
+        info, content, stats, snapshot = result
+        self._add_table_stats(file_path, stats)
+        self.metrics.absorb(snapshot)
+        if info is None:
+            return False
+        # Statistics are only known now, so the comment is filled in here
+        info.comment = self._member_comment(file_path)
+        self._write_member(zf, info, content)
+
+    def _write_in_order(self, zf, futures, reused, write):
+        """Writes finished members in canonical order, stopping early when cancelled"""
+        try:
+            # Waiting in canonical order keeps the member order stable
             for file_path in self.files_to_process:
-                if file_path in data:
-                    root = ET.Element("Table")
-                    for entry in data[file_path]:
-                        row = ET.SubElement(root, "Row")
-                        ET.SubElement(row, "Cell").text = entry[0]  # ID
-                        ET.SubElement(row, "Cell").text = entry[1]  # Primary language
-                        ET.SubElement(row, "Cell").text = entry[2]  # Combined text
-                    zf.writestr(file_path, ET.tostring(root, encoding='utf-8'))
-                    print(f"✓ Saved: {file_path}")
+                self._check_cancelled()
+                if file_path in reused:
+                    self._write_reused(zf, file_path, reused)
+                elif file_path in futures:
+                    if write(zf, file_path, futures.pop(file_path).result()) is not False:
+                        self._table_done(file_path)
+        except BaseException:
+            # Don't let the pool's shutdown wait for tables nobody will write
+            for future in futures.values():
+                future.cancel()
+            raise
 
     def process(self, first_pak, second_pak, eng_pak, output_pak):
         """Main processing method"""
+        return self.process_languages([first_pak, second_pak], output_pak, [eng_pak])
+
+    def process_languages(self, language_paks, output_pak, fallback_paks=()):
+        """Builds one PAK from an ordered list of language PAKs, primary first
+
+        Every PAK is parsed once and each table is joined in a single pass;
+        texts a non-primary language lacks come from the first PAK of the
+        fallback chain that has them.
+        """
+        language_paks, fallback_paks = list(language_paks), list(fallback_paks)
+        self.metrics = RunMetrics()
+        self._tables = TableSet("MISSING") if self.compact else None
+        self._tables_done = 0
+        self.progress.start('run', pak=os.path.basename(str(output_pak)),
+                            total=len(self.files_to_process), unit='tables')
         try:
-            first_data = self._extract_data(first_pak, 1)
-            second_data = self._extract_data(second_pak, 1)
-            eng_data = self._extract_data(eng_pak, 1)
+            self._fingerprints = self._input_fingerprints(language_paks, fallback_paks)
+            reused = self._reusable_members(output_pak) if self.incremental else {}
             
-            merged = self._merge_data(first_data, second_data, eng_data)
-            self._create_pak(merged, output_pak)
+            if self.pipeline:
+                self._create_pak_pipeline(language_paks, fallback_paks, output_pak, reused)
+            else:
+                pending = [f for f in self.files_to_process if f not in reused]
+                merged = {}
+                if pending:
+                    language_data = self._extract_all(language_paks, pending)
+                    fallback_data = self._extract_fallbacks(fallback_paks, language_data)
+                    merged = self._merge_languages(language_data, fallback_data,
+                                                   [_language_name(pak) for pak in fallback_paks])
+                self._create_pak(merged, output_pak, reused)
             
-            print("\n📊 Statistics:")
-            print(f"Total entries: {self.stats['total']}")
-            print(f"Missing in first language: {self.stats['missing_first']}")
-            print(f"Missing in second language: {self.stats['missing_second']}")
-            print(f"Replaced with English: {self.stats['replaced_with_eng']}")
+            _print_statistics(self.stats, len(language_paks))
+            return True
+        except GenerationCancelled:
+            print("\n⏹ Cancelled, output left unchanged")
+            return False
+        except Exception as e:
+            print(f"\n❌ Error!\n- Error: {str(e)}")
+            self.errors.append(str(e))
+            return False
+        finally:
+            self.progress.finish('run', pak=os.path.basename(str(output_pak)),
+                                 done=self._tables_done, total=len(self.files_to_process), unit='tables')
+
+    def process_batch(self, language_paks, pairs, output_dir, fallback="English"):
+        """Builds many language pairs, parsing every language PAK only once
+
+        language_paks maps language names to PAK paths; each (primary, secondary)
+        pair is written to <output_dir>/<primary>_<secondary>/Localization/<primary>_xml.pak.
+        Pairs may also be longer language lists, e.g. (primary, secondary, third).
+        """
+        self.metrics = RunMetrics()
+        self._tables = TableSet("MISSING") if self.compact else None
+        try:
+            languages = sorted({lang for pair in pairs for lang in pair} | {fallback})
+            tables = dict(zip(languages, self._extract_all(
+                [str(language_paks[lang]) for lang in languages]
+            )))
             
+            jobs = [
+                (tuple(group), [str(language_paks[lang]) for lang in group], [str(language_paks[fallback])],
+                 str(Path(output_dir) / "_".join(group) / "Localization" / f"{group[0]}_xml.pak"))
+                for group in pairs
+            ]
+            for _, _, _, output_pak in jobs:
+                Path(output_pak).parent.mkdir(parents=True, exist_ok=True)
+            
+            batch_args = (tables, fallback, self.files_to_process, self.separator,
+                          self.compression, self.compresslevel, self.skip_unchanged, self.policies)
+            workers = min(self.jobs, len(jobs))
+            if workers <= 1:
+                _init_batch_worker(*batch_args)
+                results = [_build_pair(*job) for job in jobs]
+            else:
+                # Each worker receives the parsed tables once, not once per pair
+                from concurrent.futures import ProcessPoolExecutor
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker,
+                                         initargs=batch_args) as pool:
+                    results = list(pool.map(_build_pair, *zip(*jobs)))
+            
+            for (group, _, _, output_pak), (stats, snapshot) in zip(jobs, results):
+                for key, value in stats.items():
+                    self.stats[key] += value
+                self.metrics.absorb(snapshot)
+                print(f"✓ Built: {' + '.join(group)} -> {output_pak}")
+            
+            print(f"\n📊 Built {len(jobs)} language combinations from {len(languages)} PAKs")
+            print(f"Total entries: {self.stats['total']}")
             return True
+        except GenerationCancelled:
+            print("\n⏹ Cancelled")
+            return False
         except Exception as e:
             print(f"\n❌ Error!\n- Error: {str(e)}")
             return False
 
+    def metrics_report(self):
+        """Phase timings, per-table throughput, peak memory and statistics of the last run"""
+        report = self.metrics.report(self.stats)
+        report['table_stats'] = dict(self.table_stats)
+        return report
+
+# Parsed tables shared by every pair built in a batch worker
+_batch_tables = {}
+
+def _init_batch_worker(tables, fallback, files_to_process, separator,
+                       compression=zipfile.ZIP_DEFLATED, compresslevel=None, skip_unchanged=False,
+                       policies=None):
+    """Installs the shared batch state in a worker process"""
+    _batch_tables.clear()
+    _batch_tables.update(tables=tables, fallback=fallback,
+                         files_to_process=files_to_process, separator=separator,
+                         compression=compression, compresslevel=compresslevel,
+                         skip_unchanged=skip_unchanged, policies=policies)
+
+def _build_pair(languages, language_paks, fallback_paks, output_pak):
+    """Batch worker: merges one language pair (or longer list) from the shared tables and writes it"""
+    tables = _batch_tables['tables']
+    patcher = BilingualPatcher(_batch_tables['files_to_process'], jobs=1,
+                               compression=_batch_tables['compression'],
+                               compresslevel=_batch_tables['compresslevel'],
+                               skip_unchanged=_batch_tables['skip_unchanged'],
+                               policies=_batch_tables['policies'])
+    patcher.separator = _batch_tables['separator']
+    patcher._fingerprints = patcher._input_fingerprints(language_paks, fallback_paks)
+    merged = patcher._merge_languages([tables[lang] for lang in languages],
+                                      [tables[_batch_tables['fallback']]], [_batch_tables['fallback']])
+    patcher._create_pak(merged, output_pak)
+    return dict(patcher.stats), patcher.metrics.snapshot()
+
+def _parse_pairs(spec, languages):
+    """Parses 'Czech:Russian,German:English:Czech' into (primary, secondary[, ...]) tuples"""
+    by_name = {lang.lower(): lang for lang in languages}
+    pairs = []
+    for item in spec.split(','):
+        names = [name.strip() for name in item.split(':')]
+        if len(names) < 2 or not all(names) or len(set(name.lower() for name in names)) != len(names):
+            raise ValueError(f"Invalid pair '{item}', expected PRIMARY:SECONDARY[:MORE...]")
+        pair = []
+        for name in names:
+            if name.lower() not in by_name:
+                raise ValueError(f"Language '{name}' not found (available: {', '.join(languages)})")
+            pair.append(by_name[name.lower()])
+        pairs.append(tuple(pair))
+    return pairs
+
+def _build_table(file_path, language_paks, fallback_paks, separator, cache=None,
+                 compression=zipfile.ZIP_DEFLATED, compresslevel=None, mmap=False, policy=None):
+    """Pipeline worker: extracts, merges, serializes and compresses one table from all PAKs"""
+    patcher = BilingualPatcher([file_path], jobs=1, cache=cache,
+                               compression=compression, compresslevel=compresslevel, mmap=mmap,
+                               policies={file_path: policy} if policy else None)
+    patcher.separator = separator
+    language_data = [patcher._extract_data(pak, 1) for pak in language_paks]
+    fallback_data = patcher._extract_fallbacks(fallback_paks, language_data)
+    rows = patcher._merge_languages(language_data, fallback_data,
+                                    [_language_name(pak) for pak in fallback_paks]).get(file_path)
+    stats = patcher.table_stats.get(file_path, {})
+    if not rows:
+        return None, None, stats, patcher.metrics.snapshot()
+    info, content = patcher._compress_table(file_path, rows)
+    return info, content, stats, patcher.metrics.snapshot()
+
+def _list_tables(paks, files):
+    """Print which of files each PAK holds, read from the central directories only"""
+    for name, pak in sorted(paks.items()):
+        print(f"📊 {name} ({pak})")
+        for line in describe_tables(pak, files):
+            print(f"  {line}")
+
+def _run_on_daemon(args, policies):
+    """Runs the CLI job on the generation daemon; None when no daemon is reachable or it rejects the job"""
+    from src.kcd_bilingual_daemon import submit
+    if args.languages:
+        languages, fallbacks = args.languages, args.fallback or []
+    else:
+        languages, fallbacks = [args.first_pak, args.second_pak], [args.eng_pak]
+    job = {
+        # The daemon may run in another folder
+        'languages': [os.path.abspath(pak) for pak in languages],
+        'fallbacks': [os.path.abspath(pak) for pak in fallbacks],
+        'output': os.path.abspath(args.output),
+        'files': args.files,
+        'separator': args.separator,
+        'policies': {file_path: policy.to_dict() for file_path, policy in policies.items()} if policies else None,
+        'compression': args.compression,
+        'level': args.level,
+        'incremental': args.incremental,
+        'skip_unchanged': args.skip_unchanged,
+        'mmap': args.mmap
+    }
+    response = submit(job, args.daemon or None)
+    if response is None:
+        print("↺ Generation daemon not reachable, running locally")
+        return None
+    if response.get('rejected'):
+        # e.g. an output outside the daemon's --allow-output folders, which a local run may write
+        print(f"↺ Generation daemon rejected the job ({response.get('error')}), running locally")
+        return None
+    report = response.get('report')
+    if response.get('ok'):
+        _print_statistics(report['stats'], len(languages))
+    else:
+        print(f"\n❌ Error!\n- Error: {response.get('error')}")
+    if args.stats_json and report:
+        Path(args.stats_json).write_text(json.dumps(report, indent=2), encoding='utf-8')
+        print(f"✓ Metrics saved: {args.stats_json}")
+    return bool(response.get('ok'))
+
 def main():
+    import argparse
     parser = argparse.ArgumentParser(description='Create bilingual text files for Kingdom Come: Deliverance')
-    parser.add_argument('first_pak', help='Primary language PAK file')
-    parser.add_argument('second_pak', help='Secondary language PAK file')
-    parser.add_argument('eng_pak', help='English PAK file (fallback)')
-    parser.add_argument('-o', '--output', required=True, help='Output PAK file')
+    parser.add_argument('first_pak', nargs='?', help='Primary language PAK file')
+    parser.add_argument('second_pak', nargs='?', help='Secondary language PAK file')
+    parser.add_argument('eng_pak', nargs='?', help='English PAK file (fallback)')
+    parser.add_argument('-o', '--output', help='Output PAK file (output folder in batch mode)')
     parser.add_argument('-f', '--files', nargs='+', help='Specific files to process')
+    parser.add_argument('--languages', nargs='+', metavar='PAK',
+                        help='Merge these language PAKs in order, primary first (instead of the positional PAKs)')
+    parser.add_argument('--fallback', nargs='+', metavar='PAK',
+                        help='Fallback chain for texts missing in --languages (default: none)')
+    parser.add_argument('--separator', help='Text placed between the languages, with a space on each side (default: "/")')
+    parser.add_argument('--policies', metavar='JSON',
+                        help='Per-table merge policies (min_words, separator, fallbacks, combine, skip_missing)')
+    parser.add_argument('-j', '--jobs', type=int,
+                        help='Worker processes for extraction and threads for compression (default: one per CPU); '
+                             'outside CPython 3.8-3.13 the output members are compressed one at a time')
+    parser.add_argument('--pipeline', action='store_true', help='Build each table in its own worker process')
+    parser.add_argument('--mmap', action='store_true',
+                        help='Memory-map the input PAKs and read members from the mapping')
+    parser.add_argument('--no-cache', action='store_true', help='Always parse PAKs instead of using the parse cache')
+    parser.add_argument('--clear-cache', action='store_true', help='Empty the parse cache before processing')
+    parser.add_argument('--incremental', action='store_true', help='Reuse unchanged tables from the existing output PAK')
+    parser.add_argument('--compression', choices=sorted(COMPRESSION_METHODS), default='deflated',
+                        help='Zip method for the output members (default: deflated)')
+    parser.add_argument('--level', type=int, choices=range(10), metavar='0-9',
+                        help='Deflate level, 1 = fastest, 9 = smallest (default: 6); '
+                             'outside CPython 3.8-3.13 it is applied while writing, one member at a time')
+    parser.add_argument('--skip-unchanged', action='store_true',
+                        help='Leave the output untouched when the new PAK would be byte-identical')
+    parser.add_argument('--no-progress', action='store_true', help='Do not draw the progress line')
+    parser.add_argument('--stats-json', metavar='PATH', help='Write phase timings, throughput and peak memory as JSON')
+    parser.add_argument('--list-tables', action='store_true',
+                        help='Show the tables each PAK (or --game language) contains and their sizes, then exit')
+    parser.add_argument('--daemon', nargs='?', const='', metavar='ADDRESS',
+                        help='Run through the generation daemon (default address if none given) when it is running '
+                             'and accepts the job; --pipeline, --jobs and --no-cache always run locally')
+    batch = parser.add_argument_group('batch mode')
+    batch.add_argument('--game', help='Game installation to discover language PAKs in')
+    batch.add_argument('--all-pairs', action='store_true', help='Build every primary/secondary combination')
+    batch.add_argument('--pairs', help='Comma-separated PRIMARY:SECONDARY[:MORE] lists, e.g. Czech:Russian,German:English:Czech')
     
     args = parser.parse_args()
+    if args.list_tables:
+        if args.game:
+            paks = find_language_paks(args.game)
+        else:
+            paks = {Path(p).name: p for p in (args.languages or []) + (args.fallback or [])
+                    + [args.first_pak, args.second_pak, args.eng_pak] if p}
+        if not paks:
+            parser.error('--list-tables needs PAK files or --game')
+        _list_tables(paks, args.files or BilingualPatcher().files_to_process)
+        exit(0)
+    if not args.output:
+        parser.error('-o/--output is required')
+    batch_mode = args.all_pairs or args.pairs
+    if batch_mode and not args.game:
+        parser.error('--all-pairs and --pairs require --game')
+    if args.languages and len(args.languages) < 2:
+        parser.error('--languages needs at least two PAKs')
+    if not batch_mode and not args.languages and not (args.first_pak and args.second_pak and args.eng_pak):
+        parser.error('first_pak, second_pak and eng_pak (or --languages) are required')
+    
+    policies = None
+    if args.policies:
+        try:
+            policies = load_policies(args.policies)
+        except ValueError as e:
+            parser.error(str(e))
+    
+    cache = None if args.no_cache else ParseCache()
+    if args.clear_cache:
+        (cache or ParseCache()).clear()
+    
+    if args.daemon is not None and not batch_mode:
+        # The daemon runs jobs in its own threads with its own cache
+        local_only = [flag for flag, used in (('--pipeline', args.pipeline), ('-j/--jobs', args.jobs is not None),
+                                              ('--no-cache', args.no_cache)) if used]
+        if local_only:
+            print(f"↺ {', '.join(local_only)} not supported by the generation daemon, running locally")
+        else:
+            success = _run_on_daemon(args, policies)
+            if success is not None:
+                exit(0 if success else 1)
     
-    patcher = BilingualPatcher(args.files)
-    success = patcher.process(args.first_pak, args.second_pak, args.eng_pak, args.output)
+    patcher = BilingualPatcher(args.files, jobs=args.jobs, pipeline=args.pipeline, cache=cache,
+                               incremental=args.incremental, mmap=args.mmap,
+                               skip_unchanged=args.skip_unchanged, policies=policies,
+                               compression=COMPRESSION_METHODS[args.compression],
+                               compresslevel=args.level,
+                               progress=None if args.no_progress or not sys.stderr.isatty() else ConsoleProgress())
+    if args.separator is not None:
+        patcher.separator = args.separator
+    if batch_mode:
+        language_paks = find_language_paks(args.game)
+        if "English" not in language_paks:
+            parser.error(f"English_xml.pak not found in {args.game}")
+        languages = sorted(language_paks)
+        if args.all_pairs:
+            pairs = [(a, b) for a in languages for b in languages if a != b]
+        else:
+            try:
+                pairs = _parse_pairs(args.pairs, languages)
+            except ValueError as e:
+                parser.error(str(e))
+        success = patcher.process_batch(language_paks, pairs, args.output)
+    elif args.languages:
+        success = patcher.process_languages(args.languages, args.output, args.fallback or [])
+    else:
+        success = patcher.process(args.first_pak, args.second_pak, args.eng_pak, args.output)
+    if args.stats_json:
+        report = patcher.metrics_report()
+        report['success'] = success
+        Path(args.stats_json).write_text(json.dumps(report, indent=2), encoding='utf-8')
+        print(f"✓ Metrics saved: {args.stats_json}")
     exit(0 if success else 1)
 
 if __name__ == '__main__':
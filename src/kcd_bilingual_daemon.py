@@ -0,0 +1,456 @@
+"""
+Generation Daemon
+Long-running local service that keeps parsed language tables warm between runs
+
+    python -m src.kcd_bilingual_daemon
+    python -m src.kcd_bilingual_daemon --address 127.0.0.1:48721 --max-mb 1024
+
+Clients send one JSON request per line and get one JSON response per line.
+Every request carries the token the daemon writes next to its socket (or to
+the cache folder for a port), so only the user who started it can use it.
+`python -m src.kcd_bilingual --daemon ...` routes a run through it when it is
+reachable and runs locally otherwise.
+"""
+
+import asyncio
+import hmac
+import json
+import os
+import secrets
+import socket
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, Sequence
+
+from src.core.cache import ParseCache, user_cache_dir
+from src.core.merge_policy import load_policies
+from src.core.pakfile import COMPRESSION_METHODS
+from src.core.tables import TableSet
+from src.kcd_bilingual import BilingualPatcher, _extract_pak
+
+DEFAULT_PORT = 48721
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+def default_address() -> str:
+    """A socket in the user cache folder, or a localhost port where there are no Unix sockets"""
+    if sys.platform == "win32" or not hasattr(socket, "AF_UNIX"):
+        return f"127.0.0.1:{DEFAULT_PORT}"
+    return str(user_cache_dir() / "daemon.sock")
+
+def _parse_address(address):
+    """(host, port) for a host:port address, else None for a Unix socket path"""
+    host, sep, port = address.rpartition(":")
+    if sep and host and port.isdigit() and os.sep not in address:
+        return host, int(port)
+    return None
+
+def token_path(address) -> Path:
+    """File holding the access token of the daemon at address"""
+    tcp = _parse_address(address)
+    if tcp:
+        return user_cache_dir() / f"daemon-{tcp[1]}.token"
+    return Path(f"{address}.token")
+
+def _write_private(path: Path, text: str):
+    """Writes a file only its owner can read"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(str(path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(text)
+    # The mode only applies to new files
+    os.chmod(str(path), 0o600)
+
+def _is_within(path: Path, folder: Path) -> bool:
+    try:
+        path.relative_to(folder)
+        return True
+    except ValueError:
+        return False
+
+def _pak_signature(pak_path):
+    stat = os.stat(pak_path)
+    return stat.st_size, stat.st_mtime_ns
+
+class WarmTables:
+    """Parsed tables kept in memory, least recently used first out past max_bytes
+
+    Entries are keyed by PAK path and member and dropped as soon as the PAK's
+    size or mtime changes. All tables live in one TableSet, so tables of any
+    PAK share their table's ID index and merge on the compact path. max_bytes
+    covers the tables and these indexes; when a table is dropped, its table
+    name's index is rebuilt from the tables still cached (or released), so it
+    never keeps IDs only dropped tables had.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, cache: Optional[ParseCache] = None):
+        self.max_bytes = max_bytes
+        # Optional ParseCache consulted before parsing a member
+        self.cache = cache
+        self._tables = TableSet("MISSING")
+        # (pak path, member) -> (table, nbytes), oldest first
+        self._entries = OrderedDict()
+        self._signatures = {}
+        self._size = 0
+        # Parsing holds the GIL anyway; one lock also keeps the shared indexes
+        # consistent and makes concurrent misses on one PAK parse it once
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def get(self, pak_path, files, metrics=None, progress=None, cancel=None, mapped=False) -> dict:
+        """{member: CompactTable} of a PAK, parsing only the members not cached"""
+        pak_path = os.path.abspath(pak_path)
+        with self._lock:
+            signature = _pak_signature(pak_path)
+            if self._signatures.get(pak_path) != signature:
+                self._invalidate(pak_path)
+                self._signatures[pak_path] = signature
+            data = {}
+            pending = []
+            for file_path in files:
+                entry = self._entries.get((pak_path, file_path))
+                if entry is None:
+                    pending.append(file_path)
+                    continue
+                self._entries.move_to_end((pak_path, file_path))
+                self.hits += 1
+                table = entry[0]
+                if table is not None:
+                    data[file_path] = table
+                    if metrics is not None:
+                        metrics.count(file_path, rows_in=len(table), cache_hits=1)
+            if pending:
+                parsed = _extract_pak(pak_path, pending, self.cache, metrics=metrics, progress=progress,
+                                      cancel=cancel, mapped=mapped, tables=self._tables)
+                # Members the PAK lacks are remembered as empty, so they are not looked up again
+                for file_path in pending:
+                    table = parsed.get(file_path)
+                    nbytes = table.nbytes if table is not None else 0
+                    self._entries[(pak_path, file_path)] = (table, nbytes)
+                    self._size += nbytes
+                    if table is not None:
+                        data[file_path] = table
+                self.misses += len(pending)
+                self._evict()
+            return data
+
+    def _invalidate(self, pak_path):
+        stale = [key for key in self._entries if key[0] == pak_path]
+        self._rebuild({file_path for key in stale for file_path in self._drop(key)})
+        self.invalidations += len(stale)
+
+    def _bytes(self):
+        return self._size + sum(index.nbytes for index in self._tables.indexes.values())
+
+    def _evict(self):
+        while self._entries and self._bytes() > self.max_bytes:
+            # Drop until the tables fit under the indexes as they are, then
+            # rebuild the indexes once; that may free more than needed
+            dropped = set()
+            while self._entries and self._bytes() > self.max_bytes:
+                dropped.update(self._drop(next(iter(self._entries))))
+                self.evictions += 1
+            self._rebuild(dropped)
+
+    def _drop(self, key):
+        """Removes an entry; returns the table name whose index now holds stale IDs"""
+        table, nbytes = self._entries.pop(key)
+        self._size -= nbytes
+        return () if table is None else (key[1],)
+
+    def _rebuild(self, file_paths):
+        """Moves the cached tables of each table name to a fresh index of their own IDs"""
+        for file_path in file_paths:
+            self._tables.indexes.pop(file_path, None)
+            # Jobs still merging keep the old tables and their index
+            for key in [k for k, (t, _) in self._entries.items() if k[1] == file_path and t is not None]:
+                old, old_bytes = self._entries[key]
+                rebuilt = self._tables.adopt(file_path, old)
+                self._entries[key] = (rebuilt, rebuilt.nbytes)
+                self._size += rebuilt.nbytes - old_bytes
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'tables': sum(1 for table, _ in self._entries.values() if table is not None),
+                'bytes': self._bytes(),
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
+
+class _WarmPatcher(BilingualPatcher):
+    """BilingualPatcher that reads its tables through WarmTables"""
+
+    def __init__(self, warm, **options):
+        super().__init__(jobs=1, compact=True, **options)
+        self.warm = warm
+
+    def _extract(self, pak_path, files, wanted_ids=None):
+        # Cached tables are kept whole; fallback lookups only read the rows they need
+        return self.warm.get(pak_path, files, self.metrics, self.progress, self.cancel_event, self.mmap)
+
+_JOB_DEFAULTS = {
+    'languages': [], 'fallbacks': [], 'output': None, 'files': None, 'separator': None, 'policies': None,
+    'compression': 'deflated', 'level': None, 'incremental': False, 'skip_unchanged': False, 'mmap': False
+}
+
+def _str_list(value, minimum=0):
+    return isinstance(value, list) and len(value) >= minimum and all(isinstance(v, str) and v for v in value)
+
+_JOB_CHECKS = {
+    'languages': (lambda v: _str_list(v, 2), "a list of at least two PAK paths"),
+    'fallbacks': (_str_list, "a list of PAK paths"),
+    'output': (lambda v: isinstance(v, str) and bool(v), "a PAK path"),
+    'files': (lambda v: v is None or _str_list(v, 1), "a list of table names"),
+    'separator': (lambda v: v is None or isinstance(v, str), "text"),
+    'policies': (lambda v: v is None or isinstance(v, dict), "an object of table policies"),
+    'compression': (lambda v: isinstance(v, str) and v in COMPRESSION_METHODS, " or ".join(sorted(COMPRESSION_METHODS))),
+    'level': (lambda v: v is None or (isinstance(v, int) and not isinstance(v, bool) and 0 <= v <= 9), "0-9"),
+    'incremental': (lambda v: isinstance(v, bool), "true or false"),
+    'skip_unchanged': (lambda v: isinstance(v, bool), "true or false"),
+    'mmap': (lambda v: isinstance(v, bool), "true or false")
+}
+
+class GenerationDaemon:
+    """Serves generation jobs over a Unix socket or a localhost port
+
+    Requests are JSON objects with the daemon's "token" and an "op":
+    - ping: {"ok": true}
+    - stats: the warm table statistics
+    - generate: builds one PAK (see run_job) and returns its metrics report;
+      a job that fails validation gets "rejected": true, as nothing was run
+    - shutdown: stops the daemon once running jobs finish
+    A line that is not such a request closes the connection. Outputs must be
+    *_xml.pak files inside allowed_outputs (default: the working folder).
+    """
+
+    def __init__(self, address=None, max_bytes: int = DEFAULT_MAX_BYTES, workers: int = None,
+                 cache: Optional[ParseCache] = None, allowed_outputs: Optional[Sequence] = None):
+        self.address = address or default_address()
+        self.allowed_outputs = [Path(folder).resolve() for folder in (allowed_outputs or [os.getcwd()])]
+        self._token = None
+        self.warm = WarmTables(max_bytes, cache)
+        # Jobs run in threads; extraction is serialized by WarmTables, merging
+        # and writing overlap
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self._output_locks = {}
+        self._locks_guard = threading.Lock()
+        self._stop = None
+        self._idle = set()
+        self._handlers = set()
+
+    def _output_lock(self, output_path):
+        with self._locks_guard:
+            return self._output_locks.setdefault(output_path, threading.Lock())
+
+    def run_job(self, job: dict) -> dict:
+        """Builds one PAK; job holds absolute paths as in the CLI:
+
+        languages (primary first), fallbacks, output, and optionally files,
+        separator, policies (as for load_policies), compression, level,
+        incremental, skip_unchanged and mmap. Raises ValueError for invalid
+        jobs before any PAK is read.
+        """
+        job = self._check_job(job)
+        patcher = _WarmPatcher(self.warm, files_to_process=job['files'],
+                               incremental=job['incremental'], mmap=job['mmap'],
+                               skip_unchanged=job['skip_unchanged'], policies=job['policies'],
+                               compression=COMPRESSION_METHODS[job['compression']],
+                               compresslevel=job['level'])
+        if job['separator'] is not None:
+            patcher.separator = job['separator']
+        output = job['output']
+        with self._output_lock(os.path.abspath(output)):
+            success = patcher.process_languages(job['languages'], output, job['fallbacks'])
+        report = patcher.metrics_report()
+        report['success'] = success
+        error = None if success else (patcher.errors[-1] if patcher.errors else "cancelled")
+        return {'ok': success, 'report': report, 'error': error}
+
+    def _check_job(self, job) -> dict:
+        """The job's settings with defaults filled in; ValueError names the first invalid one"""
+        if not isinstance(job, dict):
+            raise ValueError(f"a job must be an object, got {type(job).__name__}")
+        unknown = set(job) - set(_JOB_DEFAULTS)
+        if unknown:
+            raise ValueError(f"unknown job setting(s): {', '.join(sorted(unknown))}")
+        settings = dict(_JOB_DEFAULTS)
+        settings.update((name, value) for name, value in job.items() if value is not None)
+        for name, (check, expected) in _JOB_CHECKS.items():
+            if not check(settings[name]):
+                raise ValueError(f"invalid job setting {name}: {settings[name]!r} (expected {expected})")
+        for pak in settings['languages'] + settings['fallbacks']:
+            if not os.path.isabs(pak) or not os.path.isfile(pak):
+                raise ValueError(f"PAK not found (paths must be absolute): {pak}")
+        self._check_output(settings['output'], settings['languages'] + settings['fallbacks'])
+        if settings['policies'] is not None:
+            settings['policies'] = load_policies(settings['policies'])
+        return settings
+
+    def _check_output(self, output, inputs):
+        path = Path(output)
+        if not path.is_absolute():
+            raise ValueError(f"output must be an absolute path: {output}")
+        if not path.name.endswith('_xml.pak'):
+            raise ValueError(f"output must be a *_xml.pak file: {output}")
+        path = path.resolve()
+        if not any(_is_within(path, folder) for folder in self.allowed_outputs):
+            raise ValueError(f"output is outside the folders this daemon writes to: {output}")
+        if any(path == Path(pak).resolve() for pak in inputs):
+            raise ValueError(f"output would replace an input PAK: {output}")
+
+    def _authorized(self, message) -> bool:
+        token = message.get('token') if isinstance(message, dict) else None
+        return isinstance(token, str) and hmac.compare_digest(token.encode('utf-8'), self._token.encode('utf-8'))
+
+    async def _handle(self, reader, writer, pool):
+        loop = asyncio.get_running_loop()
+        self._handlers.add(asyncio.current_task())
+        try:
+            while not self._stop.is_set():
+                # Idle connections are closed on shutdown, busy ones finish their request
+                self._idle.add(writer)
+                try:
+                    line = await reader.readline()
+                finally:
+                    self._idle.discard(writer)
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    message = None
+                if not self._authorized(message):
+                    # Not a client of this daemon (or not one speaking its protocol)
+                    writer.write(b'{"ok": false, "error": "invalid request"}\n')
+                    await writer.drain()
+                    break
+                try:
+                    op = message.get('op')
+                    if op == 'ping':
+                        response = {'ok': True}
+                    elif op == 'stats':
+                        response = {'ok': True, 'stats': self.warm.stats()}
+                    elif op == 'generate':
+                        try:
+                            response = await loop.run_in_executor(pool, self.run_job, message.get('job') or {})
+                        except ValueError as e:
+                            response = {'ok': False, 'error': str(e), 'rejected': True}
+                        response['stats'] = self.warm.stats()
+                    elif op == 'shutdown':
+                        response = {'ok': True}
+                        self._stop.set()
+                    else:
+                        response = {'ok': False, 'error': f"unknown op: {op!r}"}
+                except Exception as e:
+                    response = {'ok': False, 'error': str(e)}
+                writer.write((json.dumps(response) + "\n").encode('utf-8'))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            self._handlers.discard(asyncio.current_task())
+
+    async def serve(self, ready: Optional[threading.Event] = None):
+        """Serves until a shutdown request; ready is set once connections are accepted"""
+        self._stop = asyncio.Event()
+        self._idle, self._handlers = set(), set()
+        tcp = _parse_address(self.address)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            handler = lambda reader, writer: self._handle(reader, writer, pool)
+            if tcp:
+                server = await asyncio.start_server(handler, *tcp)
+            else:
+                path = Path(self.address)
+                if path.exists():
+                    if request({'op': 'ping'}, self.address) is not None:
+                        raise RuntimeError(f"A daemon is already listening on {self.address}")
+                    path.unlink()
+                path.parent.mkdir(parents=True, exist_ok=True)
+                server = await asyncio.start_unix_server(handler, str(path))
+                os.chmod(str(path), 0o600)
+            # Written once listening, so a daemon already on this address keeps its token
+            self._token = secrets.token_hex(32)
+            _write_private(token_path(self.address), self._token)
+            try:
+                if ready is not None:
+                    ready.set()
+                await self._stop.wait()
+            finally:
+                server.close()
+                for writer in list(self._idle):
+                    writer.close()
+                await asyncio.gather(*self._handlers, return_exceptions=True)
+                await server.wait_closed()
+                token_path(self.address).unlink(missing_ok=True)
+                if not tcp:
+                    Path(self.address).unlink(missing_ok=True)
+
+    def run(self):
+        asyncio.run(self.serve())
+
+def request(message: dict, address=None, timeout: Optional[float] = None) -> Optional[dict]:
+    """Sends one request to a daemon; None when none is listening at address"""
+    address = address or default_address()
+    tcp = _parse_address(address)
+    try:
+        token = token_path(address).read_text(encoding='utf-8').strip()
+    except OSError:
+        return None
+    message = dict(message, token=token)
+    try:
+        if tcp:
+            sock = socket.create_connection(tcp, timeout=2)
+        else:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(2)
+            sock.connect(address)
+    except OSError:
+        return None
+    with sock:
+        sock.settimeout(timeout)
+        sock.sendall((json.dumps(message) + "\n").encode('utf-8'))
+        with sock.makefile('rb') as f:
+            line = f.readline()
+    return json.loads(line) if line else None
+
+def submit(job: dict, address=None) -> Optional[dict]:
+    """Runs a generation job on the daemon; None when no daemon is reachable"""
+    return request({'op': 'generate', 'job': job}, address)
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description='Serve bilingual generation jobs with warm parsed tables')
+    parser.add_argument('--address', help=f'Unix socket path or HOST:PORT (default: {default_address()})')
+    parser.add_argument('--port', type=int, help='Listen on 127.0.0.1:PORT')
+    parser.add_argument('--max-mb', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help='Memory for warm tables in MB (default: %(default)s)')
+    parser.add_argument('--workers', type=int, help='Jobs served at once (default: up to 4)')
+    parser.add_argument('--no-cache', action='store_true', help='Parse PAKs instead of using the parse cache on misses')
+    parser.add_argument('--allow-output', action='append', metavar='DIR',
+                        help='Folder jobs may write their *_xml.pak into (repeatable; default: the current folder)')
+    args = parser.parse_args()
+    if args.address and args.port:
+        parser.error('use either --address or --port')
+
+    address = f"127.0.0.1:{args.port}" if args.port else args.address
+    daemon = GenerationDaemon(address, args.max_mb * 1024 * 1024, args.workers,
+                              None if args.no_cache else ParseCache(), args.allow_output)
+    print(f"✓ Listening on {daemon.address}, writing into {', '.join(map(str, daemon.allowed_outputs))}")
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        pass
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        exit(1)
+    print("⏹ Stopped")
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,13 @@
+import sys
 import tkinter as tk
-from src.kcd_bilingual import BilingualPatcher
 from src.gui.main_window import BilingualModGUI
 
 def main():
+    if getattr(sys, "frozen", False):
+        # Extraction workers re-launch the frozen executable
+        import multiprocessing
+        multiprocessing.freeze_support()
+    
     # Create root window
     root = tk.Tk()
     
@@ -12,15 +17,5 @@ def main():
     # Start main loop
     root.mainloop()
 
-def refresh_ui(self):
-    # Remove old widgets
-    for widget in self.main_container.winfo_children():
-        widget.destroy()
-    
-    # Reinitialize data
-    self.languages = self.detect_available_languages()
-    self.create_widgets()
-    self.setup_status_bar()
-
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,4 +1,21 @@
-from .path_finder import GamePathFinder
-from .mod_generator import ModGenerator
+# Submodules are imported on first attribute access (PEP 562), so importing
+# one helper does not drag in the patcher or the Windows registry code
+import importlib
 
-__all__ = ['GamePathFinder', 'ModGenerator'] 
\ No newline at end of file
+_EXPORTS = {
+    'GamePathFinder': '.path_finder',
+    'GenerationResult': '.mod_generator',
+    'ModGenerator': '.mod_generator'
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -6,6 +6,14 @@ Handles creation of bilingual localization files for Kingdom Come: Deliverance
 # Creating mod structure
 from pathlib import Path
 from src.kcd_bilingual import BilingualPatcher
+from src.core.cache import ParseCache
+from src.core.pakfile import COMPRESSION_METHODS
+
+class GenerationResult(dict):
+    """Metrics report of a generation run that is truthy when the run succeeded"""
+
+    def __bool__(self):
+        return bool(self.get('success'))
 
 class ModGenerator:
     def __init__(self):
@@ -24,15 +32,47 @@ class ModGenerator:
                 game_path: Path,
                 primary_lang: str,
                 secondary_lang: str,
-                selected_files: list) -> bool:
-        """Generate bilingual mod files"""
+                selected_files: list,
+                jobs: int = None,
+                pipeline: bool = False,
+                use_cache: bool = True,
+                incremental: bool = False,
+                compression: str = "deflated",
+                compresslevel: int = None,
+                skip_unchanged: bool = True,
+                progress=None,
+                cancel_event=None) -> GenerationResult:
+        """Generate bilingual mod files
+
+        jobs limits the worker processes (None = one per CPU); pipeline gives
+        each table its own worker instead of each PAK; use_cache reuses parsed
+        tables of unchanged PAK members from earlier runs; incremental copies
+        unchanged tables from the previous output instead of rebuilding them;
+        compression ("stored" or "deflated") and compresslevel (0-9) control
+        how the output members are packed; skip_unchanged leaves an existing
+        PAK untouched when the new one would be byte-identical; progress is an optional listener
+        called with src.core.progress.ProgressEvent objects as the run advances;
+        setting cancel_event (a threading.Event) stops the run between tables
+        and leaves any existing output untouched
+
+        Returns the run's metrics report (see BilingualPatcher.metrics_report),
+        which is truthy when generation succeeded
+        """
         try:
             # Create Localization directory next to EXE
             loc_path = self.base_dir / "Localization"
             loc_path.mkdir(parents=True, exist_ok=True)
             
             # Process files
-            self.patcher = BilingualPatcher(selected_files)
+            cache = ParseCache() if use_cache else None
+            self.patcher = BilingualPatcher(selected_files, jobs=jobs,
+                                            pipeline=pipeline, cache=cache,
+                                            incremental=incremental,
+                                            compression=COMPRESSION_METHODS[compression],
+                                            compresslevel=compresslevel,
+                                            skip_unchanged=skip_unchanged,
+                                            progress=progress,
+                                            cancel_event=cancel_event)
             success = self.patcher.process(
                 str(game_path / "Localization" / f"{primary_lang}_xml.pak"),
                 str(game_path / "Localization" / f"{secondary_lang}_xml.pak"),
@@ -40,8 +80,11 @@ class ModGenerator:
                 str(loc_path / f"{primary_lang}_xml.pak")
             )
             
-            return success
+            result = GenerationResult(self.patcher.metrics_report())
+            result['success'] = success
+            result['cancelled'] = not success and self.patcher.cancel_event.is_set()
+            return result
             
         except Exception as e:
             print(f"Mod generation failed: {e}")
-            return False 
\ No newline at end of file
+            return GenerationResult(success=False, error=str(e)) 
\ No newline at end of file
@@ -1,23 +1,32 @@
-import winreg
 from pathlib import Path
-from typing import Optional, List
+from typing import Callable, Dict, Iterator, List, Optional
 import logging
+import threading
+import time
+
+from src.core.install_cache import InstallCache
+from src.core.languages import find_language_paks
+from src.core.pak_index import localization_tables
 
 class GamePathFinder:
-    def __init__(self):
+    # Seconds a single location may take to answer before it is given up on
+    PROBE_TIMEOUT = 3.0
+    
+    def __init__(self, install_cache: Optional[InstallCache] = None):
         self.logger = logging.getLogger('GamePathFinder')
         self.logger.setLevel(logging.INFO)
 
-        # Steam registry locations (HKLM)
+        # Steam registry locations (HKLM); roots are winreg attribute names
+        # because winreg is only imported once the registry is queried
         self.steam_registry_keys = [
-            (winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Valve\Steam"),
-            (winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\WOW6432Node\Valve\Steam")
+            ("HKEY_LOCAL_MACHINE", r"SOFTWARE\Valve\Steam"),
+            ("HKEY_LOCAL_MACHINE", r"SOFTWARE\WOW6432Node\Valve\Steam")
         ]
         
         # GOG Galaxy registry locations
         self.gog_registry_keys = [
-            (winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\GOG Galaxy"),
-            (winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\WOW6432Node\GOG Galaxy")
+            ("HKEY_LOCAL_MACHINE", r"SOFTWARE\GOG Galaxy"),
+            ("HKEY_LOCAL_MACHINE", r"SOFTWARE\WOW6432Node\GOG Galaxy")
         ]
         
         self.gog_install_paths = [
@@ -38,60 +47,137 @@ class GamePathFinder:
         ]
 
         self.game_path = None
+        # Every valid install found by the last full discovery, best first
+        self.installs = []
+        # Installs and languages remembered between launches
+        self.install_cache = install_cache or InstallCache()
+
+    def find_game_path(self, refresh: bool = False) -> Optional[str]:
+        """Find KCD installation path, reusing the cached install while it is unchanged
 
-    def find_game_path(self) -> Optional[str]:
-        """Find KCD installation path through various sources"""
-        paths = []
+        refresh skips the cache and always runs the full discovery.
+        """
+        if not refresh:
+            entry = self.install_cache.first_valid()
+            if entry:
+                return entry["path"]
         
-        # 1. Steam search
-        try:
-            steam_path = self._get_steam_path()
-            if steam_path:
-                libraries = self._find_steam_libraries(steam_path)
-                paths.extend(libraries)
-        except Exception as e:
-            pass
+        game_path = self._discover_game_path()
+        if game_path:
+            self.install_cache.remember(game_path)
+        return game_path
+
+    def find_installs(self) -> List[str]:
+        """Find every valid KCD installation, in priority order (Steam, GOG, standard paths)"""
+        self.installs = list(dict.fromkeys(self._probe_installs()))
+        return self.installs
+
+    def _discover_game_path(self) -> Optional[str]:
+        """Find KCD installation path through various sources
+
+        Returns as soon as the highest-priority install is confirmed, without
+        waiting for lower-priority or unresponsive locations.
+        """
+        for path in self._probe_installs():
+            if path not in self.installs:
+                self.installs.append(path)
+            return path
+        return None
+
+    def _probes(self) -> List[Callable[[], list]]:
+        """Checks of every candidate location, highest priority first"""
+        # 1. Steam search, 2. GOG search, 3. Check standard paths
+        probes = [self._probe_steam, self._probe_galaxy]
+        probes.extend(map(self._install_probe, self.gog_install_paths + self.standard_paths))
+        return probes
 
-        # 2. GOG search
+    def _install_probe(self, path) -> Callable[[], List[str]]:
+        """Check of a single install location"""
+        path = Path(path)
+        return lambda: [str(path)] if (path / "Data").exists() else []
+
+    def _probe_installs(self) -> Iterator[str]:
+        """Runs every probe concurrently and yields valid installs in priority order
+
+        Each probe gets its own daemon thread, so a location that hangs (e.g. a
+        disconnected network drive) is skipped after PROBE_TIMEOUT instead of
+        stalling detection or keeping the application from exiting. A probe
+        returns install paths or further probes (one per Steam library), which
+        start as soon as it returns and take its place in the order.
+        """
+        deadline = time.monotonic() + self.PROBE_TIMEOUT
+        slots = [self._start_probe(probe) for probe in self._probes()]
+        for slot in slots:
+            yield from self._collect(slot, deadline)
+
+    def _start_probe(self, probe) -> dict:
+        slot = {'done': threading.Event(), 'paths': [], 'probe': probe}
+        threading.Thread(target=self._run_probe, args=(slot,), daemon=True).start()
+        return slot
+
+    def _run_probe(self, slot):
         try:
-            gog_path = self._get_gog_path()
-            if gog_path:
-                paths.append(gog_path)
+            slot['paths'] = [self._start_probe(path) if callable(path) else path for path in slot['probe']()]
         except Exception as e:
-            pass
-
-        # 3. Check standard paths
-        for std_path in self.standard_paths:
-            if std_path.exists():
-                paths.append(str(std_path))
-
-        # Validate and return first valid path
-        valid_paths = []
-        for path in set(paths):
-            data_path = Path(path) / "Data"
-            if data_path.exists():
-                valid_paths.append(path)
-        
-        return valid_paths[0] if valid_paths else None
+            self.logger.debug(f"Install probe failed: {e}")
+        finally:
+            slot['done'].set()
 
-    def _get_steam_path(self) -> Optional[str]:
-        """Get Steam path from registry"""
-        for hkey_root, key_path in self.steam_registry_keys:
+    def _collect(self, slot, deadline) -> Iterator[str]:
+        if not slot['done'].wait(max(0.0, deadline - time.monotonic())):
+            self.logger.warning(f"Install probe timed out: {slot['probe']}")
+            return
+        for path in slot['paths']:
+            if isinstance(path, dict):
+                yield from self._collect(path, deadline)
+            else:
+                yield path
+
+    def _probe_steam(self) -> List[Callable[[], List[str]]]:
+        """One probe per Steam library, so a dead library drive only loses its own install"""
+        steam_path = self._get_steam_path()
+        if not steam_path:
+            return []
+        return [self._install_probe(path) for path in self._find_steam_libraries(steam_path)]
+
+    def _probe_galaxy(self) -> List[str]:
+        """Valid installs below the GOG Galaxy folder"""
+        galaxy_path = self._get_galaxy_path()
+        if not galaxy_path:
+            return []
+        possible_galaxy_paths = [
+            galaxy_path / "Games" / "KingdomComeDeliverance",
+            galaxy_path.parent / "GOG Games" / "KingdomComeDeliverance"
+        ]
+        return [str(path) for path in possible_galaxy_paths if (path / "Data").exists()]
+
+    def _query_registry(self, keys, value_name) -> Optional[str]:
+        """First non-empty registry value among keys, or None without a registry"""
+        try:
+            import winreg
+        except ImportError:
+            return None
+        for root_name, key_path in keys:
             try:
-                with winreg.OpenKey(hkey_root, key_path) as key:
-                    path = winreg.QueryValueEx(key, "InstallPath")[0]
-                    if path:
-                        return path
-            except WindowsError:
+                with winreg.OpenKey(getattr(winreg, root_name), key_path) as key:
+                    value = winreg.QueryValueEx(key, value_name)[0]
+                    if value:
+                        return value
+            except OSError:
                 continue
         return None
+
+    def _get_steam_path(self) -> Optional[str]:
+        """Get Steam path from registry"""
+        return self._query_registry(self.steam_registry_keys, "InstallPath")
     
     def _find_steam_libraries(self, steam_path: str) -> List[str]:
-        """Find all Steam library folders"""
-        libraries = []
-        default_library = Path(steam_path) / "steamapps" / "common" / "KingdomComeDeliverance"
-        if default_library.exists():
-            libraries.append(str(default_library))
+        """Find all Steam library folders
+
+        Returns the game folder each library would hold, without checking the
+        libraries' drives; the probes do that.
+        """
+        libraries = [str(Path(steam_path) / "steamapps" / "common" / "KingdomComeDeliverance")]
         
         try:
             vdf_path = Path(steam_path) / "steamapps" / "libraryfolders.vdf"
@@ -103,40 +189,28 @@ class GamePathFinder:
                         paths = re.findall(r'"path"\s+"([^"]+)"', content)
                         for lib_path in paths:
                             kcd_path = Path(lib_path.replace("\\\\", "\\")) / "steamapps" / "common" / "KingdomComeDeliverance"
-                            if kcd_path.exists():
-                                libraries.append(str(kcd_path))
+                            libraries.append(str(kcd_path))
                 except Exception as e:
                     self.logger.error(f"Error parsing Steam library VDF: {str(e)}", exc_info=True)
         except Exception as e:
             self.logger.error(f"Steam library error: {str(e)}", exc_info=True)
         return libraries
     
-    def detect_languages(self, game_path: Optional[str]) -> List[str]:
-        """Identify available game localizations by scanning PAK files"""
-        languages = []
-        
-        if not game_path:
-            return languages
-        
-        # Check both Data and Localization folders
-        possible_paths = [
-            Path(game_path) / "Data",
-            Path(game_path) / "Localization",
-            Path(game_path) / "Data" / "Localization"
-        ]
-        
-        for data_path in possible_paths:
-            if not data_path.exists():
-                continue
-            
-            try:
-                # Check for *_xml.pak files
-                for file in data_path.glob("*_xml.pak"):
-                    lang = file.stem.replace("_xml", "")
-                    if lang not in languages:
-                        languages.append(lang)
-            except Exception as e:
-                pass
+    def detect_languages(self, game_path: Optional[str], refresh: bool = False) -> List[str]:
+        """Identify available game localizations by scanning PAK files
+
+        The cached language list is used while the install is unchanged;
+        refresh always rescans and updates the cache.
+        """
+        entry = self.install_cache.find(game_path) if game_path and not refresh else None
+        if entry:
+            languages = list(entry["paks"])
+        else:
+            # Check both Data and Localization folders for *_xml.pak files
+            paks = find_language_paks(game_path)
+            languages = list(paks)
+            if game_path and (Path(game_path) / "Data").exists():
+                self.install_cache.remember(game_path, paks)
         
         # Add English as default if no localization found
         if "English" not in languages and languages:
@@ -144,40 +218,19 @@ class GamePathFinder:
         
         return sorted(languages)
 
-    # GOG version search method
-    def _get_gog_path(self) -> Optional[str]:
-        """Locate GOG installation through multiple detection methods"""
-        try:
-            # Galaxy client registry-based detection
-            if galaxy_path := self._get_galaxy_path():
-                possible_galaxy_paths = [
-                    galaxy_path / "Games" / "KingdomComeDeliverance",
-                    galaxy_path.parent / "GOG Games" / "KingdomComeDeliverance"
-                ]
-                for path in possible_galaxy_paths:
-                    if (path / "Data").exists():
-                        return str(path)
-
-            # Filesystem scan for common GOG paths
-            for gog_path in self.gog_install_paths:
-                if (gog_path / "Data").exists():
-                    return str(gog_path)
-
-        except Exception as e:
-            self.logger.error(f"GOG search error: {str(e)}", exc_info=True)
-        return None
+    def language_tables(self, game_path: Optional[str]) -> Dict[str, dict]:
+        """Tables each language PAK holds, read from the zip central directories only"""
+        entry = self.install_cache.find(game_path) if game_path else None
+        if entry:
+            paks = {lang: Path(pak) for lang, (pak, _) in entry["paks"].items()}
+        else:
+            paks = find_language_paks(game_path)
+        return {lang: localization_tables(pak) or {} for lang, pak in paks.items()}
 
     def _get_galaxy_path(self) -> Optional[Path]:
         """Get GOG Galaxy path from registry"""
-        for hkey_root, key_path in self.gog_registry_keys:
-            try:
-                with winreg.OpenKey(hkey_root, key_path) as key:
-                    path = winreg.QueryValueEx(key, "path")[0]
-                    if path:
-                        return Path(path.replace("\\", "/"))
-            except WindowsError:
-                continue
-        return None
+        path = self._query_registry(self.gog_registry_keys, "path")
+        return Path(path.replace("\\", "/")) if path else None
 
     def find_mods_folder(self, game_path: str) -> Path:
         return Path(game_path) / "Mods"
\ No newline at end of file
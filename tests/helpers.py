@@ -0,0 +1,18 @@
+"""Helpers shared by the test modules"""
+
+import zipfile
+
+def build_table(rows):
+    """Build table XML from (id, text) pairs using the game's Row/Cell layout"""
+    parts = ['<Table>']
+    for entry_id, text in rows:
+        parts.append(f'<Row><Cell>{entry_id}</Cell><Cell>{text}</Cell><Cell>{text}</Cell></Row>')
+    parts.append('</Table>')
+    return ''.join(parts)
+
+def create_pak(path, tables):
+    """Create a PAK file at path with the given {member: xml} tables"""
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for member, xml in tables.items():
+            zf.writestr(member, xml)
+    return path
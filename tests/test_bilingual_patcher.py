@@ -0,0 +1,492 @@
+import unittest
+from unittest import mock
+from pathlib import Path
+import tracemalloc
+import xml.etree.ElementTree as ET
+import zipfile
+from benchmarks.corpus import generate_corpus
+from src.core.languages import find_language_paks
+from src.core.merge_policy import load_policies
+from src.core.progress import ProgressReporter
+from src.core.tables import TableSet
+from src.kcd_bilingual import BilingualPatcher, _extract_pak, _iter_rows
+from tests.helpers import build_table, create_pak
+
+class TestBilingualPatcher(unittest.TestCase):
+    def setUp(self):
+        self.patcher = BilingualPatcher()
+        self.test_dir = Path("test_data/patcher_test")
+        self.test_dir.mkdir(parents=True, exist_ok=True)
+
+    def tearDown(self):
+        import shutil
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def create_pak(self, name, tables):
+        return create_pak(self.test_dir / name, tables)
+
+    def test_extract_matches_tree_parse(self):
+        xml = (
+            '<Table>'
+            '<Row><Cell>a</Cell><Cell>A</Cell><Cell>Text &amp; more</Cell></Row>'
+            '<Row><Cell>b</Cell><Cell>B</Cell><Cell/></Row>'
+            '<Row><Cell>short</Cell><Cell>only two</Cell></Row>'
+            '<Row><Cell>a</Cell><Cell>A</Cell><Cell>Duplicate wins</Cell></Row>'
+            '<Row><Cell>c</Cell><Cell>C</Cell><Cell>Příliš žluťoučký</Cell><Cell>extra</Cell></Row>'
+            '</Table>'
+        )
+        pak = self.create_pak("Czech_xml.pak", {
+            'text_ui_dialog.xml': xml,
+            'text_ui_unused.xml': xml
+        })
+
+        expected = {}
+        for row in ET.fromstring(xml).findall('.//Row'):
+            cells = row.findall('Cell')
+            if len(cells) > 2:
+                expected[cells[0].text] = cells[2].text or "MISSING"
+
+        data = self.patcher._extract_data(str(pak), 1)
+        self.assertEqual(list(data), ['text_ui_dialog.xml'])
+        self.assertEqual(data['text_ui_dialog.xml'], expected)
+
+    def test_extract_memory_is_flat(self):
+        def peak_for(rows):
+            xml = build_table((f"id_{i}", "x" * 20) for i in range(rows))
+            pak = self.create_pak(f"rows_{rows}.pak", {'text_ui_dialog.xml': xml})
+            del xml
+            with zipfile.ZipFile(pak) as zf, zf.open('text_ui_dialog.xml') as f:
+                tracemalloc.start()
+                for _ in _iter_rows(f):
+                    pass
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            return peak
+
+        # Ten times more rows must not mean ten times the parse memory
+        self.assertLess(peak_for(50000), peak_for(5000) * 2)
+
+    def test_create_pak_matches_tree_serialization(self):
+        rows = [
+            ("id_1", "Ahoj", "Ahoj / Hello"),
+            ("id_2", "a < b & c > d", "\"quoted\" 'text'\r\n"),
+            ("id_3", "", None),
+            ("id_ř", "Příliš", "Příliš / Слишком"),
+        ]
+        output = self.test_dir / "out.pak"
+        self.patcher._create_pak({
+            'text_ui_dialog.xml': rows,
+            'text_ui_quest.xml': []
+        }, str(output))
+
+        def tree_bytes(entries):
+            root = ET.Element("Table")
+            for entry in entries:
+                row = ET.SubElement(root, "Row")
+                for cell in entry:
+                    ET.SubElement(row, "Cell").text = cell
+            return ET.tostring(root, encoding='utf-8')
+
+        with zipfile.ZipFile(output) as zf:
+            self.assertEqual(zf.namelist(), ['text_ui_dialog.xml', 'text_ui_quest.xml'])
+            self.assertEqual(zf.read('text_ui_dialog.xml'), tree_bytes(rows))
+            self.assertEqual(zf.read('text_ui_quest.xml'), tree_bytes([]))
+
+    def test_concurrent_extraction_matches_serial(self):
+        paks = []
+        for lang in ("Czech", "Russian", "English"):
+            paks.append(str(self.create_pak(f"{lang}_xml.pak", {
+                'text_ui_dialog.xml': build_table((f"id_{i}", f"{lang} {i}") for i in range(200)),
+                'text_ui_menus.xml': build_table((f"menu_{i}", f"{lang} menu {i}") for i in range(20))
+            })))
+
+        serial = BilingualPatcher(jobs=1)._extract_all(paks)
+        concurrent = BilingualPatcher(jobs=3)._extract_all(paks)
+        self.assertEqual(serial, concurrent)
+
+    def test_mapped_extraction_matches_zipfile(self):
+        from src.core.mapped_pak import shared_pool
+        self.addCleanup(shared_pool().close)
+        tables = {
+            'text_ui_dialog.xml': build_table((f"id_{i}", f"Řádek {i} &amp; more") for i in range(2000)),
+            'text_ui_menus.xml': build_table([])
+        }
+        for method in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+            pak = self.test_dir / f"Czech_{method}_xml.pak"
+            with zipfile.ZipFile(pak, 'w', method) as zf:
+                for member, xml in tables.items():
+                    zf.writestr(member, xml)
+            files = self.patcher.files_to_process
+            self.assertEqual(_extract_pak(str(pak), files, mapped=True), _extract_pak(str(pak), files))
+            # Later extractions and patchers reuse the same mapping
+            mapped = shared_pool().get(pak)
+            BilingualPatcher(mmap=True)._extract_data(str(pak), 1)
+            self.assertIs(shared_pool().get(pak), mapped)
+
+        # Corrupt text is caught by the CRC check, as with zipfile
+        stored = self.test_dir / "Broken_xml.pak"
+        with zipfile.ZipFile(stored, 'w', zipfile.ZIP_STORED) as zf:
+            zf.writestr('text_ui_dialog.xml', tables['text_ui_dialog.xml'])
+        data = bytearray(stored.read_bytes())
+        data[data.index(b'id_1000')] = ord('X')
+        stored.write_bytes(bytes(data))
+        with self.assertRaises(zipfile.BadZipFile):
+            _extract_pak(str(stored), files, mapped=True)
+
+    def test_merge_keeps_source_order(self):
+        first = {'c': 'C', 'a': 'A', 'b': 'MISSING'}
+        second = {'x': 'X', 'a': 'Á', 'y': 'Y', 'c': 'Č'}
+        eng = {'b': 'Bee', 'x': 'Ex'}
+        rows = self.patcher._merge_table('text_ui_dialog.xml', first, second, eng)
+        # Primary order first, then secondary-only IDs in their source order
+        self.assertEqual(list(rows), [
+            ('c', 'C', 'C / Č'),
+            ('a', 'A', 'A / Á'),
+            ('b', 'MISSING', 'MISSING / Bee'),
+            ('x', 'MISSING', 'MISSING / X'),
+            ('y', 'MISSING', 'MISSING / Y')
+        ])
+        self.assertEqual(self.patcher.table_stats['text_ui_dialog.xml'],
+                         {'total': 5, 'missing_first': 3, 'missing_second': 1, 'replaced_with_eng': 1})
+
+        menus = {'m1': 'Start', 'm2': 'Load a saved game'}
+        rows = self.patcher._merge_table('text_ui_menus.xml', menus, {'m1': 'Старт', 'm2': 'Загрузить'}, {})
+        self.assertEqual(list(rows), [('m1', 'Start', 'Start'),
+                                      ('m2', 'Load a saved game', 'Load a saved game / Загрузить')])
+
+        # --separator takes the bare text, as stored by default; it is padded with a space on each side
+        self.assertEqual(self.patcher.separator, '/')
+        self.patcher.separator = '|'
+        rows = self.patcher._merge_table('text_ui_dialog.xml', first, second, eng)
+        self.assertEqual(list(rows)[0], ('c', 'C', 'C | Č'))
+        self.patcher.separator = '/'
+
+        # CompactTables on a shared index join to the same rows, whichever language came first
+        for order in ((first, second), (second, first)):
+            shared = TableSet("MISSING")
+            compact = {id(entries): shared.build('text_ui_dialog.xml', entries.items()) for entries in order}
+            self.assertEqual(list(self.patcher._merge_table('text_ui_dialog.xml', compact[id(first)],
+                                                            compact[id(second)], eng)),
+                             list(self.patcher._merge_table('text_ui_dialog.xml', first, second, eng)))
+
+    def test_pipeline_matches_serial_process(self):
+        paks = []
+        for lang, skip in (("Czech", 7), ("Russian", 3), ("English", 11)):
+            tables = {}
+            for member in ('text_ui_dialog.xml', 'text_ui_quest.xml', 'text_ui_menus.xml'):
+                rows = ((f"{member}_{i}", f"{lang} words for entry {i}")
+                        for i in range(100) if i % skip)
+                tables[member] = build_table(rows)
+            paks.append(str(self.create_pak(f"{lang}_xml.pak", tables)))
+
+        serial = BilingualPatcher(jobs=1)
+        pipeline = BilingualPatcher(jobs=3, pipeline=True)
+        self.assertTrue(serial.process(*paks, str(self.test_dir / "serial.pak")))
+        self.assertTrue(pipeline.process(*paks, str(self.test_dir / "pipeline.pak")))
+
+        self.assertEqual(serial.stats, pipeline.stats)
+        with zipfile.ZipFile(self.test_dir / "serial.pak") as a, \
+                zipfile.ZipFile(self.test_dir / "pipeline.pak") as b:
+            self.assertEqual(a.namelist(), b.namelist())
+        members = serial.files_to_process
+        self.assertEqual(
+            _extract_pak(str(self.test_dir / "serial.pak"), members),
+            _extract_pak(str(self.test_dir / "pipeline.pak"), members)
+        )
+
+    def test_incremental_rebuilds_only_changed_tables(self):
+        members = ('text_ui_dialog.xml', 'text_ui_quest.xml', 'text_ui_menus.xml')
+
+        def write_paks(russian_dialog):
+            paks = []
+            for lang in ("Czech", "Russian", "English"):
+                tables = {m: build_table((f"{m}_{i}", f"{lang} words for {i}") for i in range(50))
+                          for m in members}
+                if lang == "Russian":
+                    tables['text_ui_dialog.xml'] = build_table(
+                        (f"text_ui_dialog.xml_{i}", russian_dialog) for i in range(50))
+                paks.append(str(self.create_pak(f"{lang}_xml.pak", tables)))
+            return paks
+
+        output = str(self.test_dir / "out.pak")
+        paks = write_paks("Первый")
+        self.assertTrue(BilingualPatcher(jobs=1, incremental=True).process(*paks, output))
+        with zipfile.ZipFile(output) as zf:
+            quest_before = zf.getinfo('text_ui_quest.xml')
+
+        paks = write_paks("Второй")
+        patcher = BilingualPatcher(jobs=1, incremental=True)
+        with mock.patch('src.kcd_bilingual._iter_rows', wraps=_iter_rows) as iter_rows:
+            self.assertTrue(patcher.process(*paks, output))
+        # Only the changed dialog table is parsed again; English is not needed
+        self.assertEqual(iter_rows.call_count, 2)
+
+        full = BilingualPatcher(jobs=1)
+        self.assertTrue(full.process(*paks, str(self.test_dir / "full.pak")))
+        self.assertEqual(patcher.stats, full.stats)
+        self.assertEqual(_extract_pak(output, members),
+                         _extract_pak(str(self.test_dir / "full.pak"), members))
+        with zipfile.ZipFile(output) as zf:
+            self.assertEqual(zf.namelist(), list(members))
+            self.assertEqual(zf.getinfo('text_ui_quest.xml').CRC, quest_before.CRC)
+            self.assertIsNone(zf.testzip())
+
+    def test_batch_parses_each_language_once(self):
+        game = self.test_dir / "game" / "Localization"
+        game.mkdir(parents=True)
+        for lang, skip in (("Czech", 7), ("Russian", 3), ("German", 5), ("English", 11)):
+            tables = {m: build_table((f"{m}_{i}", f"{lang} words for {i}") for i in range(60) if i % skip)
+                      for m in ('text_ui_dialog.xml', 'text_ui_menus.xml')}
+            self.create_pak(f"game/Localization/{lang}_xml.pak", tables)
+
+        paks = find_language_paks(self.test_dir / "game")
+        self.assertEqual(sorted(paks), ["Czech", "English", "German", "Russian"])
+
+        pairs = [("Czech", "Russian"), ("Russian", "Czech"), ("German", "Czech")]
+        batch = BilingualPatcher(jobs=1)
+        with mock.patch('src.kcd_bilingual._iter_rows', wraps=_iter_rows) as iter_rows:
+            self.assertTrue(batch.process_batch(paks, pairs, str(self.test_dir / "batch")))
+        # Four languages with two tables each, regardless of the number of pairs
+        self.assertEqual(iter_rows.call_count, 8)
+
+        members = batch.files_to_process
+        for primary, secondary in pairs:
+            single = str(self.test_dir / f"{primary}_{secondary}.pak")
+            BilingualPatcher(jobs=1).process(str(paks[primary]), str(paks[secondary]),
+                                             str(paks["English"]), single)
+            built = self.test_dir / "batch" / f"{primary}_{secondary}" / "Localization" / f"{primary}_xml.pak"
+            self.assertEqual(_extract_pak(str(built), members), _extract_pak(single, members))
+
+    def test_multilingual_merge_with_fallback_chain(self):
+        czech = {'a': 'Ahoj', 'b': 'Sbohem', 'c': 'MISSING'}
+        english = {'a': 'Hello', 'd': 'Only English'}
+        german = {'b': 'Tschüss', 'a': 'Hallo', 'c': 'Weg'}
+        russian = {'a': 'Привет', 'b': 'Пока'}
+        rows = self.patcher._join_table('text_ui_dialog.xml', [czech, english, german], [russian, german])
+        # One shared ID index in primary order, gaps filled from the first fallback that has the text
+        self.assertEqual(list(rows), [
+            ('a', 'Ahoj', 'Ahoj / Hello / Hallo'),
+            ('b', 'Sbohem', 'Sbohem / Пока / Tschüss'),
+            ('c', 'MISSING', 'MISSING / Weg / Weg'),
+            ('d', 'MISSING', 'MISSING / Only English / MISSING')
+        ])
+        self.assertEqual(self.patcher.table_stats['text_ui_dialog.xml'],
+                         {'total': 4, 'missing_first': 2, 'missing_second': 3, 'replaced_with_eng': 2})
+
+        # Without fallbacks nothing counts as replaced, on dicts and on CompactTables
+        shared = TableSet("MISSING")
+        for tables in ([czech, english, german],
+                       [shared.build('text_ui_dialog.xml', entries.items()) for entries in (czech, english, german)]):
+            rows = self.patcher._join_table('text_ui_dialog.xml', tables)
+            self.assertEqual(list(rows)[3], ('d', 'MISSING', 'MISSING / Only English / MISSING'))
+            self.assertEqual(self.patcher.table_stats['text_ui_dialog.xml'],
+                             {'total': 4, 'missing_first': 2, 'missing_second': 3})
+
+        paks = [str(self.create_pak(f"{lang}_xml.pak", {
+            'text_ui_dialog.xml': build_table(entries.items()),
+            'text_ui_menus.xml': build_table([('m', f"{entries['a']} menu entry label")])
+        })) for lang, entries in (("Czech", czech), ("English", english), ("German", german), ("Russian", russian))]
+        outputs = []
+        for options in ({'jobs': 1}, {'jobs': 2, 'pipeline': True}):
+            output = self.test_dir / f"three_{len(outputs)}.pak"
+            patcher = BilingualPatcher(**options)
+            self.assertTrue(patcher.process_languages(paks[:3], str(output), paks[3:] + paks[2:3]))
+            outputs.append(output.read_bytes())
+        self.assertEqual(outputs[0], outputs[1])
+        data = _extract_pak(str(output), patcher.files_to_process)
+        self.assertEqual(data['text_ui_dialog.xml']['b'], 'Sbohem / Пока / Tschüss')
+        self.assertEqual(data['text_ui_menus.xml']['m'],
+                         'Ahoj menu entry label / Hello menu entry label / Hallo menu entry label')
+
+    def test_table_policies(self):
+        tables = {
+            "Czech": {'a': 'Ahoj', 'b': 'Sbohem'},
+            "Russian": {'a': 'Привет'},
+            "English": {'b': 'Goodbye'},
+            "German": {'b': 'Tschüss'}
+        }
+        paks = [str(self.create_pak(f"{lang}_xml.pak", {
+            member: build_table(entries.items())
+            for member in ('text_ui_dialog.xml', 'text_ui_quest.xml', 'text_ui_items.xml')
+        })) for lang, entries in tables.items()]
+        policies = load_policies({
+            'text_ui_quest.xml': {'fallbacks': ['German', 'English'], 'separator': '|'},
+            'text_ui_items.xml': {'combine': False}
+        })
+        # English and German fallbacks; the quest policy tries German first
+        output = str(self.test_dir / "policies.pak")
+        self.assertTrue(BilingualPatcher(jobs=1, policies=policies).process_languages(paks[:2], output, paks[2:]))
+        data = _extract_pak(output, ['text_ui_dialog.xml', 'text_ui_quest.xml', 'text_ui_items.xml'])
+        self.assertEqual(data['text_ui_dialog.xml']['b'], 'Sbohem / Goodbye')
+        self.assertEqual(data['text_ui_quest.xml']['b'], 'Sbohem | Tschüss')
+        self.assertEqual(data['text_ui_items.xml'], {'a': 'Ahoj', 'b': 'Sbohem'})
+
+        # Without a German PAK the quest policy falls back to English, also in pipeline workers
+        patcher = BilingualPatcher(jobs=2, pipeline=True, policies=policies)
+        self.assertTrue(patcher.process(*paks[:3], output))
+        data = _extract_pak(output, ['text_ui_quest.xml', 'text_ui_items.xml'])
+        self.assertEqual(data['text_ui_quest.xml']['b'], 'Sbohem | Goodbye')
+        self.assertEqual(data['text_ui_items.xml'], {'a': 'Ahoj', 'b': 'Sbohem'})
+        self.assertEqual(patcher.table_stats['text_ui_items.xml'], {'total': 2, 'missing_second': 1})
+
+    def test_english_fallback_is_lazy(self):
+        members = ('text_ui_dialog.xml', 'text_ui_menus.xml')
+
+        def write_paks(russian_skip):
+            paks = []
+            for lang, skip in (("Czech", 0), ("Russian", russian_skip), ("English", 0)):
+                tables = {m: build_table((f"{m}_{i}", f"{lang} words for {i}")
+                                         for i in range(40) if not skip or i % skip)
+                          for m in members}
+                paks.append(str(self.create_pak(f"{lang}_xml.pak", tables)))
+            return paks
+
+        # Complete secondary language: the English PAK is never parsed
+        paks = write_paks(0)
+        patcher = BilingualPatcher(jobs=1)
+        with mock.patch('src.kcd_bilingual._iter_rows', wraps=_iter_rows) as iter_rows:
+            self.assertTrue(patcher.process(*paks, str(self.test_dir / "complete.pak")))
+        self.assertEqual(iter_rows.call_count, 4)
+
+        # Gaps in the dialog table load only the English rows they need
+        paks = write_paks(4)
+        first_data, second_data = patcher._extract_all(paks[:2])
+        eng_data, = patcher._extract_fallbacks(paks[2:], [first_data, second_data])
+        self.assertEqual(list(eng_data), ['text_ui_dialog.xml'])
+        self.assertEqual(set(eng_data['text_ui_dialog.xml']),
+                         {f"text_ui_dialog.xml_{i}" for i in range(0, 40, 4)})
+        self.assertEqual(eng_data['text_ui_dialog.xml']["text_ui_dialog.xml_4"], "English words for 4")
+
+    def test_threaded_compression_matches_streaming(self):
+        data = {
+            member: [(f"{member}_{i}", f"Text {i}", f"Text {i} / Текст {i}") for i in range(300)]
+            for member in ('text_ui_dialog.xml', 'text_ui_quest.xml', 'text_ui_items.xml')
+        }
+        for method in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+            outputs = []
+            for jobs in (1, 3):
+                output = self.test_dir / f"out_{method}_{jobs}.pak"
+                BilingualPatcher(jobs=jobs, compression=method, compresslevel=9)._create_pak(data, str(output))
+                outputs.append(output)
+
+            with zipfile.ZipFile(outputs[0]) as streamed, zipfile.ZipFile(outputs[1]) as threaded:
+                self.assertIsNone(threaded.testzip())
+                self.assertEqual(streamed.namelist(), threaded.namelist())
+                for a, b in zip(streamed.infolist(), threaded.infolist()):
+                    self.assertEqual(b.compress_type, method)
+                    self.assertEqual((a.CRC, a.file_size, a.compress_size),
+                                     (b.CRC, b.file_size, b.compress_size))
+                    self.assertEqual(streamed.read(a), threaded.read(b))
+
+    def test_output_is_reproducible_and_skips_unchanged(self):
+        import os
+        paks = []
+        for lang in ("Czech", "Russian", "English"):
+            paks.append(str(self.create_pak(f"{lang}_xml.pak", {
+                'text_ui_dialog.xml': build_table((f"id_{i}", f"{lang} {i}") for i in range(300)),
+                'text_ui_menus.xml': build_table((f"menu_{i}", f"{lang} menu item {i}") for i in range(30))
+            })))
+        outputs = []
+        for options in ({'jobs': 1}, {'jobs': 3}, {'jobs': 2, 'pipeline': True}):
+            output = self.test_dir / f"out_{len(outputs)}.pak"
+            self.assertTrue(BilingualPatcher(**options).process(*paks, str(output)))
+            outputs.append(output.read_bytes())
+        self.assertEqual(len(set(outputs)), 1)
+        with zipfile.ZipFile(self.test_dir / "out_0.pak") as zf:
+            self.assertEqual({info.date_time for info in zf.infolist()}, {(1980, 1, 1, 0, 0, 0)})
+
+        # An identical rebuild leaves the existing file alone
+        output = self.test_dir / "out_0.pak"
+        os.utime(output, ns=(0, 10**9))
+        patcher = BilingualPatcher(skip_unchanged=True)
+        self.assertTrue(patcher.process(*paks, str(output)))
+        self.assertEqual(os.stat(output).st_mtime_ns, 10**9)
+        self.assertEqual(patcher.stats['outputs_unchanged'], 1)
+
+        self.create_pak("Russian_xml.pak", {'text_ui_dialog.xml': build_table([("id_1", "Новый")])})
+        patcher = BilingualPatcher(skip_unchanged=True)
+        self.assertTrue(patcher.process(*paks, str(output)))
+        self.assertNotEqual(os.stat(output).st_mtime_ns, 10**9)
+        self.assertEqual(patcher.stats['outputs_unchanged'], 0)
+        self.assertEqual(list(self.test_dir.glob("*.tmp")), [])
+
+    def test_process_synthetic_corpus(self):
+        paks = generate_corpus(self.test_dir / "corpus", ["Czech", "Russian", "English"], 3000,
+                               missing_rate=0.05, empty_rate=0.02)
+        first, second, eng = [_extract_pak(str(paks[lang]), self.patcher.files_to_process)
+                              for lang in ("Czech", "Russian", "English")]
+        self.assertEqual(sorted(first), sorted(self.patcher.files_to_process))
+
+        output = str(self.test_dir / "out.pak")
+        self.assertTrue(self.patcher.process(*(str(paks[lang]) for lang in ("Czech", "Russian", "English")),
+                                             output))
+        expected_total = sum(len(first[m].keys() | second[m].keys()) for m in first)
+        self.assertEqual(self.patcher.stats['total'], expected_total)
+        self.assertGreater(self.patcher.stats['replaced_with_eng'], 0)
+        with zipfile.ZipFile(output) as zf:
+            self.assertEqual(zf.namelist(), self.patcher.files_to_process)
+
+    def test_metrics_report_covers_phases_and_tables(self):
+        paks = generate_corpus(self.test_dir / "corpus", ["Czech", "Russian", "English"], 1000)
+        for patcher in (BilingualPatcher(jobs=1), BilingualPatcher(jobs=2, pipeline=True)):
+            self.assertTrue(patcher.process(*(str(paks[lang]) for lang in ("Czech", "Russian", "English")),
+                                            str(self.test_dir / "out.pak")))
+            report = patcher.metrics_report()
+            self.assertTrue({'open', 'extract', 'merge', 'serialize', 'compress', 'write'}
+                            <= set(report['phase_totals']))
+            self.assertEqual(sorted(report['tables']), sorted(patcher.files_to_process))
+            with zipfile.ZipFile(self.test_dir / "out.pak") as zf:
+                for info in zf.infolist():
+                    table = report['tables'][info.filename]
+                    self.assertEqual(table['bytes_out'], info.compress_size)
+                    self.assertEqual(table['bytes_serialized'], info.file_size)
+                    self.assertEqual(table['rows'], patcher.table_stats[info.filename]['total'])
+                    self.assertGreater(table['bytes_in'], 0)
+            self.assertGreater(report['peak_rss_bytes'], 0)
+            self.assertEqual(report['stats']['total'], patcher.stats['total'])
+
+    def test_progress_events(self):
+        paks = generate_corpus(self.test_dir / "corpus", ["Czech", "Russian", "English"], 3000)
+        events = []
+        patcher = BilingualPatcher(jobs=1, progress=events.append)
+        patcher.progress.interval = 0
+        self.assertTrue(patcher.process(*(str(paks[lang]) for lang in ("Czech", "Russian", "English")),
+                                        str(self.test_dir / "out.pak")))
+        self.assertEqual((events[0].kind, events[0].phase), ('start', 'run'))
+        self.assertEqual((events[-1].kind, events[-1].phase, events[-1].done), ('finish', 'run', 6))
+        phases = {(event.phase, event.kind) for event in events}
+        for phase in ('extract', 'merge', 'write'):
+            self.assertIn((phase, 'finish'), phases)
+        self.assertIn(('extract', 'progress'), phases)
+        self.assertIn(('write', 'progress'), phases)
+        run_done = [event.done for event in events if event.phase == 'run' and event.kind == 'progress']
+        self.assertEqual(run_done, list(range(1, 7)))
+        # Progress within a table only moves forward
+        dialog = [event.done for event in events if event.phase == 'extract' and event.kind == 'progress'
+                  and event.table == 'text_ui_dialog.xml' and event.pak == 'Czech_xml.pak']
+        self.assertEqual(dialog, sorted(dialog))
+
+    def test_cancel_keeps_previous_output(self):
+        paks = generate_corpus(self.test_dir / "corpus", ["Czech", "Russian", "English"], 2000)
+        paks = [str(paks[lang]) for lang in ("Czech", "Russian", "English")]
+        output = self.test_dir / "out.pak"
+        output.write_bytes(b"previous output")
+
+        # Cancel once the first table has been written
+        patcher = BilingualPatcher(jobs=1)
+        patcher.progress = ProgressReporter(
+            lambda event: patcher.cancel() if event.phase == 'write' and event.kind == 'finish' else None)
+        self.assertFalse(patcher.process(*paks, str(output)))
+        self.assertEqual(output.read_bytes(), b"previous output")
+        self.assertEqual(sorted(p.name for p in self.test_dir.iterdir()), ["corpus", "out.pak"])
+
+        # A failure while writing leaves no half-written PAK either
+        with mock.patch('src.kcd_bilingual._write_table', side_effect=OSError("disk full")):
+            self.assertFalse(BilingualPatcher(jobs=1).process(*paks, str(output)))
+        self.assertEqual(output.read_bytes(), b"previous output")
+        self.assertEqual(sorted(p.name for p in self.test_dir.iterdir()), ["corpus", "out.pak"])
+
+        self.assertTrue(BilingualPatcher(jobs=1).process(*paks, str(output)))
+        with zipfile.ZipFile(output) as zf:
+            self.assertEqual(len(zf.namelist()), 6)
@@ -0,0 +1,213 @@
+import argparse
+import asyncio
+import io
+import json
+import os
+import socket
+import threading
+import unittest
+import zipfile
+from contextlib import redirect_stdout
+from pathlib import Path
+from src.kcd_bilingual import BilingualPatcher, _run_on_daemon
+from src.kcd_bilingual_daemon import GenerationDaemon, WarmTables, request, submit, token_path
+from tests.helpers import build_table, create_pak
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "needs Unix sockets")
+class TestGenerationDaemon(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path("test_data/daemon_test")
+        self.test_dir.mkdir(parents=True, exist_ok=True)
+        self.address = str(self.test_dir / "daemon.sock")
+        self.daemon = GenerationDaemon(self.address, workers=2, allowed_outputs=[self.test_dir / "out"])
+        ready = threading.Event()
+        self.thread = threading.Thread(target=asyncio.run, args=(self.daemon.serve(ready),))
+        self.thread.start()
+        self.assertTrue(ready.wait(10))
+
+    def tearDown(self):
+        import shutil
+        request({'op': 'shutdown'}, self.address)
+        self.thread.join(10)
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def create_pak(self, name, tables):
+        # Jobs take absolute paths
+        return str(create_pak(self.test_dir / name, tables).resolve())
+
+    def create_languages(self, czech_text="Ahoj"):
+        czech = self.create_pak("Czech_xml.pak", {
+            'text_ui_dialog.xml': build_table([('a', czech_text), ('b', 'Sbohem'), ('c', 'Jen česky')]),
+            'text_ui_menus.xml': build_table([('m', 'Nabídka')])
+        })
+        russian = self.create_pak("Russian_xml.pak", {
+            'text_ui_dialog.xml': build_table([('a', 'Привет'), ('b', 'Пока')]),
+            'text_ui_menus.xml': build_table([('m', 'Меню')])
+        })
+        english = self.create_pak("English_xml.pak", {
+            'text_ui_dialog.xml': build_table([('a', 'Hello'), ('b', 'Bye'), ('c', 'Czech only')])
+        })
+        return czech, russian, english
+
+    def generate(self, languages, fallbacks, name):
+        output = self.test_dir.resolve() / "out" / name
+        output.parent.mkdir(exist_ok=True)
+        response = submit({'languages': languages, 'fallbacks': fallbacks, 'output': str(output)}, self.address)
+        self.assertTrue(response['ok'], response.get('error'))
+        return output, response
+
+    def test_jobs_match_local_runs_and_reuse_warm_tables(self):
+        czech, russian, english = self.create_languages()
+        local = self.test_dir / "local.pak"
+        self.assertTrue(BilingualPatcher(jobs=1).process_languages([czech, russian], local, [english]))
+
+        first, response = self.generate([czech, russian], [english], "first_xml.pak")
+        self.assertEqual(first.read_bytes(), local.read_bytes())
+        self.assertEqual(response['report']['stats']['replaced_with_eng'], 1)
+        misses = response['stats']['misses']
+
+        second, response = self.generate([czech, russian], [english], "second_xml.pak")
+        self.assertEqual(second.read_bytes(), local.read_bytes())
+        self.assertEqual(response['stats']['misses'], misses)
+        self.assertGreater(response['stats']['hits'], 0)
+
+        # No daemon at an address: the client runs locally instead
+        self.assertIsNone(submit({}, str(self.test_dir / "none.sock")))
+
+    def test_changed_pak_is_parsed_again(self):
+        czech, russian, english = self.create_languages()
+        output, _ = self.generate([czech, russian], [english], "Czech_xml.pak")
+        with zipfile.ZipFile(output) as zf:
+            self.assertIn('<Cell>Ahoj</Cell>', zf.read('text_ui_dialog.xml').decode('utf-8'))
+
+        stat = os.stat(czech)
+        self.create_languages(czech_text="Nazdar")
+        os.utime(czech, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        output, response = self.generate([czech, russian], [english], "Czech_xml.pak")
+        with zipfile.ZipFile(output) as zf:
+            dialog = zf.read('text_ui_dialog.xml').decode('utf-8')
+        self.assertIn('<Cell>Nazdar</Cell>', dialog)
+        self.assertNotIn('Ahoj', dialog)
+        self.assertGreater(response['stats']['invalidations'], 0)
+
+    def test_rejects_foreign_requests_and_outputs(self):
+        czech, russian, english = self.create_languages()
+        self.assertEqual(oct(token_path(self.address).stat().st_mode & 0o777), oct(0o600))
+
+        # A browser-style POST: the header lines close the connection before the job is read
+        job = {'op': 'generate', 'job': {'languages': [czech, russian], 'output': czech}}
+        for preamble in (b'POST / HTTP/1.1\r\nContent-Type: text/plain\r\n\r\n',
+                         json.dumps(dict(job, token='0' * 64)).encode() + b'\n'):
+            with socket.socket(socket.AF_UNIX) as sock:
+                sock.connect(self.address)
+                sock.sendall(preamble + json.dumps(job).encode() + b'\n')
+                with sock.makefile('rb') as f:
+                    self.assertEqual(json.loads(f.readline()), {'ok': False, 'error': 'invalid request'})
+                    self.assertEqual(f.readline(), b'')
+
+        outputs = {
+            str(self.test_dir.resolve() / "Czech_xml.pak"): 'outside',
+            str(self.test_dir.resolve() / "out" / "notes.txt"): '*_xml.pak',
+            "out/Czech_xml.pak": 'absolute'
+        }
+        for output, error in outputs.items():
+            response = submit({'languages': [czech, russian], 'output': output}, self.address)
+            self.assertFalse(response['ok'])
+            self.assertTrue(response['rejected'])
+            self.assertIn(error, response['error'])
+        daemon = GenerationDaemon(self.address, allowed_outputs=[self.test_dir])
+        with self.assertRaisesRegex(ValueError, 'input PAK'):
+            daemon.run_job({'languages': [czech, russian], 'output': czech})
+        self.assertEqual(self.daemon.warm.stats()['misses'], 0)
+
+    def test_cli_runs_locally_when_rejected(self):
+        czech, russian, english = self.create_languages()
+        args = argparse.Namespace(languages=[czech, russian], fallback=[english], output=str(self.test_dir / "out.pak"),
+                                  files=None, separator=None, compression='deflated', level=None, incremental=False,
+                                  skip_unchanged=False, mmap=False, stats_json=None, daemon=self.address)
+        with redirect_stdout(io.StringIO()) as out:
+            self.assertIsNone(_run_on_daemon(args, None))
+        self.assertIn('running locally', out.getvalue())
+        self.assertFalse((self.test_dir / "out.pak").exists())
+
+    def test_invalid_jobs_fail_before_reading(self):
+        czech, russian, english = self.create_languages()
+        output = str(self.test_dir.resolve() / "out" / "Czech_xml.pak")
+        job = {'languages': [czech, russian], 'fallbacks': [english], 'output': output}
+        errors = {
+            'files': ('text_ui_dialog.xml', 'files'),
+            'compression': ('zstd', 'deflated or stored'),
+            'level': (10, 'level'),
+            'languages': ([czech, str(self.test_dir.resolve() / "Klingon_xml.pak")], 'Klingon_xml.pak'),
+            'fallbacks': (["English_xml.pak"], 'absolute'),
+            'policies': ({'text_ui_dialog.xml': {'min_words': -1}}, 'min_words'),
+            'colour': ('red', 'unknown')
+        }
+        for name, (value, error) in errors.items():
+            response = submit(dict(job, **{name: value}), self.address)
+            self.assertFalse(response['ok'], name)
+            self.assertIn(error, response['error'])
+        self.assertEqual(self.daemon.warm.stats()['misses'], 0)
+        self.assertFalse(os.path.exists(output))
+
+class TestWarmTables(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path("test_data/warm_tables_test")
+        self.test_dir.mkdir(parents=True, exist_ok=True)
+
+    def tearDown(self):
+        import shutil
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def write_pak(self, language, ids):
+        table = build_table([(entry_id, f'{language} {entry_id}') for entry_id in ids])
+        return str(create_pak(self.test_dir / f"{language}_xml.pak", {'text_ui_dialog.xml': table}))
+
+    def test_evicts_least_recently_used(self):
+        ids = [f'id{i}' for i in range(200)]
+        paks = [self.write_pak(language, ids) for language in ('Czech', 'Russian', 'English')]
+        warm = WarmTables()
+        table = warm.get(paks[0], ['text_ui_dialog.xml'])['text_ui_dialog.xml']
+        # The shared ID index is counted as well as the texts
+        self.assertGreater(warm.stats()['bytes'], table.nbytes + table.index.nbytes - 1)
+        # Room for the index and two of the tables
+        warm = WarmTables(max_bytes=warm.stats()['bytes'] + table.nbytes * 3 // 2)
+        for pak in paks[:2]:
+            warm.get(pak, ['text_ui_dialog.xml'])
+        warm.get(paks[0], ['text_ui_dialog.xml'])
+        warm.get(paks[2], ['text_ui_dialog.xml'])
+        stats = warm.stats()
+        self.assertEqual(stats['evictions'], 1)
+        self.assertLessEqual(stats['bytes'], warm.max_bytes)
+
+        # Russian was least recently used and has to be parsed again; Czech stayed warm
+        table = warm.get(paks[0], ['text_ui_dialog.xml'])['text_ui_dialog.xml']
+        self.assertEqual(table['id5'], 'Czech id5')
+        self.assertEqual(warm.stats()['misses'], 3)
+        warm.get(paks[1], ['text_ui_dialog.xml'])
+        self.assertEqual(warm.stats()['misses'], 4)
+
+    def test_changed_pak_releases_its_ids(self):
+        czech = self.write_pak('Czech', [f'old{i}' for i in range(100)])
+        russian = self.write_pak('Russian', [f'old{i}' for i in range(50)])
+        warm = WarmTables()
+        warm.get(czech, ['text_ui_dialog.xml'])
+        warm.get(russian, ['text_ui_dialog.xml'])
+        size = warm.stats()['bytes']
+
+        stat = os.stat(czech)
+        self.write_pak('Czech', [f'new{i}' for i in range(100)])
+        os.utime(czech, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        table = warm.get(czech, ['text_ui_dialog.xml'])['text_ui_dialog.xml']
+        russian_table = warm.get(russian, ['text_ui_dialog.xml'])['text_ui_dialog.xml']
+        # Only the IDs of the cached Russian table and the new Czech one remain
+        self.assertEqual(len(table.index), 150)
+        self.assertIs(russian_table.index, table.index)
+        self.assertEqual(russian_table['old7'], 'Russian old7')
+        self.assertLess(warm.stats()['bytes'], size * 3 // 2)
+        self.assertEqual(warm.stats()['invalidations'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BUDGET_PATH = Path(__file__).parent / "import_budget.json"
+PROJECT_ROOT = Path(__file__).parent.parent
+
+def import_profile(module):
+    """Cumulative import time (us) of every module loaded by importing module in a fresh interpreter"""
+    env = dict(os.environ)
+    # Measure imports from bytecode, as an installed copy would run
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, total, name = line[len("import time:"):].split("|")
+        cumulative[name.strip()] = int(total)
+    return cumulative
+
+class TestImportTime(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.budgets = json.loads(BUDGET_PATH.read_text(encoding='utf-8'))
+
+    def check_budget(self, module):
+        budget = self.budgets[module]
+        # Warm up so bytecode exists, then keep the fastest of a few runs
+        import_profile(module)
+        profiles = [import_profile(module) for _ in range(3)]
+        
+        modules = profiles[0]
+        for name in budget["forbidden"]:
+            self.assertNotIn(name, modules, f"importing {module} loads {name}")
+        self.assertLessEqual(len(modules), budget["max_modules"])
+        
+        best_ms = min(profile[module] for profile in profiles) / 1000
+        self.assertLessEqual(best_ms, budget["max_ms"],
+                             f"importing {module} took {best_ms:.1f} ms (budget {budget['max_ms']} ms)")
+
+    def test_cli_import_budget(self):
+        self.check_budget("src.kcd_bilingual")
+
+    def test_path_finder_import_budget(self):
+        self.check_budget("src.utils.path_finder")
+
+    @unittest.skipUnless(importlib.util.find_spec("tkinter") and importlib.util.find_spec("sv_ttk"),
+                         "GUI dependencies not installed")
+    def test_gui_import_budget(self):
+        self.check_budget("src.gui.main_window")
+
+    def test_packages_import_lazily(self):
+        modules = import_profile("src.utils, src.core")
+        self.assertNotIn("src.utils.mod_generator", modules)
+        self.assertNotIn("src.core.cache", modules)
+
+if __name__ == '__main__':
+    unittest.main()
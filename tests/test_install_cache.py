@@ -0,0 +1,64 @@
+import unittest
+from unittest import mock
+from pathlib import Path
+import os
+import zipfile
+from src.core.install_cache import InstallCache
+
+def write_pak(path, text="Test"):
+    with zipfile.ZipFile(path, 'w') as zf:
+        zf.writestr('text_ui_dialog.xml', f'<Table><Row><Cell>{text}</Cell></Row></Table>')
+
+class TestInstallCache(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path("test_data/install_cache_test")
+        self.game_path = self.test_dir / "game"
+        self.loc_path = self.game_path / "Localization"
+        (self.game_path / "Data").mkdir(parents=True, exist_ok=True)
+        self.loc_path.mkdir(exist_ok=True)
+        for lang in ("English", "Czech"):
+            write_pak(self.loc_path / f"{lang}_xml.pak")
+        self.cache = InstallCache(self.test_dir / "installs.json")
+
+    def tearDown(self):
+        import shutil
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def test_entry_revalidates_with_stat_only(self):
+        self.cache.remember(self.game_path)
+        with mock.patch('src.core.languages.Path.glob') as glob:
+            entry = InstallCache(self.test_dir / "installs.json").find(self.game_path)
+        glob.assert_not_called()
+        self.assertEqual(sorted(entry["paks"]), ["Czech", "English"])
+        self.assertEqual(self.cache.first_valid()["path"], str(self.game_path))
+
+    def test_changes_invalidate_entry(self):
+        self.cache.remember(self.game_path)
+        # A PAK updated in place keeps the folder mtime but changes size
+        write_pak(self.loc_path / "Czech_xml.pak", "Patched")
+        self.assertIsNone(self.cache.find(self.game_path))
+
+        self.cache.remember(self.game_path)
+        write_pak(self.loc_path / "German_xml.pak")
+        # Make sure the folder mtime moves even on coarse timestamp filesystems
+        stat = os.stat(self.loc_path)
+        os.utime(self.loc_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertIsNone(self.cache.find(self.game_path))
+
+        self.cache.remember(self.game_path)
+        import shutil
+        shutil.rmtree(self.game_path / "Data")
+        self.assertIsNone(self.cache.first_valid())
+
+    def test_remembered_install_comes_first(self):
+        other = self.test_dir / "other"
+        (other / "Data").mkdir(parents=True)
+        self.cache.remember(self.game_path)
+        self.cache.remember(other)
+        self.assertEqual([e["path"] for e in self.cache.load()], [str(other), str(self.game_path)])
+        self.cache.remember(self.game_path)
+        self.assertEqual(self.cache.first_valid()["path"], str(self.game_path))
+
+        self.cache.path.write_text("not json")
+        self.assertEqual(self.cache.load(), [])
@@ -0,0 +1,63 @@
+import unittest
+import json
+from pathlib import Path
+from src.core.merge_policy import DEFAULT_POLICIES, MergePolicy, load_policies
+
+class TestMergePolicy(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path("test_data/merge_policy_test")
+        self.test_dir.mkdir(parents=True, exist_ok=True)
+
+    def tearDown(self):
+        import shutil
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def combine(self, policy, primary, *others):
+        return list(policy.combiner("/")(primary, *others))
+
+    def test_combiners(self):
+        primary = ['Start', 'Load a saved game', 'MISSING', 'Quit the game now']
+        second = ['Старт', 'Загрузить', 'Выход', 'MISSING']
+        third = ['Start', 'MISSING', 'Ende', 'Spiel beenden']
+        self.assertEqual(self.combine(MergePolicy(), primary[:2], second[:2]),
+                         ['Start / Старт', 'Load a saved game / Загрузить'])
+        self.assertEqual(self.combine(MergePolicy(combine=False), primary, second), primary)
+        self.assertEqual(self.combine(MergePolicy(separator='|'), primary[:1], second[:1]), ['Start | Старт'])
+        self.assertEqual(self.combine(MergePolicy(skip_missing=True), primary, second, third), [
+            'Start / Старт / Start', 'Load a saved game / Загрузить', 'MISSING / Выход / Ende',
+            'Quit the game now / Spiel beenden'])
+        self.assertEqual(self.combine(MergePolicy(min_words=3), primary, second), [
+            'Start', 'Load a saved game / Загрузить', 'MISSING', 'Quit the game now / MISSING'])
+        menus = DEFAULT_POLICIES['text_ui_menus.xml']
+        self.assertEqual(self.combine(menus, primary, second),
+                         ['Start', 'Load a saved game / Загрузить', 'MISSING', 'Quit the game now'])
+        self.assertEqual(self.combine(menus, primary, second, third),
+                         ['Start', 'Load a saved game / Загрузить', 'MISSING', 'Quit the game now / Spiel beenden'])
+
+    def test_fallback_chain(self):
+        names = ['English', 'German']
+        self.assertEqual(MergePolicy().fallback_chain(names), [0, 1])
+        self.assertEqual(MergePolicy(fallbacks=['german', 'French', 'English']).fallback_chain(names), [1, 0])
+        self.assertEqual(MergePolicy(fallbacks=[]).fallback_chain(names), [])
+        self.assertEqual(MergePolicy(combine=False).fallback_chain(names), [])
+
+    def test_load_policies(self):
+        path = self.test_dir / "policies.json"
+        path.write_text(json.dumps({
+            'text_ui_items.xml': {'min_words': 2, 'fallbacks': ['German']},
+            'text_ui_menus.xml': {'separator': '|'}
+        }), encoding='utf-8')
+        policies = load_policies(path)
+        self.assertEqual(policies['text_ui_items.xml'], MergePolicy(min_words=2, fallbacks=['German']))
+        # Settings left out keep the table's default
+        self.assertEqual(policies['text_ui_menus.xml'],
+                         MergePolicy(min_words=3, separator='|', fallbacks=[], skip_missing=True))
+
+        for config in ({'items.xml': {}}, {'text_ui_items.xml': {'min_word': 2}},
+                       {'text_ui_items.xml': {'min_words': -1}}, {'text_ui_items.xml': {'combine': 'no'}},
+                       {'text_ui_items.xml': {'fallbacks': 'English'}}, ['text_ui_items.xml']):
+            with self.assertRaises(ValueError):
+                load_policies(config)
+        with self.assertRaises(ValueError):
+            load_policies(self.test_dir / "missing.json")
@@ -9,6 +9,8 @@ class TestModGenerator(unittest.TestCase):
         self.generator = ModGenerator()
         self.test_dir = Path("test_data/mod_test")
         self.test_dir.mkdir(parents=True, exist_ok=True)
+        # Write the mod under test_data instead of next to the sources
+        self.generator.base_dir = self.test_dir / "app"
         
         # Create fake game structure
         self.game_path = self.test_dir / "game"
@@ -37,7 +39,9 @@ class TestModGenerator(unittest.TestCase):
             game_path=self.game_path,
             primary_lang="Czech",
             secondary_lang="German",
-            selected_files=["text_ui_dialog.xml"]
+            selected_files=["text_ui_dialog.xml"],
+            # Keep the test out of the user's parse cache
+            use_cache=False
         )
         
         # Check output structure
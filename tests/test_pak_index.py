@@ -0,0 +1,63 @@
+import unittest
+from pathlib import Path
+import os
+import zipfile
+from src.core.pak_index import BadPakError, is_language_pak, localization_tables, read_pak_index
+
+class TestPakIndex(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path("test_data/pak_index_test")
+        self.test_dir.mkdir(parents=True, exist_ok=True)
+
+    def tearDown(self):
+        import shutil
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def create_pak(self, name, members, comment=b""):
+        path = self.test_dir / name
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for member, content in members.items():
+                zf.writestr(member, content)
+            zf.comment = comment
+        return path
+
+    def test_matches_zipfile(self):
+        pak = self.create_pak("Czech_xml.pak", {
+            'text_ui_dialog.xml': '<Table>' + '<Row><Cell>id</Cell><Cell>Ahoj</Cell></Row>' * 100 + '</Table>',
+            'text_ui_menus.xml': '<Table></Table>',
+            'ui/čeština.txt': 'x'
+        }, comment=b'{"format": 1}')
+        index = read_pak_index(pak)
+        with zipfile.ZipFile(pak) as zf:
+            infos = zf.infolist()
+        self.assertEqual(list(index), [info.filename for info in infos])
+        for info in infos:
+            member = index[info.filename]
+            self.assertEqual(
+                (member.CRC, member.compress_size, member.file_size, member.header_offset, member.compress_type),
+                (info.CRC, info.compress_size, info.file_size, info.header_offset, info.compress_type))
+        self.assertEqual(sorted(localization_tables(pak)), ['text_ui_dialog.xml', 'text_ui_menus.xml'])
+
+    def test_index_follows_file_changes(self):
+        pak = self.create_pak("Czech_xml.pak", {'text_ui_dialog.xml': 'a'})
+        self.assertEqual(list(read_pak_index(pak)), ['text_ui_dialog.xml'])
+        self.create_pak("Czech_xml.pak", {'text_ui_dialog.xml': 'a', 'text_ui_quest.xml': 'bb'})
+        # Same mtime on coarse filesystems; the size change alone must invalidate
+        stat = os.stat(pak)
+        os.utime(pak, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertEqual(list(read_pak_index(pak)), ['text_ui_dialog.xml', 'text_ui_quest.xml'])
+
+    def test_rejects_non_language_paks(self):
+        empty = self.test_dir / "Empty_xml.pak"
+        empty.touch()
+        garbage = self.test_dir / "Garbage_xml.pak"
+        garbage.write_bytes(b"PK\x05\x06" + b"\xff" * 30)
+        with self.assertRaises(BadPakError):
+            read_pak_index(empty)
+        with self.assertRaises(BadPakError):
+            read_pak_index(garbage)
+        self.assertFalse(is_language_pak(empty))
+        self.assertFalse(is_language_pak(self.test_dir / "Missing_xml.pak"))
+        self.assertFalse(is_language_pak(self.create_pak("Textures_xml.pak", {'icon.dds': 'x'})))
+        self.assertTrue(is_language_pak(self.create_pak("German_xml.pak", {'text_ui_soul.xml': 'x'})))
@@ -0,0 +1,68 @@
+import unittest
+from unittest import mock
+from pathlib import Path
+import zipfile
+from src.core.pakfile import CompressedMember, read_raw_member, write_raw_member
+
+class TestPakFile(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path("test_data/pakfile_test")
+        self.test_dir.mkdir(parents=True, exist_ok=True)
+
+    def tearDown(self):
+        import shutil
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def write_pak(self, name, members, raw=True, compresslevel=None):
+        """PAK of CompressedMembers, appended raw (or streamed through ZipFile.open)"""
+        path = self.test_dir / name
+        with zipfile.ZipFile(path, 'w') as zf:
+            for member_name, method, content in members:
+                info = zipfile.ZipInfo(member_name, (1980, 1, 1, 0, 0, 0))
+                info.compress_type = method
+                info.external_attr = 0o600 << 16
+                info.comment = b'{"inputs":"x"}'
+                if raw:
+                    with CompressedMember(info) as member:
+                        member.write(content)
+                    write_raw_member(zf, member.info, member.data, compresslevel)
+                else:
+                    with zf.open(info, 'w') as f:
+                        f.write(content)
+        return path
+
+    def test_raw_members_match_zipfile(self):
+        content = '<Table>' + '<Row><Cell>id</Cell><Cell>Příliš žluťoučký</Cell></Row>' * 500 + '</Table>'
+        members = [('text_ui_dialog.xml', zipfile.ZIP_DEFLATED, content.encode('utf-8')),
+                   ('text_ui_menus.xml', zipfile.ZIP_STORED, b'<Table />')]
+        raw = self.write_pak("raw.pak", members)
+        # The appended headers and central directory are what ZipFile itself writes
+        self.assertEqual(raw.read_bytes(), self.write_pak("streamed.pak", members, raw=False).read_bytes())
+
+        copied = self.test_dir / "copied.pak"
+        with zipfile.ZipFile(raw) as src, zipfile.ZipFile(copied, 'w') as dst:
+            for info in src.infolist():
+                write_raw_member(dst, info, read_raw_member(raw, info))
+        self.assertEqual(copied.read_bytes(), raw.read_bytes())
+
+        # Without the known internals, members are recompressed through writestr()
+        with mock.patch('src.core.pakfile._RAW_WRITE_VERSIONS', ((2, 0), (2, 7))):
+            fallback = self.write_pak("fallback.pak", members)
+        with zipfile.ZipFile(fallback) as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual(zf.read('text_ui_dialog.xml').decode('utf-8'), content)
+            self.assertEqual([(i.filename, i.compress_type, i.comment) for i in zf.infolist()],
+                             [(name, method, b'{"inputs":"x"}') for name, method, _ in members])
+        # ...at the level the caller asked for
+        sizes = []
+        for level in (0, 9):
+            with mock.patch('src.core.pakfile._RAW_WRITE_VERSIONS', ((2, 0), (2, 7))):
+                pak = self.write_pak(f"level{level}.pak", members[:1], compresslevel=level)
+            with zipfile.ZipFile(pak) as zf:
+                sizes.append(zf.getinfo('text_ui_dialog.xml').compress_size)
+        self.assertGreater(sizes[0], len(content.encode('utf-8')))
+        self.assertLess(sizes[1], sizes[0] // 10)
+
+if __name__ == '__main__':
+    unittest.main()
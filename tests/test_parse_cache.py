@@ -0,0 +1,71 @@
+import unittest
+from unittest import mock
+from pathlib import Path
+import os
+import zipfile
+from src.core.cache import ParseCache
+from src.kcd_bilingual import BilingualPatcher
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path("test_data/cache_test")
+        self.test_dir.mkdir(parents=True, exist_ok=True)
+        self.cache = ParseCache(self.test_dir / "cache")
+
+    def tearDown(self):
+        import shutil
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def create_pak(self, name, text):
+        path = self.test_dir / name
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr('text_ui_dialog.xml',
+                        f'<Table><Row><Cell>id</Cell><Cell>x</Cell><Cell>{text}</Cell></Row></Table>')
+        return path
+
+    def member_info(self, pak):
+        with zipfile.ZipFile(pak) as zf:
+            return zf.getinfo('text_ui_dialog.xml')
+
+    def test_roundtrip_and_key(self):
+        info = self.member_info(self.create_pak("a.pak", "Hello"))
+        self.assertIsNone(self.cache.get(info))
+        self.cache.put(info, {'id': 'Hello'})
+        self.assertEqual(self.cache.get(info), {'id': 'Hello'})
+
+        # Different content means a different CRC and therefore a miss
+        changed = self.member_info(self.create_pak("b.pak", "Hallo"))
+        self.assertIsNone(self.cache.get(changed))
+
+    def test_warm_run_skips_parsing(self):
+        pak = str(self.create_pak("Czech_xml.pak", "Ahoj"))
+        patcher = BilingualPatcher(['text_ui_dialog.xml'], jobs=1, cache=self.cache)
+        cold = patcher._extract_data(pak, 1)
+
+        with mock.patch('src.kcd_bilingual._iter_rows') as iter_rows:
+            warm = patcher._extract_data(pak, 1)
+            iter_rows.assert_not_called()
+        self.assertEqual(cold, warm)
+        self.assertEqual(warm, {'text_ui_dialog.xml': {'id': 'Ahoj'}})
+
+    def test_lru_eviction(self):
+        infos = [self.member_info(self.create_pak(f"{i}.pak", f"text {i}")) for i in range(3)]
+        for age, info in enumerate(infos):
+            self.cache.put(info, {'id': 'x' * 1000})
+            # Spread out modification times so LRU order is unambiguous
+            path = self.cache._entry_path(info)
+            os.utime(path, (1000 + age, 1000 + age))
+
+        # Touch the oldest entry, then shrink the cap to fit two entries
+        self.assertIsNotNone(self.cache.get(infos[0]))
+        entry_size = self.cache._entry_path(infos[0]).stat().st_size
+        self.cache.max_bytes = entry_size * 2
+        self.cache._evict()
+
+        self.assertIsNotNone(self.cache.get(infos[0]))
+        self.assertIsNone(self.cache.get(infos[1]))
+        self.assertIsNotNone(self.cache.get(infos[2]))
+
+        self.cache.clear()
+        self.assertIsNone(self.cache.get(infos[2]))
@@ -1,11 +1,13 @@
 import unittest
+import zipfile
 from pathlib import Path
+from src.core.install_cache import InstallCache
 from src.utils.path_finder import GamePathFinder
 
 class TestGamePathFinder(unittest.TestCase):
     def setUp(self):
-        self.finder = GamePathFinder()
         self.test_game_path = Path("test_data/fake_game")
+        self.finder = GamePathFinder(InstallCache(Path("test_data/installs.json")))
         self.test_game_path.mkdir(parents=True, exist_ok=True)
         (self.test_game_path / "Data").mkdir(exist_ok=True)
         (self.test_game_path / "Mods").mkdir()
@@ -15,6 +17,7 @@ class TestGamePathFinder(unittest.TestCase):
         import shutil
         if self.test_game_path.exists():
             shutil.rmtree(self.test_game_path)
+        self.finder.install_cache.clear()
     
     def test_find_mods_path(self):
         mods_path = Path(self.test_game_path) / "Mods"
@@ -27,7 +30,78 @@ class TestGamePathFinder(unittest.TestCase):
         
         test_langs = ["English", "Czech", "German"]
         for lang in test_langs:
-            (loc_path / f"{lang}_xml.pak").touch()
+            with zipfile.ZipFile(loc_path / f"{lang}_xml.pak", 'w') as zf:
+                zf.writestr('text_ui_dialog.xml', '<Table></Table>')
+        # Empty or unrelated PAKs are not languages
+        (loc_path / "Broken_xml.pak").touch()
+        with zipfile.ZipFile(loc_path / "Textures_xml.pak", 'w') as zf:
+            zf.writestr('icon.dds', b'')
         
         languages = self.finder.detect_languages(str(self.test_game_path))
-        self.assertEqual(set(languages), set(test_langs)) 
\ No newline at end of file
+        self.assertEqual(set(languages), set(test_langs))
+        
+        tables = self.finder.language_tables(str(self.test_game_path))
+        self.assertEqual(set(tables), set(test_langs))
+        self.assertEqual(list(tables["Czech"]), ['text_ui_dialog.xml'])
+
+    def test_cached_install_skips_discovery(self):
+        self.finder.install_cache.remember(self.test_game_path)
+        finder = GamePathFinder(self.finder.install_cache)
+        finder._discover_game_path = lambda: self.fail("full discovery should not run")
+        self.assertEqual(finder.find_game_path(), str(self.test_game_path))
+
+    def test_probing_skips_unresponsive_locations(self):
+        import time
+        other_game_path = Path("test_data/other_game")
+        (other_game_path / "Data").mkdir(parents=True, exist_ok=True)
+        self.addCleanup(lambda: __import__('shutil').rmtree(other_game_path))
+        
+        def hanging_drive():
+            time.sleep(10)
+            return ["D:/KingdomComeDeliverance"]
+        
+        self.finder.PROBE_TIMEOUT = 0.5
+        self.finder._probes = lambda: [
+            lambda: [],
+            hanging_drive,
+            lambda: [str(self.test_game_path)],
+            lambda: [str(other_game_path), str(self.test_game_path)]
+        ]
+        
+        start = time.monotonic()
+        self.assertEqual(self.finder.find_game_path(refresh=True), str(self.test_game_path))
+        self.assertEqual(self.finder.find_installs(), [str(self.test_game_path), str(other_game_path)])
+        self.assertLess(time.monotonic() - start, 2)
+        
+        # The best install is returned without waiting for slower, lower-priority ones
+        self.finder._probes = lambda: [lambda: [str(other_game_path)], hanging_drive]
+        start = time.monotonic()
+        self.assertEqual(self.finder.find_game_path(refresh=True), str(other_game_path))
+        self.assertLess(time.monotonic() - start, 0.4)
+
+    def test_dead_steam_library_keeps_the_others(self):
+        import time
+        steam = Path("test_data/steam")
+        library = Path("test_data/steam_library")
+        game = library / "steamapps" / "common" / "KingdomComeDeliverance"
+        (game / "Data").mkdir(parents=True, exist_ok=True)
+        (steam / "steamapps").mkdir(parents=True, exist_ok=True)
+        self.addCleanup(lambda: [__import__('shutil').rmtree(p) for p in (steam, library)])
+        (steam / "steamapps" / "libraryfolders.vdf").write_text(
+            f'"libraryfolders"\n{{\n"1" {{ "path" "X:\\\\dead" }}\n"2" {{ "path" "{library}" }}\n}}\n',
+            encoding='utf-8')
+        
+        install_probe = self.finder._install_probe
+        def probe(path):
+            if "dead" not in str(path):
+                return install_probe(path)
+            # A library on a disconnected drive never answers
+            return lambda: time.sleep(10) or [str(path)]
+        
+        self.finder.PROBE_TIMEOUT = 0.5
+        self.finder._install_probe = probe
+        self.finder._get_steam_path = lambda: str(steam)
+        self.finder._probes = lambda: [self.finder._probe_steam]
+        start = time.monotonic()
+        self.assertEqual(self.finder.find_installs(), [str(game)])
+        self.assertLess(time.monotonic() - start, 2)
@@ -0,0 +1,72 @@
+import unittest
+import pickle
+import tracemalloc
+from src.core.tables import CompactTable, IdIndex, MergedRows, TableSet, shared_index
+
+def dialog_rows(language, count):
+    """(id, text) rows where every third line is one of a few repeated replies"""
+    for i in range(count):
+        if i % 3 == 0:
+            text = f"{language} reply {i % 50}"
+        else:
+            text = f"{language} řádek {i} rozhovoru, který říká někdo v Ratajích"
+        yield f"dialog_line_{i:07d}", text
+
+class TestTables(unittest.TestCase):
+    def test_compact_table_behaves_like_dict(self):
+        rows = [('c', 'Čau'), ('a', 'A'), ('b', 'MISSING'), ('a', 'A2')]
+        for empty in (None, 'MISSING'):
+            table = CompactTable.build(IdIndex(), rows, empty)
+            self.assertEqual(dict(table), dict(rows))
+            self.assertEqual(list(table), list(dict(rows)))
+            self.assertEqual(len(table), 3)
+            self.assertEqual(table.get('x', 'MISSING'), 'MISSING')
+            self.assertNotIn('x', table)
+            with self.assertRaises(KeyError):
+                table['x']
+
+    def test_languages_share_ids_and_texts_are_deduplicated(self):
+        tables = TableSet('MISSING')
+        first = tables.build('text_ui_dialog.xml', [('a', 'Ano'), ('b', 'MISSING'), ('c', 'Ano')])
+        second = tables.build('text_ui_dialog.xml', [('c', 'Yes'), ('d', 'No')])
+        self.assertIs(shared_index([first, second], 'MISSING'), first.index)
+        self.assertIsNone(shared_index([first, second]))
+        self.assertIsNone(shared_index([first, {'a': 'x'}], 'MISSING'))
+        self.assertEqual(first.index.ids, ['a', 'b', 'c', 'd'])
+        self.assertEqual(list(second), ['c', 'd'])
+        self.assertIsNone(second.get('a'))
+        # Repeated and empty texts take no extra space
+        self.assertEqual(bytes(first.data), 'Ano'.encode())
+
+        column = second.column([0, 2, 3], 'MISSING')
+        self.assertEqual(list(column), ['MISSING', 'Yes', 'No'])
+        self.assertEqual(column.count('MISSING'), 1)
+        self.assertEqual(list(column.filled(['a', 'c', 'd'], [{'a': 'Hello'}])), ['Hello', 'Yes', 'No'])
+        self.assertEqual(first.column([1, 3], 'MISSING').count('MISSING'), 2)
+
+        # Pickled together, the tables keep sharing their index
+        first_copy, second_copy = pickle.loads(pickle.dumps([first, second]))
+        self.assertIs(first_copy.index, second_copy.index)
+        self.assertEqual(dict(second_copy), dict(second))
+
+        # Moved to a fresh index, a table keeps its rows and brings only its own IDs
+        moved = TableSet('MISSING').adopt('text_ui_dialog.xml', second)
+        self.assertEqual((dict(moved), moved.index.ids), (dict(second), ['c', 'd']))
+        self.assertGreater(first.index.nbytes, moved.index.nbytes)
+
+        rows = MergedRows(['a'], ['Ano'], [['Yes']], lambda primary, other: map(' / '.join, zip(primary, other)))
+        self.assertEqual((len(rows), list(rows)), (1, [('a', 'Ano', 'Ano / Yes')]))
+
+    def test_compact_tables_use_less_memory(self):
+        def peak_for(build):
+            tracemalloc.start()
+            tables = [build(language) for language in ("Czech", "Russian", "English")]
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            self.assertEqual(len(tables[0]), 20000)
+            return peak
+
+        shared = TableSet()
+        dict_peak = peak_for(lambda language: dict(dialog_rows(language, 20000)))
+        compact_peak = peak_for(lambda language: shared.build('text_ui_dialog.xml', dialog_rows(language, 20000)))
+        self.assertLess(compact_peak, dict_peak * 0.75)